@@ -0,0 +1,25 @@
+"""Add version counter to lead tables
+
+Revision ID: lead_table_version
+Revises: remove_conv_dep
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'lead_table_version'
+down_revision = 'remove_conv_dep'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Bumped on every write; lead table ETags are derived from it
+    op.add_column('lead_tables',
+                  sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('lead_tables', 'version')
@@ -0,0 +1,34 @@
+"""Database-side cascades for lead table deletes
+
+Lets deleting a lead table null out conversations that point at it, and adds
+the deleted_at marker used by the background chunked delete.
+
+Revision ID: database_side_cascades
+Revises: lead_cells_unique
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'database_side_cascades'
+down_revision = 'lead_cells_unique'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('conversations_lead_table_id_fkey', 'conversations', type_='foreignkey')
+    op.create_foreign_key('conversations_lead_table_id_fkey', 'conversations', 'lead_tables',
+                          ['lead_table_id'], ['id'], ondelete='SET NULL')
+
+    op.add_column('lead_tables', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('lead_tables', 'deleted_at')
+
+    op.drop_constraint('conversations_lead_table_id_fkey', 'conversations', type_='foreignkey')
+    op.create_foreign_key('conversations_lead_table_id_fkey', 'conversations', 'lead_tables',
+                          ['lead_table_id'], ['id'])
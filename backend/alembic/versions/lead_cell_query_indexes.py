@@ -0,0 +1,42 @@
+"""Index lead cell values for server-side filtering and sorting
+
+Revision ID: lead_cell_query_indexes
+Revises: typed_lead_cells
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'lead_cell_query_indexes'
+down_revision = 'typed_lead_cells'
+branch_labels = None
+depends_on = None
+
+# The indexed expressions must match app/services/lead_query.py exactly
+INDEXES = {
+    # eq / in on text: lower-cased prefix, short enough for a btree entry
+    'ix_lead_cells_column_search_key':
+        "ON lead_cells (column_id, left(lower(value #>> '{}'), 200))",
+    # eq / in / ranges on number columns
+    'ix_lead_cells_column_number':
+        "ON lead_cells (column_id, (CASE WHEN jsonb_typeof(value) = 'number' THEN CAST(value #>> '{}' AS NUMERIC) END)) "
+        "WHERE jsonb_typeof(value) = 'number'",
+    # contains: trigram GIN, combined with the column_id index by a bitmap AND
+    'ix_lead_cells_value_trgm':
+        "ON lead_cells USING gin (lower(value #>> '{}') gin_trgm_ops)",
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so writes to large tables are not blocked
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
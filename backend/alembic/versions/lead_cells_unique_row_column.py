@@ -0,0 +1,60 @@
+"""Unique lead cell per row and column
+
+Removes duplicate cells (keeping the most recently updated one) and adds the
+(row_id, column_id) unique constraint that cell upserts target.
+
+Revision ID: lead_cells_unique
+Revises: lead_column_enrichment
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'lead_cells_unique'
+down_revision = 'lead_column_enrichment'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        DELETE FROM lead_cells c
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY row_id, column_id
+                ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id
+            ) AS position
+            FROM lead_cells
+        ) ranked
+        WHERE c.id = ranked.id AND ranked.position > 1
+    """)
+
+    # Build the index without blocking writes, then attach it as the constraint.
+    # A failed CONCURRENTLY build leaves an INVALID index behind, which
+    # IF NOT EXISTS would keep; drop it so a rerun builds it again
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = 'uq_lead_cells_row_column' AND NOT i.indisvalid
+            ) THEN
+                DROP INDEX uq_lead_cells_row_column;
+            END IF;
+        END $$
+    """)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_lead_cells_row_column "
+            "ON lead_cells (row_id, column_id)"
+        )
+    op.execute(
+        "ALTER TABLE lead_cells ADD CONSTRAINT uq_lead_cells_row_column "
+        "UNIQUE USING INDEX uq_lead_cells_row_column"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_lead_cells_row_column', 'lead_cells', type_='unique')
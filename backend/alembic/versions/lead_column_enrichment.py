@@ -0,0 +1,24 @@
+"""Track column enrichment jobs on lead columns
+
+Revision ID: lead_column_enrichment
+Revises: lead_row_search_vector
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'lead_column_enrichment'
+down_revision = 'lead_row_search_vector'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('lead_columns', sa.Column('enrichment', postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('lead_columns', 'enrichment')
@@ -0,0 +1,41 @@
+"""Full-text search vectors on lead rows
+
+Revision ID: lead_row_search_vector
+Revises: lead_cell_query_indexes
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'lead_row_search_vector'
+down_revision = 'lead_cell_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('lead_rows', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Same text as LeadService.refresh_search_vectors
+    op.execute("""
+        UPDATE lead_rows r
+        SET search_vector = (
+            SELECT to_tsvector('english', coalesce(string_agg(c.value #>> '{}', ' '), ''))
+            FROM lead_cells c
+            WHERE c.row_id = r.id
+        )
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_lead_rows_search_vector "
+            "ON lead_rows USING gin (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_lead_rows_search_vector', table_name='lead_rows')
+    op.drop_column('lead_rows', 'search_vector')
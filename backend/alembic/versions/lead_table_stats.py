@@ -0,0 +1,128 @@
+"""Cached lead table statistics
+
+Adds row, column and entity type counts and the last ingestion time to
+lead_tables, kept current by statement-level triggers on lead_rows and
+lead_columns, and backfills them. The triggers are created before the
+backfill in the same transaction, so their locks hold off writes that
+would otherwise be counted twice or missed.
+
+Revision ID: lead_table_stats
+Revises: database_side_cascades
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'lead_table_stats'
+down_revision = 'database_side_cascades'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for name in ('row_count', 'column_count', 'company_count', 'person_count'):
+        op.add_column('lead_tables', sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('lead_tables', sa.Column('last_ingested_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_lead_tables_user_updated', 'lead_tables', ['user_id', 'updated_at'])
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION lead_rows_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE lead_tables t SET
+                    row_count = t.row_count + d.total,
+                    company_count = t.company_count + d.companies,
+                    person_count = t.person_count + d.people,
+                    last_ingested_at = now()
+                FROM (
+                    SELECT lead_table_id, count(*) AS total,
+                           count(*) FILTER (WHERE entity_type = 'company') AS companies,
+                           count(*) FILTER (WHERE entity_type = 'person') AS people
+                    FROM new_rows GROUP BY lead_table_id
+                ) d
+                WHERE t.id = d.lead_table_id;
+            ELSE
+                UPDATE lead_tables t SET
+                    row_count = t.row_count - d.total,
+                    company_count = t.company_count - d.companies,
+                    person_count = t.person_count - d.people
+                FROM (
+                    SELECT lead_table_id, count(*) AS total,
+                           count(*) FILTER (WHERE entity_type = 'company') AS companies,
+                           count(*) FILTER (WHERE entity_type = 'person') AS people
+                    FROM old_rows GROUP BY lead_table_id
+                ) d
+                WHERE t.id = d.lead_table_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION lead_columns_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE lead_tables t SET column_count = t.column_count + d.total
+                FROM (SELECT lead_table_id, count(*) AS total FROM new_columns GROUP BY lead_table_id) d
+                WHERE t.id = d.lead_table_id;
+            ELSE
+                UPDATE lead_tables t SET column_count = t.column_count - d.total
+                FROM (SELECT lead_table_id, count(*) AS total FROM old_columns GROUP BY lead_table_id) d
+                WHERE t.id = d.lead_table_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER lead_rows_stats_insert AFTER INSERT ON lead_rows
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION lead_rows_stats()
+    """)
+    op.execute("""
+        CREATE TRIGGER lead_rows_stats_delete AFTER DELETE ON lead_rows
+        REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION lead_rows_stats()
+    """)
+    op.execute("""
+        CREATE TRIGGER lead_columns_stats_insert AFTER INSERT ON lead_columns
+        REFERENCING NEW TABLE AS new_columns FOR EACH STATEMENT EXECUTE FUNCTION lead_columns_stats()
+    """)
+    op.execute("""
+        CREATE TRIGGER lead_columns_stats_delete AFTER DELETE ON lead_columns
+        REFERENCING OLD TABLE AS old_columns FOR EACH STATEMENT EXECUTE FUNCTION lead_columns_stats()
+    """)
+
+    op.execute("""
+        UPDATE lead_tables t SET
+            row_count = d.total,
+            company_count = d.companies,
+            person_count = d.people,
+            last_ingested_at = d.last_ingested_at
+        FROM (
+            SELECT lead_table_id, count(*) AS total,
+                   count(*) FILTER (WHERE entity_type = 'company') AS companies,
+                   count(*) FILTER (WHERE entity_type = 'person') AS people,
+                   max(created_at) AS last_ingested_at
+            FROM lead_rows GROUP BY lead_table_id
+        ) d
+        WHERE t.id = d.lead_table_id
+    """)
+    op.execute("""
+        UPDATE lead_tables t SET column_count = d.total
+        FROM (SELECT lead_table_id, count(*) AS total FROM lead_columns GROUP BY lead_table_id) d
+        WHERE t.id = d.lead_table_id
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS lead_columns_stats_delete ON lead_columns")
+    op.execute("DROP TRIGGER IF EXISTS lead_columns_stats_insert ON lead_columns")
+    op.execute("DROP TRIGGER IF EXISTS lead_rows_stats_delete ON lead_rows")
+    op.execute("DROP TRIGGER IF EXISTS lead_rows_stats_insert ON lead_rows")
+    op.execute("DROP FUNCTION IF EXISTS lead_columns_stats()")
+    op.execute("DROP FUNCTION IF EXISTS lead_rows_stats()")
+
+    op.drop_index('ix_lead_tables_user_updated', table_name='lead_tables')
+    for name in ('last_ingested_at', 'person_count', 'company_count', 'column_count', 'row_count'):
+        op.drop_column('lead_tables', name)
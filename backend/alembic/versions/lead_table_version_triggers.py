@@ -0,0 +1,75 @@
+"""Bump lead table versions in the database
+
+lead_tables.version was bumped by the backend only, so writes the frontend
+makes through Supabase left cached reads (ETags) stale. Statement-level
+triggers on lead_columns, lead_rows and lead_cells now bump the version of
+every table a statement touches, and a row trigger on lead_tables bumps it
+when the table's own fields change.
+
+Revision ID: lead_table_version_triggers
+Revises: user_plan
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'lead_table_version_triggers'
+down_revision = 'user_plan'
+branch_labels = None
+depends_on = None
+
+# Lead tables of the rows changed by a statement
+VERSIONED_TABLES = {
+    'lead_columns': "SELECT lead_table_id FROM changed",
+    'lead_rows': "SELECT lead_table_id FROM changed",
+    'lead_cells': "SELECT r.lead_table_id FROM lead_rows r WHERE r.id IN (SELECT row_id FROM changed)",
+}
+EVENTS = (('insert', 'NEW'), ('update', 'NEW'), ('delete', 'OLD'))
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION lead_tables_version() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF NEW.version = OLD.version
+               AND (NEW.name, NEW.description, NEW.table_type, NEW.default_columns, NEW.conversation_id)
+                   IS DISTINCT FROM (OLD.name, OLD.description, OLD.table_type, OLD.default_columns, OLD.conversation_id)
+            THEN
+                NEW.version := OLD.version + 1;
+                NEW.updated_at := now();
+            END IF;
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER lead_tables_version BEFORE UPDATE ON lead_tables
+        FOR EACH ROW EXECUTE FUNCTION lead_tables_version()
+    """)
+
+    for table, lead_tables in VERSIONED_TABLES.items():
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_version() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                UPDATE lead_tables SET version = version + 1, updated_at = now()
+                WHERE id IN ({lead_tables});
+                RETURN NULL;
+            END
+            $$
+        """)
+        # A trigger with a transition table handles a single event
+        for event, transition in EVENTS:
+            op.execute(f"""
+                CREATE TRIGGER {table}_version_{event} AFTER {event.upper()} ON {table}
+                REFERENCING {transition} TABLE AS changed FOR EACH STATEMENT EXECUTE FUNCTION {table}_version()
+            """)
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        for event, _ in EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_version_{event} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_version()")
+    op.execute("DROP TRIGGER IF EXISTS lead_tables_version ON lead_tables")
+    op.execute("DROP FUNCTION IF EXISTS lead_tables_version()")
@@ -0,0 +1,80 @@
+"""Store lead cell values natively typed
+
+Legacy rows hold JSON objects and arrays as JSON-encoded strings. Decode them
+into real JSONB values, then give every column whose values all share one
+native JSON type a matching column_type.
+
+Revision ID: typed_lead_cells
+Revises: lead_table_version
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'typed_lead_cells'
+down_revision = 'lead_table_version'
+branch_labels = None
+depends_on = None
+
+
+# Columns whose non-null values are all numbers, booleans or objects/arrays.
+# Aggregates are computed over every row of the group before the CASE picks
+# one, so the numeric cast is filtered to number cells.
+COLUMN_TYPES_SQL = """
+    UPDATE lead_columns c
+    SET column_type = t.column_type
+    FROM (
+        SELECT column_id,
+               CASE
+                   WHEN bool_and(jsonb_typeof(value) = 'number') THEN
+                       CASE WHEN bool_and((value #>> '{}')::numeric = trunc((value #>> '{}')::numeric))
+                                 FILTER (WHERE jsonb_typeof(value) = 'number')
+                            THEN 'integer' ELSE 'number' END
+                   WHEN bool_and(jsonb_typeof(value) = 'boolean') THEN 'boolean'
+                   WHEN bool_and(jsonb_typeof(value) IN ('object', 'array')) THEN 'json'
+               END AS column_type
+        FROM lead_cells
+        WHERE value IS NOT NULL AND jsonb_typeof(value) <> 'null'
+        GROUP BY column_id
+    ) t
+    WHERE c.id = t.column_id
+      AND t.column_type IS NOT NULL
+      AND coalesce(c.column_type, 'text') = 'text'
+"""
+
+
+def upgrade() -> None:
+    # Strings that do not parse as JSON are left untouched
+    op.execute("""
+        CREATE FUNCTION pg_temp.try_jsonb(raw text) RETURNS jsonb AS $$
+        BEGIN
+            RETURN raw::jsonb;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE
+    """)
+    op.execute("""
+        UPDATE lead_cells
+        SET value = pg_temp.try_jsonb(value #>> '{}')
+        WHERE jsonb_typeof(value) = 'string'
+          AND left(value #>> '{}', 1) IN ('{', '[')
+          AND pg_temp.try_jsonb(value #>> '{}') IS NOT NULL
+    """)
+
+    op.execute(COLUMN_TYPES_SQL)
+
+
+def downgrade() -> None:
+    # Re-encode objects and arrays as JSON strings
+    op.execute("""
+        UPDATE lead_cells
+        SET value = to_jsonb(value::text)
+        WHERE jsonb_typeof(value) IN ('object', 'array')
+    """)
+    op.execute("""
+        UPDATE lead_columns
+        SET column_type = 'text'
+        WHERE column_type IN ('number', 'integer', 'boolean', 'json')
+    """)
@@ -0,0 +1,26 @@
+"""Billing plan on users
+
+Adds users.plan, which sizes the per-user AI rate limits and daily token
+quotas. Existing users start on the free plan.
+
+Revision ID: user_plan
+Revises: lead_table_stats
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'user_plan'
+down_revision = 'lead_table_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('plan', sa.String(), nullable=False, server_default='free'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'plan')
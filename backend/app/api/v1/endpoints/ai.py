@@ -4,10 +4,12 @@ from sqlalchemy import select
 from typing import Optional, Dict, Any, List
 from uuid import UUID
 
+from app.core.idempotency import idempotent
+from app.core.rate_limit import rate_limit_ai
 from app.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.ideal_customer_profile import IdealCustomerProfile
-from app.services.ai_service import ai_service
+from app.services.ai_service import AIServiceInterface, get_ai_service
 from pydantic import BaseModel, HttpUrl
 
 router = APIRouter()
@@ -50,10 +52,12 @@ class SignalGenerationResponse(BaseModel):
 
 
 # Endpoints
-@router.post("/analyze-website", response_model=WebsiteAnalysisResponse)
+@router.post("/analyze-website", response_model=WebsiteAnalysisResponse, dependencies=[Depends(rate_limit_ai)])
+@idempotent
 async def analyze_website(
     request: WebsiteAnalysisRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIServiceInterface = Depends(get_ai_service)
 ):
     """Analyze a company website using AI"""
     try:
@@ -80,11 +84,13 @@ async def analyze_website(
         )
 
 
-@router.post("/generate-signals", response_model=SignalGenerationResponse)
+@router.post("/generate-signals", response_model=SignalGenerationResponse, dependencies=[Depends(rate_limit_ai)])
+@idempotent
 async def generate_signals(
     request: SignalGenerationRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIServiceInterface = Depends(get_ai_service)
 ):
     """Generate lead tracking signals based on ICP"""
     try:
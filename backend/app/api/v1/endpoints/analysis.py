@@ -5,10 +5,12 @@ from typing import Optional, Dict, Any, List
 from uuid import UUID
 from pydantic import BaseModel, HttpUrl
 
+from app.core.idempotency import idempotent
+from app.core.rate_limit import rate_limit_ai
 from app.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.ideal_customer_profile import IdealCustomerProfile
-from app.services.ai_service import ai_service
+from app.services.ai_service import AIServiceInterface, get_ai_service
 
 router = APIRouter()
 
@@ -30,10 +32,12 @@ class WebsiteAnalysisResponse(BaseModel):
     recent_news: List[str]
 
 
-@router.post("/website", response_model=WebsiteAnalysisResponse)
+@router.post("/website", response_model=WebsiteAnalysisResponse, dependencies=[Depends(rate_limit_ai)])
+@idempotent
 async def analyze_website(
     request: WebsiteAnalysisRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIServiceInterface = Depends(get_ai_service)
 ):
     """Analyze a company website to extract business information"""
     try:
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import delete, select, func, update
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from app.deps import get_db, get_current_user
+from app.core.http_cache import make_etag, not_modified, set_etag
+from app.core.responses import fast_json
+from app.deps import get_db, get_current_user, get_read_db
 from app.models.user import User
 from app.models.conversation import Conversation
 from app.models.message import Message, MessageType
 from app.models.lead import Lead
+from app.models.lead_table import LeadTable
 from app.schemas.conversation import (
     ConversationCreate, ConversationUpdate, ConversationResponse,
     ConversationSummary, MessageCreate, MessageResponse
@@ -20,19 +23,43 @@ router = APIRouter()
 
 @router.get("/", response_model=List[ConversationSummary])
 async def get_conversations(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all conversations for the current user with summary info"""
+    # Leads and linked lead tables change without touching the conversation's
+    # updated_at, so their counts and versions are part of the validator
+    owned = Conversation.user_id == current_user.id
+    conversation_ids = select(Conversation.id).where(owned)
+    validator = await db.execute(
+        select(
+            select(func.count(Conversation.id)).where(owned).scalar_subquery(),
+            select(func.max(Conversation.updated_at)).where(owned).scalar_subquery(),
+            select(func.count(Message.id)).where(Message.conversation_id.in_(conversation_ids)).scalar_subquery(),
+            select(func.count(Lead.id)).where(Lead.conversation_id.in_(conversation_ids)).scalar_subquery(),
+            select(func.count(LeadTable.id)).join(Conversation, Conversation.lead_table_id == LeadTable.id)
+            .where(owned).scalar_subquery(),
+            select(func.sum(LeadTable.version)).join(Conversation, Conversation.lead_table_id == LeadTable.id)
+            .where(owned).scalar_subquery(),
+        )
+    )
+    etag = make_etag("conversations", current_user.id, *validator.one())
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+    
     # Get conversations with message and lead counts
     result = await db.execute(
         select(
             Conversation,
-            func.count(Message.id).label('message_count'),
-            func.count(Lead.id).label('lead_count')
+            func.count(func.distinct(Message.id)).label('message_count'),
+            func.count(func.distinct(Lead.id)).label('lead_count')
         )
-        .outerjoin(Message)
-        .outerjoin(Lead)
+        .outerjoin(Message, Message.conversation_id == Conversation.id)
+        .outerjoin(Lead, Lead.conversation_id == Conversation.id)
         .where(Conversation.user_id == current_user.id)
         .group_by(Conversation.id)
         .order_by(Conversation.updated_at.desc())
@@ -60,24 +87,20 @@ async def create_conversation(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new conversation"""
+    # The conversation and its welcome message are inserted in one transaction
     conversation = Conversation(
         user_id=current_user.id,
-        title=conversation_in.title or "New Search Session"
+        title=conversation_in.title or "New Search Session",
+        messages=[
+            Message(
+                type=MessageType.SYSTEM,
+                content="Welcome to SignalIQ! Ask me to find companies or people based on your criteria."
+            )
+        ]
     )
     
     db.add(conversation)
     await db.commit()
-    await db.refresh(conversation)
-    
-    # Add welcome message
-    welcome_message = Message(
-        conversation_id=conversation.id,
-        type=MessageType.SYSTEM,
-        content="Welcome to SignalIQ! Ask me to find companies or people based on your criteria."
-    )
-    
-    db.add(welcome_message)
-    await db.commit()
     
     return ConversationResponse(
         id=str(conversation.id),
@@ -91,7 +114,7 @@ async def create_conversation(
 @router.get("/{conversation_id}", response_model=ConversationResponse)
 async def get_conversation(
     conversation_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific conversation"""
@@ -119,10 +142,38 @@ async def get_conversation(
     )
 
 
+@router.delete("/{conversation_id}")
+async def delete_conversation(
+    conversation_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a conversation with its messages and leads"""
+    # One statement; messages and leads go through ON DELETE CASCADE and
+    # lead tables created from it are kept (SET NULL)
+    result = await db.execute(
+        delete(Conversation)
+        .where(
+            Conversation.id == conversation_id,
+            Conversation.user_id == current_user.id
+        )
+    )
+    
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    
+    await db.commit()
+    
+    return {"message": "Conversation deleted successfully"}
+
+
 @router.get("/{conversation_id}/messages", response_model=List[MessageResponse])
 async def get_conversation_messages(
     conversation_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all messages for a conversation"""
@@ -143,23 +194,21 @@ async def get_conversation_messages(
     
     # Get messages
     result = await db.execute(
-        select(Message)
+        select(Message.id, Message.conversation_id, Message.type, Message.content, Message.created_at)
         .where(Message.conversation_id == conversation_id)
         .order_by(Message.created_at.asc())
     )
     
-    messages = result.scalars().all()
-    
-    return [
-        MessageResponse(
-            id=str(msg.id),
-            conversation_id=str(msg.conversation_id),
-            type=msg.type.value,
-            content=msg.content,
-            created_at=msg.created_at
-        )
-        for msg in messages
-    ]
+    return fast_json([
+        {
+            "id": str(msg_id),
+            "conversation_id": str(msg_conversation_id),
+            "type": msg_type.value,
+            "content": content,
+            "created_at": created_at,
+        }
+        for msg_id, msg_conversation_id, msg_type, content, created_at in result.all()
+    ])
 
 
 @router.post("/{conversation_id}/messages", response_model=MessageResponse)
@@ -170,23 +219,24 @@ async def create_message(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new message in a conversation"""
-    # Verify conversation belongs to user
-    conv_result = await db.execute(
-        select(Conversation)
+    # Touching the conversation's timestamp also verifies it belongs to the user
+    touched = await db.scalar(
+        update(Conversation)
         .where(
             Conversation.id == conversation_id,
             Conversation.user_id == current_user.id
         )
+        .values(updated_at=func.now())
+        .returning(Conversation.id)
+        .execution_options(synchronize_session=False)
     )
-    
-    conversation = conv_result.scalar_one_or_none()
-    if not conversation:
+    if not touched:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
     
-    # Create message
+    # Create message; created_at comes back with the INSERT
     message = Message(
         conversation_id=conversation_id,
         type=MessageType(message_in.type),
@@ -194,12 +244,7 @@ async def create_message(
     )
     
     db.add(message)
-    
-    # Update conversation timestamp
-    conversation.updated_at = func.now()
-    
     await db.commit()
-    await db.refresh(message)
     
     return MessageResponse(
         id=str(message.id),
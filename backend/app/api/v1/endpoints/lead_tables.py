@@ -1,52 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import any_, bindparam, select, func, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from pathlib import PurePath
+from typing import Any, Dict, List, Optional
 from uuid import UUID
+import asyncio
 
-from app.deps import get_db, get_current_user
+from app.core.background import spawn
+from app.core.http_cache import make_etag, not_modified, set_etag
+from app.core.idempotency import idempotent
+from app.core.rate_limit import rate_limit_ai
+from app.core.responses import fast_json
+from app.deps import get_db, get_current_user, get_read_db
 from app.models.user import User
 from app.models.lead_table import LeadTable
 from app.models.lead_column import LeadColumn
-from app.models.lead_row import LeadRow
+from app.models.lead_row import EntityType, LeadRow
 from app.models.lead_cell import LeadCell
+from app.services import lead_query
 from app.schemas.lead_tables import (
-    LeadTableCreate, LeadTableUpdate, LeadTableResponse,
-    LeadTableWithData, LeadRowData
+    LeadTableCreate, LeadTableUpdate, LeadTableResponse, LeadTableSummary,
+    LeadTableWithData, LeadSearchHit, ColumnEnrichmentRequest, ColumnEnrichmentStatus,
+    CellUpdateRequest, CellUpdateResponse,
+    LeadTableDuplicate, LeadTableMerge, LeadTableCopyResponse, LeadTableFacets
 )
+from app.services.enrichment_service import EnrichmentConflict, EnrichmentService
+from app.services.lead_facets import FacetService, facet_cache_key, get_facet_cache, parse_bands, parse_facet_columns
+from app.services.import_service import ImportService, LeadImportError, detect_format, open_records
+from app.services.lead_service import CellUpdateError, LeadService
 
 router = APIRouter()
+lead_service = LeadService()
+enrichment_service = EnrichmentService()
+import_service = ImportService()
+facet_service = FacetService()
 
 
-@router.get("/", response_model=List[LeadTableResponse])
+@router.get("/", response_model=List[LeadTableSummary])
 async def get_lead_tables(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all lead tables for the current user"""
+    """Get a page of the current user's lead tables with their cached statistics"""
+    # One query: the page, and the user's table count as a window over it
     result = await db.execute(
-        select(LeadTable)
-        .where(LeadTable.user_id == current_user.id)
-        .order_by(LeadTable.updated_at.desc())
+        select(LeadTable, func.count().over().label("total"))
+        .where(LeadTable.user_id == current_user.id, LeadTable.deleted_at.is_(None))
+        .order_by(LeadTable.updated_at.desc(), LeadTable.id)
+        .limit(limit)
+        .offset(offset)
     )
     
-    tables = result.scalars().all()
+    rows = result.all()
+    total = rows[0].total if rows else 0
+    if not rows and offset:
+        # Past the last page the window has no rows to count
+        total = await db.scalar(
+            select(func.count())
+            .select_from(LeadTable)
+            .where(LeadTable.user_id == current_user.id, LeadTable.deleted_at.is_(None))
+        )
+    response.headers["X-Total-Count"] = str(total)
     
     return [
-        LeadTableResponse(
+        LeadTableSummary(
             id=str(table.id),
             user_id=str(table.user_id),
             name=table.name,
             description=table.description,
+            table_type=table.table_type,
+            default_columns=table.default_columns or [],
             created_at=table.created_at,
-            updated_at=table.updated_at
+            updated_at=table.updated_at,
+            row_count=table.row_count,
+            column_count=table.column_count,
+            entity_counts={"company": table.company_count, "person": table.person_count},
+            last_ingested_at=table.last_ingested_at
         )
-        for table in tables
+        for table, _ in rows
     ]
 
 
 @router.post("/", response_model=LeadTableResponse)
+@idempotent
 async def create_lead_table(
     table_in: LeadTableCreate,
     db: AsyncSession = Depends(get_db),
@@ -61,7 +103,6 @@ async def create_lead_table(
     
     db.add(lead_table)
     await db.commit()
-    await db.refresh(lead_table)
     
     return LeadTableResponse(
         id=str(lead_table.id),
@@ -73,19 +114,168 @@ async def create_lead_table(
     )
 
 
+async def _copy_into_new_table(
+    db: AsyncSession,
+    sources: List[LeadTable],
+    user_id: UUID,
+    name: str,
+    description: Optional[str],
+    dedupe_on: Optional[str]
+) -> LeadTableCopyResponse:
+    """Create a table and fill it from ``sources`` in one transaction"""
+    if dedupe_on:
+        has_column = await db.scalar(
+            select(func.count())
+            .select_from(LeadColumn)
+            .where(
+                LeadColumn.lead_table_id.in_([source.id for source in sources]),
+                LeadColumn.name == dedupe_on
+            )
+        )
+        if not has_column:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown column: {dedupe_on}"
+            )
+    
+    table_types = {source.table_type for source in sources}
+    lead_table = LeadTable(
+        user_id=user_id,
+        name=name,
+        description=description,
+        table_type=table_types.pop() if len(table_types) == 1 else "custom",
+        default_columns=sources[0].default_columns
+    )
+    db.add(lead_table)
+    await db.flush()
+    
+    rows, cells = await lead_service.copy_rows(db, [source.id for source in sources], lead_table.id, dedupe_on)
+    await db.commit()
+    
+    return LeadTableCopyResponse(
+        id=str(lead_table.id),
+        user_id=str(lead_table.user_id),
+        name=lead_table.name,
+        description=lead_table.description,
+        table_type=lead_table.table_type,
+        default_columns=lead_table.default_columns or [],
+        created_at=lead_table.created_at,
+        updated_at=lead_table.updated_at,
+        rows_copied=rows,
+        cells_copied=cells
+    )
+
+
+@router.post("/merge", response_model=LeadTableCopyResponse)
+@idempotent
+async def merge_lead_tables(
+    merge_in: LeadTableMerge,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Merge several lead tables into a new one, matching columns by name"""
+    table_ids = merge_in.table_ids
+    if len(set(table_ids)) != len(table_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="table_ids must name each table once"
+        )
+    result = await db.execute(
+        select(LeadTable)
+        .where(
+            LeadTable.id.in_(table_ids),
+            LeadTable.user_id == current_user.id,
+            LeadTable.deleted_at.is_(None)
+        )
+    )
+    tables_by_id = {table.id: table for table in result.scalars().all()}
+    if len(tables_by_id) != len(table_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lead table not found"
+        )
+    
+    return await _copy_into_new_table(
+        db,
+        [tables_by_id[table_id] for table_id in table_ids],
+        current_user.id,
+        merge_in.name,
+        merge_in.description,
+        merge_in.dedupe_on
+    )
+
+
+@router.post("/import")
+async def import_lead_table(
+    file: UploadFile = File(..., description="CSV file with a header row, or NDJSON (one JSON object per line)"),
+    name: Optional[str] = Form(None),
+    description: Optional[str] = Form(None),
+    format: Optional[str] = Form(None, description="csv or ndjson; detected from the file name by default"),
+    table_type: str = Form("companies"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import a CSV or NDJSON file into a new lead table, streaming NDJSON
+    progress events while the rows load
+    """
+    try:
+        import_format = detect_format(file.filename, file.content_type, format)
+        header, records = await asyncio.to_thread(open_records, file.file, import_format)
+    except LeadImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    lead_table = LeadTable(
+        user_id=current_user.id,
+        name=name or PurePath(file.filename or "Imported leads").stem,
+        description=description,
+        table_type=table_type
+    )
+    db.add(lead_table)
+    await db.commit()
+    
+    entity_type = EntityType.PERSON if table_type == "people" else EntityType.COMPANY
+    return StreamingResponse(
+        import_service.run(lead_table.id, header, records, entity_type),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get("/search", response_model=List[LeadSearchHit])
+async def search_leads(
+    q: str = Query(..., min_length=1, max_length=500, description="Web-search style query, e.g. series b fintech berlin"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Full-text search across all of the current user's lead tables, best matches first"""
+    hits = await lead_service.search_leads(db, current_user.id, q, limit)
+    return fast_json(hits)
+
+
 @router.get("/{table_id}", response_model=LeadTableWithData)
 async def get_lead_table(
     table_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    filters: List[str] = Query([], alias="filter", description="<column>:<op>:<value>; op is one of eq, contains, gt, gte, lt, lte, in"),
+    sort: List[str] = Query([], description="Column name, prefixed with - for descending order"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a specific lead table with all its data"""
+    """Get a specific lead table with its data, optionally filtered, sorted and paginated"""
     # Get the table
     result = await db.execute(
         select(LeadTable)
         .where(
             LeadTable.id == table_id,
-            LeadTable.user_id == current_user.id
+            LeadTable.user_id == current_user.id,
+            LeadTable.deleted_at.is_(None)
         )
     )
     
@@ -96,63 +286,279 @@ async def get_lead_table(
             detail="Lead table not found"
         )
     
-    # Get columns
+    # Answer conditional requests before loading any rows
+    etag = make_etag("lead-table", table.id, table.version, *filters, "sort", *sort, limit, offset)
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+    
+    # Select only the needed columns; the payload is built as plain dicts and
+    # serialized once with orjson (no response_model re-validation)
     columns_result = await db.execute(
-        select(LeadColumn)
+        select(LeadColumn.id, LeadColumn.name, LeadColumn.column_type)
         .where(LeadColumn.lead_table_id == table_id)
         .order_by(LeadColumn.display_order)
     )
-    columns = columns_result.scalars().all()
+    columns = columns_result.all()
     
-    # Get rows with cells
-    rows_result = await db.execute(
-        select(LeadRow)
-        .where(LeadRow.lead_table_id == table_id)
-        .order_by(LeadRow.created_at)
-    )
-    rows = rows_result.scalars().all()
+    try:
+        columns_by_name = lead_query.column_refs(columns)
+        cell_filters = lead_query.parse_filters(filters, columns_by_name)
+        sort_keys = lead_query.parse_sort(sort, columns_by_name)
+    except lead_query.LeadQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    # Get all cells for this table
-    cells_result = await db.execute(
-        select(LeadCell)
-        .join(LeadRow)
-        .where(LeadRow.lead_table_id == table_id)
+    # Filters and sorting are evaluated in Postgres against the lead cell indexes
+    rows_query = select(LeadRow.id, LeadRow.entity_type, LeadRow.created_at, LeadRow.updated_at).where(
+        LeadRow.lead_table_id == table_id
     )
-    cells = cells_result.scalars().all()
+    rows_query = lead_query.apply_filters(rows_query, cell_filters)
+    rows_query = lead_query.apply_sort(rows_query, sort_keys)
+    if limit is not None:
+        rows_query = rows_query.limit(limit)
+    if offset:
+        rows_query = rows_query.offset(offset)
+    rows_result = await db.execute(rows_query)
+    rows = rows_result.all()
     
+    if cell_filters or limit is not None or offset:
+        # Only the cells of the selected rows
+        cells_query = select(LeadCell.row_id, LeadCell.column_id, LeadCell.value).where(
+            LeadCell.row_id == any_(bindparam("row_ids", [row.id for row in rows], type_=ARRAY(PG_UUID(as_uuid=True))))
+        )
+    else:
+        # Get all cells for this table
+        cells_query = (
+            select(LeadCell.row_id, LeadCell.column_id, LeadCell.value)
+            .join(LeadRow)
+            .where(LeadRow.lead_table_id == table_id)
+        )
+    cells = (await db.execute(cells_query)).all() if rows else []
+    
+    return fast_json(build_table_payload(table, columns, rows, cells), response)
+
+
+def build_table_payload(table: LeadTable, columns, rows, cells) -> Dict[str, Any]:
+    """
+    ``LeadTableWithData``-shaped dict from (id, name[, column_type]) columns,
+    (id, entity_type, created_at, updated_at) rows and (row_id, column_id, value) cells
+    """
     # Organize cells by row
     cells_by_row = {}
-    for cell in cells:
-        if cell.row_id not in cells_by_row:
-            cells_by_row[cell.row_id] = {}
-        cells_by_row[cell.row_id][cell.column_id] = cell.value
+    for row_id, column_id, value in cells:
+        row_cells = cells_by_row.get(row_id)
+        if row_cells is None:
+            row_cells = cells_by_row[row_id] = {}
+        row_cells[column_id] = value
+    
+    column_names = [(column[0], column[1]) for column in columns]
     
     # Build row data
     row_data = []
-    for row in rows:
-        row_cells = cells_by_row.get(row.id, {})
-        data = {}
-        for column in columns:
-            data[column.name] = row_cells.get(column.id)
+    for row_id, entity_type, created_at, updated_at in rows:
+        row_cells = cells_by_row.get(row_id, {})
+        row_data.append({
+            "id": str(row_id),
+            "entity_type": entity_type.value,
+            "data": {name: row_cells.get(column_id) for column_id, name in column_names},
+            "created_at": created_at,
+            "updated_at": updated_at,
+        })
+    
+    return {
+        "id": str(table.id),
+        "user_id": str(table.user_id),
+        "name": table.name,
+        "description": table.description,
+        "table_type": table.table_type,
+        "default_columns": table.default_columns or [],
+        "created_at": table.created_at,
+        "updated_at": table.updated_at,
+        "columns": [name for _, name in column_names],
+        "rows": row_data,
+    }
+
+
+@router.get("/{table_id}/facets", response_model=LeadTableFacets)
+async def get_lead_table_facets(
+    table_id: UUID,
+    response: Response,
+    columns: List[str] = Query([], description="Column names (repeated or comma-separated); all columns by default"),
+    filters: List[str] = Query([], alias="filter", description="<column>:<op>:<value>, as for GET /lead-tables/{id}"),
+    bands: List[str] = Query([], description="<column>:<b1>|<b2>|... band boundaries for a number column"),
+    top: int = Query(10, ge=1, le=100, description="Most frequent values per text column"),
+    buckets: int = Query(10, ge=1, le=50, description="Equal-width histogram buckets per number column"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Top values of text columns and histograms of number columns, computed in the database"""
+    table = await lead_service.get_lead_table(db, str(table_id), current_user.id)
+    if not table:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lead table not found"
+        )
+    
+    etag = make_etag("lead-table-facets", table.id, table.version, *columns, "filter", *filters, "bands", *bands, top, buckets)
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+    
+    # The key carries the version, so writes to the table invalidate it
+    cache_key = facet_cache_key(table.id, table.version, columns, filters, bands, top, buckets)
+    facets = await get_facet_cache().get(cache_key)
+    if facets is None:
+        columns_result = await db.execute(
+            select(LeadColumn.id, LeadColumn.name, LeadColumn.column_type)
+            .where(LeadColumn.lead_table_id == table_id)
+            .order_by(LeadColumn.display_order)
+        )
+        columns_by_name = lead_query.column_refs(columns_result.all())
         
-        row_data.append(LeadRowData(
-            id=str(row.id),
-            entity_type=row.entity_type.value,
-            data=data,
-            created_at=row.created_at,
-            updated_at=row.updated_at
-        ))
-    
-    return LeadTableWithData(
-        id=str(table.id),
-        user_id=str(table.user_id),
-        name=table.name,
-        description=table.description,
-        created_at=table.created_at,
-        updated_at=table.updated_at,
-        columns=[col.name for col in columns],
-        rows=row_data
+        try:
+            selected = parse_facet_columns(columns, columns_by_name)
+            cell_filters = lead_query.parse_filters(filters, columns_by_name)
+            column_bands = parse_bands(bands, columns_by_name)
+        except lead_query.LeadQueryError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        result = await facet_service.facets(
+            db, table.id, table.row_count, selected, cell_filters, column_bands, top, buckets
+        )
+        facets = {"table_id": str(table.id), "version": table.version, **result}
+        await get_facet_cache().set(cache_key, facets)
+    
+    return fast_json(facets, response)
+
+
+@router.post("/{table_id}/duplicate", response_model=LeadTableCopyResponse)
+@idempotent
+async def duplicate_lead_table(
+    table_id: UUID,
+    duplicate_in: LeadTableDuplicate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Copy a lead table with all its columns, rows and cells, optionally deduplicated"""
+    table = await lead_service.get_lead_table(db, str(table_id), current_user.id)
+    if not table:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lead table not found"
+        )
+    
+    return await _copy_into_new_table(
+        db,
+        [table],
+        current_user.id,
+        duplicate_in.name or f"{table.name} (copy)",
+        table.description,
+        duplicate_in.dedupe_on
+    )
+
+
+@router.patch("/{table_id}/cells", response_model=CellUpdateResponse)
+async def update_cells(
+    table_id: UUID,
+    update_in: CellUpdateRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Set many cells at once; batched upserts on (row_id, column_id)"""
+    table = await lead_service.get_lead_table(db, str(table_id), current_user.id)
+    if not table:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lead table not found"
+        )
+    
+    try:
+        updated = await lead_service.upsert_cells(
+            db,
+            table.id,
+            [{"row_id": change.row_id, "column": change.column, "value": change.value} for change in update_in.changes]
+        )
+    except CellUpdateError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return CellUpdateResponse(updated=updated)
+
+
+@router.post(
+    "/{table_id}/columns/enrich",
+    response_model=ColumnEnrichmentStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(rate_limit_ai)]
+)
+async def enrich_column(
+    table_id: UUID,
+    enrichment_in: ColumnEnrichmentRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Add a column and fill it for the existing rows in the background, in
+    small LLM batches. Posting an enriched column again resumes it and fills
+    rows added since.
+    """
+    table = await lead_service.get_lead_table(db, str(table_id), current_user.id)
+    if not table:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lead table not found"
+        )
+    
+    try:
+        column = await enrichment_service.start(db, table, enrichment_in.name, enrichment_in.instructions)
+    except EnrichmentConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    
+    spawn(enrichment_service.run(column.id), name=f"enrich-column-{column.id}")
+    return ColumnEnrichmentStatus(**enrichment_service.status(column))
+
+
+@router.get("/{table_id}/columns/{column_id}/enrichment", response_model=ColumnEnrichmentStatus)
+async def get_column_enrichment(
+    table_id: UUID,
+    column_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Progress of a column enrichment"""
+    result = await db.execute(
+        select(LeadColumn)
+        .join(LeadTable, LeadTable.id == LeadColumn.lead_table_id)
+        .where(
+            LeadColumn.id == column_id,
+            LeadColumn.lead_table_id == table_id,
+            LeadTable.user_id == current_user.id,
+            LeadTable.deleted_at.is_(None)
+        )
     )
+    
+    column = result.scalar_one_or_none()
+    if not column or column.enrichment is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Column enrichment not found"
+        )
+    
+    return ColumnEnrichmentStatus(**enrichment_service.status(column))
 
 
 @router.put("/{table_id}", response_model=LeadTableResponse)
@@ -163,28 +569,25 @@ async def update_lead_table(
     current_user: User = Depends(get_current_user)
 ):
     """Update a lead table"""
-    result = await db.execute(
-        select(LeadTable)
+    # One UPDATE ... RETURNING; the ownership check is part of its WHERE
+    table = await db.scalar(
+        update(LeadTable)
         .where(
             LeadTable.id == table_id,
-            LeadTable.user_id == current_user.id
+            LeadTable.user_id == current_user.id,
+            LeadTable.deleted_at.is_(None)
         )
+        .values(**table_update.dict(exclude_unset=True), updated_at=func.now())
+        .returning(LeadTable)
+        .execution_options(populate_existing=True)
     )
-    
-    table = result.scalar_one_or_none()
     if not table:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Lead table not found"
         )
     
-    # Update fields
-    update_data = table_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(table, field, value)
-    
     await db.commit()
-    await db.refresh(table)
     
     return LeadTableResponse(
         id=str(table.id),
@@ -199,26 +602,25 @@ async def update_lead_table(
 @router.delete("/{table_id}")
 async def delete_lead_table(
     table_id: UUID,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete a lead table"""
-    result = await db.execute(
-        select(LeadTable)
-        .where(
-            LeadTable.id == table_id,
-            LeadTable.user_id == current_user.id
-        )
-    )
-    
-    table = result.scalar_one_or_none()
+    """Delete a lead table; very large tables are removed in the background (202)"""
+    table = await lead_service.get_lead_table(db, str(table_id), current_user.id)
     if not table:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Lead table not found"
         )
     
-    await db.delete(table)
-    await db.commit()
+    scheduled = await lead_service.delete_lead_table(db, table)
+    # Drop the table's cached facets in every worker
+    await get_facet_cache().invalidate(f"{table.id}:")
+    
+    if scheduled:
+        spawn(lead_service.purge_table(table.id), name=f"purge-table-{table.id}")
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Lead table deletion scheduled"}
     
-    return {"message": "Lead table deleted successfully"}
\ No newline at end of file
+    return {"message": "Lead table deleted successfully"}
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Header
-from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
+from typing import Optional
 
+from app.core.http_cache import make_etag, not_modified, set_etag
+from app.core.idempotency import idempotent
+from app.core.rate_limit import rate_limit_ai
+from app.deps import get_db, get_current_user, get_read_db
+from app.models.user import User
 from app.schemas.leads import LeadGenerationRequest, LeadGenerationResponse, ConversationLeadsResponse
 from app.services.lead_generator import LeadGeneratorService
 from app.services.lead_service import LeadService
@@ -13,7 +19,8 @@ lead_service = LeadGeneratorService()
 lead_data_service = LeadService()
 
 
-@router.post("/generate", response_model=LeadGenerationResponse)
+@router.post("/generate", response_model=LeadGenerationResponse, dependencies=[Depends(rate_limit_ai)])
+@idempotent
 async def generate_leads(
     request: LeadGenerationRequest,
     db: AsyncSession = Depends(get_db),
@@ -58,6 +65,8 @@ async def generate_leads(
             lead_table_id=str(lead_table.id)
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in generate_leads: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -66,14 +75,25 @@ async def generate_leads(
 @router.get("/tables/{table_id}", response_model=ConversationLeadsResponse)
 async def get_table_leads(
     table_id: str,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all leads for a table"""
     try:
-        leads_data = await lead_data_service.get_table_leads(
-            db, table_id, current_user.id
-        )
+        lead_table = await lead_data_service.get_lead_table(db, table_id, current_user.id)
+        if not lead_table:
+            return ConversationLeadsResponse(leads=[], columns=[])
+        
+        # Answer conditional requests before loading any rows
+        etag = make_etag("table-leads", lead_table.id, lead_table.version)
+        cached = not_modified(if_none_match, etag)
+        if cached:
+            return cached
+        set_etag(response, etag)
+        
+        leads_data = await lead_data_service.load_table_leads(db, lead_table)
         
         return ConversationLeadsResponse(
             leads=leads_data["leads"],
@@ -5,10 +5,12 @@ from typing import Optional, Dict, Any, List
 from uuid import UUID
 from pydantic import BaseModel
 
+from app.core.idempotency import idempotent
+from app.core.rate_limit import rate_limit_ai
 from app.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.ideal_customer_profile import IdealCustomerProfile
-from app.services.ai_service import ai_service
+from app.services.ai_service import AIServiceInterface, get_ai_service
 
 router = APIRouter()
 
@@ -33,11 +35,13 @@ class SignalGenerationResponse(BaseModel):
     additional_recommendations: List[str]
 
 
-@router.post("/generate", response_model=SignalGenerationResponse)
+@router.post("/generate", response_model=SignalGenerationResponse, dependencies=[Depends(rate_limit_ai)])
+@idempotent
 async def generate_signals(
     request: SignalGenerationRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIServiceInterface = Depends(get_ai_service)
 ):
     """Generate lead tracking signals based on ICP profile"""
     try:
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select, func, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from app.deps import get_db, get_current_user
+from app.core.http_cache import make_etag, not_modified, set_etag
+from app.core.responses import fast_json
+from app.deps import get_db, get_current_user, get_read_db
 from app.models.user import User
 from app.models.user_profile import UserProfile
 from app.models.ideal_customer_profile import IdealCustomerProfile
@@ -40,7 +43,6 @@ async def get_user_profile(
         )
         db.add(profile)
         await db.commit()
-        await db.refresh(profile)
     
     return UserProfileResponse(
         id=str(profile.id),
@@ -58,25 +60,20 @@ async def update_user_profile(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Update current user's profile"""
-    result = await db.execute(
-        select(UserProfile)
-        .where(UserProfile.user_id == current_user.id)
-    )
-    
-    profile = result.scalar_one_or_none()
-    if not profile:
-        # Create new profile
-        profile = UserProfile(user_id=current_user.id)
-        db.add(profile)
-    
-    # Update fields
+    """Update current user's profile, creating it if needed"""
+    # One upsert returning the profile, instead of a select, a write and a refresh
     update_data = profile_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(profile, field, value)
-    
+    profile = await db.scalar(
+        insert(UserProfile)
+        .values(user_id=current_user.id, **update_data)
+        .on_conflict_do_update(
+            index_elements=[UserProfile.user_id],
+            set_={**update_data, "updated_at": func.now()}
+        )
+        .returning(UserProfile)
+        .execution_options(populate_existing=True)
+    )
     await db.commit()
-    await db.refresh(profile)
     
     return UserProfileResponse(
         id=str(profile.id),
@@ -90,10 +87,23 @@ async def update_user_profile(
 
 @router.get("/icp-profiles", response_model=List[ICPResponse])
 async def get_icp_profiles(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all ICP profiles for current user"""
+    # Answer conditional requests from a cheap aggregate before loading profiles
+    validator = await db.execute(
+        select(func.count(IdealCustomerProfile.id), func.max(IdealCustomerProfile.updated_at))
+        .where(IdealCustomerProfile.user_id == current_user.id)
+    )
+    etag = make_etag("icp-profiles", current_user.id, *validator.one())
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+    
     result = await db.execute(
         select(IdealCustomerProfile)
         .where(IdealCustomerProfile.user_id == current_user.id)
@@ -102,23 +112,23 @@ async def get_icp_profiles(
     
     profiles = result.scalars().all()
     
-    return [
-        ICPResponse(
-            id=str(profile.id),
-            user_id=str(profile.user_id),
-            name=profile.name,
-            solution_products=profile.solution_products,
-            target_region=profile.target_region,
-            target_customers=profile.target_customers,
-            company_sizes=profile.company_sizes,
-            funding_stages=profile.funding_stages,
-            locations=profile.locations,
-            titles=profile.titles,
-            created_at=profile.created_at,
-            updated_at=profile.updated_at
-        )
+    return fast_json([
+        {
+            "id": str(profile.id),
+            "user_id": str(profile.user_id),
+            "name": profile.name,
+            "solution_products": profile.solution_products,
+            "target_region": profile.target_region,
+            "target_customers": profile.target_customers,
+            "company_sizes": profile.company_sizes,
+            "funding_stages": profile.funding_stages,
+            "locations": profile.locations,
+            "titles": profile.titles,
+            "created_at": profile.created_at,
+            "updated_at": profile.updated_at,
+        }
         for profile in profiles
-    ]
+    ], response)
 
 
 @router.post("/icp-profiles", response_model=ICPResponse)
@@ -135,7 +145,6 @@ async def create_icp_profile(
     
     db.add(icp)
     await db.commit()
-    await db.refresh(icp)
     
     return ICPResponse(
         id=str(icp.id),
@@ -161,28 +170,24 @@ async def update_icp_profile(
     current_user: User = Depends(get_current_user)
 ):
     """Update an ICP profile"""
-    result = await db.execute(
-        select(IdealCustomerProfile)
+    # One UPDATE ... RETURNING; the ownership check is part of its WHERE
+    icp = await db.scalar(
+        update(IdealCustomerProfile)
         .where(
             IdealCustomerProfile.id == icp_id,
             IdealCustomerProfile.user_id == current_user.id
         )
+        .values(**icp_update.dict(exclude_unset=True), updated_at=func.now())
+        .returning(IdealCustomerProfile)
+        .execution_options(populate_existing=True)
     )
-    
-    icp = result.scalar_one_or_none()
     if not icp:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ICP profile not found"
         )
     
-    # Update fields
-    update_data = icp_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(icp, field, value)
-    
     await db.commit()
-    await db.refresh(icp)
     
     return ICPResponse(
         id=str(icp.id),
@@ -207,22 +212,21 @@ async def delete_icp_profile(
     current_user: User = Depends(get_current_user)
 ):
     """Delete an ICP profile"""
+    # One statement; its signals go through ON DELETE CASCADE
     result = await db.execute(
-        select(IdealCustomerProfile)
+        delete(IdealCustomerProfile)
         .where(
             IdealCustomerProfile.id == icp_id,
             IdealCustomerProfile.user_id == current_user.id
         )
     )
     
-    icp = result.scalar_one_or_none()
-    if not icp:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ICP profile not found"
         )
     
-    await db.delete(icp)
     await db.commit()
     
     return {"message": "ICP profile deleted successfully"}
\ No newline at end of file
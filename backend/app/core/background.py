@@ -0,0 +1,38 @@
+"""
+Background jobs started by requests (column enrichment, chunked deletes).
+
+Starlette's ``BackgroundTasks`` run inside the request's ASGI call, so a
+minutes-long job would count as part of the request in the metrics, SQL
+profile and trace. ``spawn`` runs the job as its own task in a fresh context
+instead, keeps a reference to it until it finishes and logs its failure.
+Jobs still running at shutdown are cancelled; they are resumable.
+"""
+import asyncio
+import contextvars
+import logging
+from typing import Coroutine, Set
+
+logger = logging.getLogger(__name__)
+
+_tasks: Set[asyncio.Task] = set()
+
+
+def _done(task: asyncio.Task) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        error = task.exception()
+        logger.error(f"Background job {task.get_name()} failed: {type(error).__name__}: {error}")
+
+
+def spawn(coro: Coroutine, name: str) -> asyncio.Task:
+    """Run ``coro`` detached from the current request"""
+    task = asyncio.create_task(coro, name=name, context=contextvars.Context())
+    _tasks.add(task)
+    task.add_done_callback(_done)
+    return task
+
+
+async def cancel_background_jobs() -> None:
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
@@ -1,19 +1,38 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Optional
 import os
 
 
 class Settings(BaseSettings):
+    # Secrets are only required by the clients that use them, so importing the
+    # app (tests, CLI tools, migrations) does not need every one of them
     # OpenAI Configuration
-    openai_api_key: str
+    openai_api_key: Optional[str] = None
     
     # Supabase Configuration
-    supabase_url: str
-    supabase_service_role_key: str
-    supabase_anon_key: str
+    supabase_url: Optional[str] = None
+    supabase_service_role_key: Optional[str] = None
+    supabase_anon_key: Optional[str] = None
     
     # Database Configuration
     database_url: str = ""
+    # Connections kept open per worker; 0 uses NullPool (serverless, external pooler)
+    db_pool_size: int = 0
+    db_max_overflow: int = 10
+    # Read replica (optional): read-only endpoints use it unless the user wrote
+    # in the last read_your_writes_seconds, it lags more than
+    # replica_max_lag_seconds (checked every replica_check_seconds) or it
+    # cannot be reached, in which case they read from the primary
+    replica_database_url: Optional[str] = None
+    read_your_writes_seconds: int = 5
+    replica_max_lag_seconds: float = 2.0
+    replica_check_seconds: float = 1.0
+    # A replica whose WAL receiver has not heard from the primary for this
+    # long (keepalives arrive at least every wal_sender_timeout / 2) is
+    # treated as disconnected
+    replica_max_receiver_silence_seconds: float = 60.0
+    replica_connect_timeout_seconds: float = 2.0
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -24,11 +43,86 @@ class Settings(BaseSettings):
             # You'll need to get the direct DB connection details from Supabase
             self.database_url = os.getenv("DATABASE_URL", "")
     
+    # LLM Configuration
+    # "openai" talks to the OpenAI API, "fake" returns canned responses
+    # (offline development, benchmarks)
+    llm_provider: str = "openai"
+    fake_llm_latency_ms: int = 0
+    
+    # Column enrichment: rows per LLM call, concurrent calls per job, and how
+    # long a job's lease lasts without progress before another worker resumes it
+    enrichment_batch_size: int = 20
+    enrichment_concurrency: int = 4
+    enrichment_lease_seconds: int = 120
+    
+    # Lead tables with more cells than this are deleted in the background,
+    # this many rows (and their cells) per transaction
+    chunked_delete_threshold: int = 50000
+    chunked_delete_rows: int = 1000
+    
+    # CSV/NDJSON imports: records loaded (with COPY) per transaction, and
+    # rejected lines reported individually before only being counted
+    import_batch_size: int = 5000
+    import_max_reported_errors: int = 100
+    
+    # Facet results (keyed by table version): entries kept per worker in
+    # front of the shared state, and their lifetime in the shared state
+    facet_cache_size: int = 256
+    facet_cache_ttl_seconds: int = 3600
+    
+    # AI endpoint limits per plan (users.plan): requests per sliding window
+    # and LLM tokens per UTC day, counted in the shared state
+    rate_limit_enabled: bool = True
+    rate_limit_window_seconds: int = 60
+    default_plan: str = "free"
+    rate_limits: Dict[str, int] = {"free": 10, "pro": 60, "enterprise": 300}
+    daily_token_quotas: Dict[str, int] = {"free": 100_000, "pro": 2_000_000, "enterprise": 20_000_000}
+    
+    # Idempotency-Key on expensive POST endpoints: how long responses are
+    # replayed, how long an unfinished request holds its key, and how long a
+    # duplicate waits for the original before getting a 409
+    idempotency_ttl_seconds: int = 86400
+    idempotency_lock_seconds: int = 300
+    idempotency_wait_seconds: int = 60
+    
+    # Workers and shared state
+    # Worker processes started by `python -m app.server`; 0 uses one per CPU
+    # core available to the container, up to max_workers
+    web_concurrency: int = 0
+    max_workers: int = 8
+    # "memory" (one worker only) or "redis"; defaults to redis when redis_url is set
+    state_backend: Optional[str] = None
+    redis_url: Optional[str] = None
+    
     # FastAPI Configuration
     debug: bool = True
     host: str = "0.0.0.0"
     port: int = 5000
     
+    # Startup
+    # Schema handling: "create_all" (development), "verify" (one query checking
+    # the Alembic head revision, no DDL) or "skip". Defaults to create_all when
+    # debug is on, otherwise verify.
+    db_init_mode: Optional[str] = None
+    # Open the LLM provider connection in the background at startup
+    warm_ai_clients: bool = True
+    
+    # Response compression (gzip, or brotli when installed)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_level: int = 5
+    
+    # Observability
+    metrics_enabled: bool = True
+    sql_profiler_enabled: bool = True
+    # Warn when one statement shape runs more than this many times per request
+    sql_repeat_warning_threshold: int = 10
+    # Tracing exporter: none, console, file or otlp
+    tracing_exporter: str = "none"
+    tracing_service_name: str = "signaliq-api"
+    tracing_file_path: str = "traces.jsonl"
+    otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    
     # JWT Configuration
     jwt_secret_key: str = "your-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
@@ -42,4 +136,17 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache
+def get_settings() -> Settings:
+    """Settings, read from the environment on first use"""
+    return Settings()
+
+
+class _LazySettings:
+    """Module-level ``settings`` that defers reading the environment until first use"""
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+
+settings = _LazySettings()
\ No newline at end of file
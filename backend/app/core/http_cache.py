@@ -0,0 +1,64 @@
+"""
+ETag helpers for conditional GETs.
+
+Endpoints derive a strong ETag from something cheap to read (a table's
+``version`` counter, or the row count and max ``updated_at`` of a list) and
+check ``If-None-Match`` before loading any rows, answering 304 on a match.
+"""
+import hashlib
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+# Appended to the ETag by the compression middleware, since each encoding is a
+# different representation of the resource
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from the given validator parts"""
+    raw = "|".join(part.isoformat() if isinstance(part, datetime) else str(part) for part in parts)
+    return '"' + hashlib.sha1(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_for_encoding(etag: str, encoding: str) -> str:
+    """ETag of the ``encoding`` (br or gzip) representation of a resource"""
+    if not etag.endswith('"') or _strip_encoding(etag) != etag:
+        return etag
+    return etag[:-1] + ("-br" if encoding == "br" else "-gzip") + '"'
+
+
+def _strip_encoding(tag: str) -> str:
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches ``etag`` (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if _strip_encoding(tag) == etag:
+            return True
+    return False
+
+
+def not_modified(if_none_match: Optional[str], etag: str) -> Optional[Response]:
+    """A 304 response when the client already holds ``etag``, otherwise None"""
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Attach ``etag`` and make clients revalidate before reusing the response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
@@ -0,0 +1,215 @@
+"""
+``Idempotency-Key`` support for expensive POST endpoints.
+
+Endpoints opt in with the ``@idempotent`` decorator. When a request to one
+of them carries an ``Idempotency-Key`` header, ``IdempotencyMiddleware``
+claims the key in the shared state (per user) before running the endpoint
+and stores the response afterwards. A duplicate of that request:
+
+- gets the stored response replayed, with ``Idempotent-Replayed: true``,
+  for ``idempotency_ttl_seconds``
+- waits up to ``idempotency_wait_seconds`` while the original is still
+  running, then gets its response (or a 409 with ``Retry-After``)
+- gets a 422 when it reuses the key with a different method, path or body
+
+Server errors, 409s and 429s are not stored, so retrying them runs the
+endpoint again. Requests without the header are not affected.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from fastapi import status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.routing import match_route
+from app.core.security import bearer_subject
+from app.core.state import KEY_PREFIX, get_state
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# How often a duplicate checks whether the original request has finished
+POLL_SECONDS = 0.25
+# Responses with these statuses are worth retrying, so they are not replayed
+_NOT_STORED = (status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS)
+# Recomputed on replay
+_SKIPPED_HEADERS = (b"content-length",)
+
+PENDING = "pending"
+DONE = "done"
+
+Endpoint = TypeVar("Endpoint", bound=Callable)
+
+
+def idempotent(endpoint: Endpoint) -> Endpoint:
+    """Mark a POST endpoint as honouring ``Idempotency-Key``; apply below the route decorator"""
+    endpoint.idempotent = True
+    return endpoint
+
+
+def _is_idempotent(scope: Scope) -> bool:
+    route = match_route(scope)
+    return getattr(getattr(route, "endpoint", None), "idempotent", False)
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _fingerprint(scope: Scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (scope["method"], scope["path"], scope.get("query_string", b"").decode("latin-1")):
+        digest.update(part.encode() + b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _error(status_code: int, detail: str, headers: Optional[dict] = None) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+class IdempotencyMiddleware:
+    """Replays stored responses of ``@idempotent`` endpoints for repeated ``Idempotency-Key`` values"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = _header(scope, IDEMPOTENCY_HEADER.encode())
+        if idempotency_key is None or not _is_idempotent(scope):
+            await self.app(scope, receive, send)
+            return
+        user_id = bearer_subject(_header(scope, b"authorization"))
+        if user_id is None:
+            # Unauthenticated; the endpoint rejects it
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            response = _error(
+                status.HTTP_400_BAD_REQUEST, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        fingerprint = _fingerprint(scope, body)
+        key_digest = hashlib.sha256(idempotency_key.encode()).hexdigest()
+        key = f"{KEY_PREFIX}idempotency:{user_id}:{key_digest}"
+
+        stored = await self._claim_or_wait(key, fingerprint)
+        if isinstance(stored, JSONResponse):
+            await stored(scope, receive, send)
+            return
+        if stored is not None:
+            await self._replay(stored, send)
+            return
+        await self._run(scope, receive, send, body, key, fingerprint)
+
+    async def _claim_or_wait(self, key: str, fingerprint: str):
+        """
+        None once this request owns the key, the stored response of an earlier
+        request, or an error response
+        """
+        state = get_state()
+        pending = json.dumps({"state": PENDING, "fingerprint": fingerprint})
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.idempotency_wait_seconds
+        while True:
+            if await state.set(key, pending, ttl=settings.idempotency_lock_seconds, only_if_missing=True):
+                return None
+            raw = await state.get(key)
+            if raw is None:
+                # The original failed (or expired) between the two calls; claim again
+                continue
+            entry = json.loads(raw)
+            if entry["fingerprint"] != fingerprint:
+                return _error(
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    "Idempotency-Key was already used with a different request",
+                )
+            if entry["state"] == DONE:
+                return entry
+            if loop.time() >= deadline:
+                return _error(
+                    status.HTTP_409_CONFLICT,
+                    "A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": str(max(1, round(settings.idempotency_wait_seconds / 2)))},
+                )
+            await asyncio.sleep(POLL_SECONDS)
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send, body: bytes, key: str, fingerprint: str) -> None:
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = None
+        headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        state = get_state()
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await state.delete(key)
+            raise
+
+        if status_code is None or status_code >= 500 or status_code in _NOT_STORED:
+            await state.delete(key)
+            return
+        entry = {
+            "state": DONE,
+            "fingerprint": fingerprint,
+            "status": status_code,
+            "headers": [
+                [name.decode("latin-1"), value.decode("latin-1")]
+                for name, value in headers
+                if name.lower() not in _SKIPPED_HEADERS
+            ],
+            "body": base64.b64encode(b"".join(chunks)).decode(),
+        }
+        await state.set(key, json.dumps(entry), ttl=settings.idempotency_ttl_seconds)
+
+    async def _replay(self, entry: dict, send: Send) -> None:
+        body = base64.b64decode(entry["body"])
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in entry["headers"]]
+        headers.append((b"content-length", str(len(body)).encode()))
+        headers.append((REPLAYED_HEADER.lower().encode(), b"true"))
+        await send({"type": "http.response.start", "status": entry["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": body})
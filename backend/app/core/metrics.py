@@ -0,0 +1,197 @@
+"""
+Prometheus metrics for the API, database and LLM hot paths.
+
+Collectors are plain ``prometheus_client`` objects, so recording a sample is
+a lock and a float add. With several workers, set ``PROMETHEUS_MULTIPROC_DIR``
+to a shared, empty directory; each worker then writes its samples there and
+``/metrics`` aggregates all of them.
+
+Cache hit ratio for a caching layer ``x``:
+``rate(signaliq_cache_requests_total{cache="x",result="hit"}[5m]) / rate(signaliq_cache_requests_total{cache="x"}[5m])``
+"""
+import os
+import time
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.routing import route_template
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# HTTP
+REQUEST_DURATION = Histogram(
+    "signaliq_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "signaliq_http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# Database
+DB_POOL_CHECKOUT = Histogram(
+    "signaliq_db_pool_checkout_seconds",
+    "Time spent acquiring a database connection from the pool",
+    buckets=DB_BUCKETS,
+)
+DB_QUERIES = Counter(
+    "signaliq_db_queries_total",
+    "SQL statements executed",
+    ["statement"],
+)
+DB_QUERY_DURATION = Histogram(
+    "signaliq_db_query_duration_seconds",
+    "SQL statement execution time",
+    ["statement"],
+    buckets=DB_BUCKETS,
+)
+DB_READ_SESSIONS = Counter(
+    "signaliq_db_read_sessions_total",
+    "Sessions of read-only endpoints by database and the reason it was chosen",
+    ["target", "reason"],
+)
+DB_REPLICA_LAG = Gauge(
+    "signaliq_db_replica_lag_seconds",
+    "Replication lag of the read replica at the last check",
+    multiprocess_mode="max",
+)
+
+# LLM
+LLM_REQUEST_DURATION = Histogram(
+    "signaliq_llm_request_duration_seconds",
+    "LLM call latency by template",
+    ["template", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "signaliq_llm_tokens_total",
+    "LLM tokens used by template",
+    ["template", "model", "type"],
+)
+LLM_ERRORS = Counter(
+    "signaliq_llm_errors_total",
+    "Failed LLM template executions",
+    ["template", "error"],
+)
+
+# Caches
+CACHE_REQUESTS = Counter(
+    "signaliq_cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+)
+
+STATEMENT_TYPES = {"select", "insert", "update", "delete", "with", "copy"}
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a lookup against one of our caching layers"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_read_session(target: str, reason: str) -> None:
+    """Count a read-only endpoint session served by ``target`` (replica or primary)"""
+    DB_READ_SESSIONS.labels(target, reason).inc()
+
+
+def record_llm_usage(template: str, model: str, usage) -> None:
+    """Record prompt/completion token counts from an OpenAI ``usage`` object"""
+    if usage is None:
+        return
+    LLM_TOKENS.labels(template, model, "prompt").inc(usage.prompt_tokens or 0)
+    LLM_TOKENS.labels(template, model, "completion").inc(usage.completion_tokens or 0)
+
+
+def statement_type(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return keyword if keyword in STATEMENT_TYPES else "other"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+    kind = statement_type(statement)
+    DB_QUERIES.labels(kind).inc()
+    DB_QUERY_DURATION.labels(kind).observe(elapsed)
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("metrics_query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count and time every statement the engine executes"""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition-format payload and content type for ``/metrics``"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess directory"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """Records per-route latency and in-flight requests"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            REQUEST_DURATION.labels(method, route, str(status_code)).observe(time.perf_counter() - start)
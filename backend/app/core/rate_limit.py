@@ -0,0 +1,180 @@
+"""
+Per-user rate limits and daily token quotas for the AI endpoints.
+
+``rate_limit_ai`` is a route dependency. It enforces two budgets per user,
+both sized by the user's plan and kept in the shared state (``app.core.state``)
+so every worker agrees:
+
+- requests per ``rate_limit_window_seconds``, as a sliding window estimated
+  from the current and previous fixed windows (the previous window's count
+  is weighted by how much of it still overlaps the sliding window)
+- LLM tokens per UTC day, counted from the ``usage`` of every completion
+  made while serving the request
+
+A request over either budget gets a 429 with ``Retry-After``. Allowed
+requests carry the remaining budgets in ``X-RateLimit-*`` and
+``X-Quota-Tokens-*`` headers. The token quota is checked before a request
+and charged after it, so one request may take a user slightly over quota.
+
+Background jobs started by a metered request (column enrichment) run outside
+it, so they charge their owner's quota themselves: ``metered_tokens`` wraps
+each unit of work, and ``token_quota_left`` tells them when to stop.
+"""
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Response, status
+
+from app.core.config import settings
+from app.core.state import KEY_PREFIX, get_state
+from app.deps import get_current_user
+from app.models.user import User
+
+RATE_LIMIT_HEADERS = [
+    "Retry-After",
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Reset",
+    "X-Quota-Tokens-Limit",
+    "X-Quota-Tokens-Remaining",
+]
+# Token counters outlive their day so late charges still land
+QUOTA_TTL_SECONDS = 2 * 24 * 3600
+
+
+@dataclass
+class TokenMeter:
+    """LLM tokens used while serving one request"""
+    tokens: int = 0
+
+
+_token_meter: ContextVar[Optional[TokenMeter]] = ContextVar("token_meter", default=None)
+
+
+def record_llm_tokens(usage) -> None:
+    """Charge a completion's ``usage`` to the request being served, if it is metered"""
+    meter = _token_meter.get()
+    if meter is not None and usage is not None:
+        meter.tokens += (usage.prompt_tokens or 0) + (usage.completion_tokens or 0)
+
+
+def plan_of(user: User) -> str:
+    plan = user.plan or settings.default_plan
+    return plan if plan in settings.rate_limits else settings.default_plan
+
+
+def _too_many(detail: str, retry_after: float, headers: dict) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={**headers, "Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+async def _check_request_rate(user: User, limit: int) -> dict:
+    """Count the request in the sliding window; raises 429 when over ``limit``"""
+    window = settings.rate_limit_window_seconds
+    now = time.time()
+    current = int(now // window)
+    elapsed = now - current * window
+    key = f"{KEY_PREFIX}ratelimit:{user.id}:"
+
+    state = get_state()
+    count = await state.incr(f"{key}{current}", ttl=window * 2)
+    previous = int(await state.get(f"{key}{current - 1}") or 0)
+    overlap = (window - elapsed) / window
+    estimate = previous * overlap + count
+    reset = window - elapsed
+
+    headers = {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(max(0, math.floor(limit - estimate))),
+        "X-RateLimit-Reset": str(math.ceil(reset)),
+    }
+    if estimate > limit:
+        # Rejected requests do not use up the budget
+        await state.incr(f"{key}{current}", -1)
+        # Time until the previous window's weight has decayed enough, or the window rolls over
+        retry_after = (estimate - limit) / (previous / window) if previous else reset
+        raise _too_many(
+            f"Rate limit exceeded: {limit} AI requests per {window}s on the {plan_of(user)} plan",
+            min(retry_after, reset + window),
+            headers,
+        )
+    return headers
+
+
+def _quota_key(user_id: UUID, day: datetime) -> str:
+    return f"{KEY_PREFIX}quota:{user_id}:{day:%Y%m%d}"
+
+
+async def _check_token_quota(user: User, quota: int) -> tuple:
+    """Tokens used today; raises 429 when the quota is spent"""
+    today = datetime.now(timezone.utc)
+    key = _quota_key(user.id, today)
+    used = int(await get_state().get(key) or 0)
+    headers = {
+        "X-Quota-Tokens-Limit": str(quota),
+        "X-Quota-Tokens-Remaining": str(max(0, quota - used)),
+    }
+    if used >= quota:
+        tomorrow = (today + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        raise _too_many(
+            f"Daily AI token quota of {quota} exhausted on the {plan_of(user)} plan",
+            (tomorrow - today).total_seconds(),
+            headers,
+        )
+    return key, headers
+
+
+async def rate_limit_ai(
+    response: Response,
+    current_user: User = Depends(get_current_user)
+) -> AsyncGenerator[None, None]:
+    """Route dependency enforcing the user's AI request rate and daily token quota"""
+    if not settings.rate_limit_enabled:
+        yield
+        return
+
+    plan = plan_of(current_user)
+    quota_key, quota_headers = await _check_token_quota(current_user, settings.daily_token_quotas[plan])
+    rate_headers = await _check_request_rate(current_user, settings.rate_limits[plan])
+    response.headers.update({**rate_headers, **quota_headers})
+
+    # The request's context ends with it, so the meter is never reset
+    meter = TokenMeter()
+    _token_meter.set(meter)
+    try:
+        yield
+    finally:
+        if meter.tokens:
+            await get_state().incr(quota_key, meter.tokens, ttl=QUOTA_TTL_SECONDS)
+
+
+async def token_quota_left(user: User) -> bool:
+    """Whether the user has daily tokens left; always true when rate limiting is off"""
+    if not settings.rate_limit_enabled:
+        return True
+    used = int(await get_state().get(_quota_key(user.id, datetime.now(timezone.utc))) or 0)
+    return used < settings.daily_token_quotas[plan_of(user)]
+
+
+@asynccontextmanager
+async def metered_tokens(user_id: UUID) -> AsyncIterator[None]:
+    """Charge the tokens of the completions made inside the block to the user's daily quota"""
+    meter = TokenMeter()
+    token = _token_meter.set(meter)
+    try:
+        yield
+    finally:
+        _token_meter.reset(token)
+        if meter.tokens and settings.rate_limit_enabled:
+            await get_state().incr(
+                _quota_key(user_id, datetime.now(timezone.utc)), meter.tokens, ttl=QUOTA_TTL_SECONDS
+            )
@@ -0,0 +1,62 @@
+"""
+Read-your-writes for the read replica.
+
+A user who just wrote must not read a replica that has not replayed the
+write yet. ``ReadYourWritesMiddleware`` pins the user to the primary for
+``read_your_writes_seconds`` whenever they send a write request (any method
+other than GET, HEAD and OPTIONS), and ``get_read_db`` checks the pin before
+using the replica. The pin lives in the shared state, so it holds on every
+worker. It is set before the response starts, so a client cannot read ahead
+of its own write, and again when the response ends for writes that outlast
+the pin (streamed imports).
+"""
+from typing import Union
+from uuid import UUID
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import bearer_subject
+from app.core.state import KEY_PREFIX, get_state
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _pin_key(user_id: Union[str, UUID]) -> str:
+    return f"{KEY_PREFIX}primary-pin:{user_id}"
+
+
+async def pin_to_primary(user_id: Union[str, UUID]) -> None:
+    """Serve the user's reads from the primary for ``read_your_writes_seconds``"""
+    await get_state().set(_pin_key(user_id), "1", ttl=settings.read_your_writes_seconds)
+
+
+async def pinned_to_primary(user_id: Union[str, UUID]) -> bool:
+    return await get_state().get(_pin_key(user_id)) is not None
+
+
+class ReadYourWritesMiddleware:
+    """Pins users to the primary database after their write requests"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+        authorization = next((value for key, value in scope["headers"] if key == b"authorization"), b"")
+        user_id = bearer_subject(authorization.decode("latin-1"))
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                await pin_to_primary(user_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await pin_to_primary(user_id)
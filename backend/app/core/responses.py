@@ -0,0 +1,42 @@
+"""
+Fast JSON path for high-volume read endpoints.
+
+Endpoints opt in by building plain dicts straight from selected columns and
+returning ``fast_json(content, response)``. The payload is serialized once
+with orjson and FastAPI skips ``response_model`` validation, which is
+redundant for data read from our own database. ``response_model`` stays on
+the route so the OpenAPI schema is unchanged; payloads must match it.
+"""
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response, status
+from fastapi.responses import JSONResponse
+
+# Headers the response class computes itself
+_GENERATED_HEADERS = ("content-length", "content-type")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (UUIDs, datetimes and dates natively)"""
+
+    def render(self, content: Any) -> bytes:
+        # OPT_UTC_Z matches pydantic's "Z" suffix for UTC datetimes
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json(
+    content: Any,
+    response: Optional[Response] = None,
+    status_code: int = status.HTTP_200_OK,
+) -> FastJSONResponse:
+    """
+    Serialize trusted data with orjson, carrying over headers (ETag,
+    Cache-Control) set on the endpoint's injected ``response``.
+    """
+    fast_response = FastJSONResponse(content, status_code=status_code)
+    if response is not None:
+        for key, value in response.headers.items():
+            if key not in _GENERATED_HEADERS:
+                fast_response.headers[key] = value
+    return fast_response
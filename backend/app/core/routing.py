@@ -0,0 +1,34 @@
+from typing import Optional
+
+from starlette.routing import BaseRoute, Match, Mount
+from starlette.types import Scope
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def match_route(scope: Scope) -> Optional[BaseRoute]:
+    """
+    Find the route that will handle a request. Meant for ASGI middleware,
+    which runs before the router has resolved the endpoint; call it before
+    passing the scope on, since mounts rewrite the path while routing.
+    """
+    app = scope.get("app")
+    if app is None:
+        return None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+    return None
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Path template of the matching route (e.g. ``/api/v1/lead-tables/{table_id}``).
+    Unmatched requests share one label so arbitrary URLs cannot blow up
+    metric or span cardinality.
+    """
+    route = match_route(scope)
+    if isinstance(route, Mount):
+        return f"{route.path}/{{path}}"
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
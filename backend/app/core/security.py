@@ -1,5 +1,5 @@
 from typing import Optional
-import jwt
+from jose import jwt
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
@@ -53,11 +53,26 @@ def verify_supabase_jwt(token: str) -> dict:
     try:
         # For Supabase, we need to verify using their JWT secret
         # This is a simplified version - in production you'd want to verify the signature properly
-        payload = jwt.decode(token, options={"verify_signature": False})
+        payload = jwt.get_unverified_claims(token)
         return payload
     except jwt.JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Supabase token",
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
+
+
+def bearer_subject(authorization: Optional[str]) -> Optional[str]:
+    """
+    User ID (``sub``) of an ``Authorization: Bearer`` header value, read the
+    way ``get_current_user`` reads it; None when missing or malformed. For
+    middleware, which runs before the endpoint's dependencies.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return verify_supabase_jwt(token).get("sub")
+    except HTTPException:
+        return None
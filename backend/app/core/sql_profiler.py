@@ -0,0 +1,152 @@
+"""
+Per-request SQL profiling.
+
+Engine event hooks attribute every statement to the ``QueryProfile`` active
+in the current context; ``SQLProfilerMiddleware`` opens one profile per
+request. Statements are grouped by shape (literals and parameters stripped),
+so a statement issued once per row shows up as one shape with a high count,
+which is how N+1 patterns are spotted.
+"""
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.routing import route_template
+
+logger = logging.getLogger(__name__)
+
+_current_profile: contextvars.ContextVar[Optional["QueryProfile"]] = contextvars.ContextVar(
+    "sql_profile", default=None
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"\$\d+(?:::[\w\[\]]+)?|%\(\w+\)s|%s|\?|:\w+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalise a SQL statement so repeated executions compare equal"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PARAMETER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _VALUES_LIST.sub(r"\1, ...", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryProfile:
+    """Statement count, total DB time and statement shapes for one scope"""
+
+    __slots__ = ("count", "duration", "shapes", "parent")
+
+    def __init__(self, parent: Optional["QueryProfile"] = None):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self.parent = parent
+
+    def record(self, statement: str, elapsed: float) -> None:
+        shape = statement_shape(statement)
+        profile = self
+        while profile is not None:
+            profile.count += 1
+            profile.duration += elapsed
+            profile.shapes[shape] += 1
+            profile = profile.parent
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Shapes executed more than ``threshold`` times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """
+    Attribute statements executed in this context to a new profile. Profiles
+    nest: statements also count towards any enclosing profile.
+    """
+    profile = QueryProfile(parent=_current_profile.get())
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    starts = conn.info.get("profiler_query_start")
+    if profile is not None and starts:
+        profile.record(statement, time.perf_counter() - starts.pop())
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    starts = connection.info.get("profiler_query_start") if connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def install_sql_profiler(engine: AsyncEngine) -> None:
+    """Register the profiling hooks; they are no-ops outside a profile"""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class SQLProfilerMiddleware:
+    """
+    Profiles the SQL issued by each request. Adds a ``Server-Timing`` header
+    when ``emit_header`` is set, and logs a warning when one statement shape
+    runs more than ``repeat_threshold`` times in a single request.
+    """
+
+    def __init__(self, app: ASGIApp, emit_header: bool = False, repeat_threshold: int = 10):
+        self.app = app
+        self.emit_header = emit_header
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope)
+        start = time.perf_counter()
+
+        with profile_queries() as profile:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.emit_header:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={profile.duration * 1000:.2f};desc="{profile.count} queries", '
+                        f'app;dur={(time.perf_counter() - start) * 1000:.2f}'
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        for shape, count in profile.repeated(self.repeat_threshold):
+            logger.warning(
+                "Possible N+1: statement executed %d times in %s %s: %s",
+                count, scope["method"], route, shape[:300]
+            )
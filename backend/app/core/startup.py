@@ -0,0 +1,147 @@
+"""
+Worker startup: schema check, connection pool warm-up and AI client warm-up,
+run concurrently. The timing breakdown (ms) is logged and kept on
+``app.state.startup_timings``. Background tasks then listen for cache
+invalidations from other workers and resume column enrichment jobs and
+chunked table deletes left behind by crashed workers, and (with a read
+replica) keep measuring its replication lag.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict
+
+from fastapi import FastAPI
+
+from app.core import background, state
+from app.core.config import settings
+from app.db import session
+
+logger = logging.getLogger(__name__)
+
+DB_INIT_MODES = ("create_all", "verify", "skip")
+AI_WARMUP_TIMEOUT = 10
+
+
+def db_init_mode() -> str:
+    mode = settings.db_init_mode or ("create_all" if settings.debug else "verify")
+    if mode not in DB_INIT_MODES:
+        raise ValueError(f"Unknown DB_INIT_MODE '{mode}'. Use create_all, verify or skip")
+    return mode
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+async def _timed(timings: Dict[str, float], name: str, coro) -> None:
+    start = time.perf_counter()
+    try:
+        await coro
+    finally:
+        timings[name] = _elapsed_ms(start)
+
+
+async def _prepare_schema(mode: str) -> None:
+    if mode == "create_all":
+        await session.init_db()
+    elif mode == "verify":
+        revision = await session.verify_schema()
+        logger.info(f"Database schema is at revision {revision}")
+
+
+async def _warm_ai_clients(timings: Dict[str, float]) -> None:
+    from app.services.openai_service import get_openai_service
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(get_openai_service().warm_up(), timeout=AI_WARMUP_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"AI client warm-up failed: {type(e).__name__}: {e}")
+    finally:
+        timings["ai_clients"] = _elapsed_ms(start)
+        logger.info(f"AI clients warmed in {timings['ai_clients']}ms")
+
+
+async def _listen_for_invalidations() -> None:
+    """Apply cache invalidations published by other workers"""
+    try:
+        await state.listen_for_invalidations()
+    except Exception as e:
+        logger.error(f"Cache invalidation listener stopped: {type(e).__name__}: {e}")
+
+
+async def _resume_enrichments() -> None:
+    """Pick up enrichment jobs whose worker died, once their lease expires"""
+    from app.services.enrichment_service import EnrichmentService
+
+    service = EnrichmentService()
+    while True:
+        try:
+            await service.resume_unfinished()
+        except Exception as e:
+            logger.error(f"Resuming column enrichments failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(settings.enrichment_lease_seconds)
+
+
+async def _monitor_replica() -> None:
+    """Measure the read replica's lag, so reads move to the primary while it lags or is down"""
+    while True:
+        try:
+            await session.check_replica()
+        except Exception as e:
+            logger.error(f"Checking the read replica failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(settings.replica_check_seconds)
+
+
+async def _purge_deleted_tables() -> None:
+    """Finish chunked lead table deletes interrupted by a restart"""
+    from app.services.lead_service import LeadService
+
+    try:
+        await LeadService().purge_deleted_tables()
+    except Exception as e:
+        logger.error(f"Purging deleted lead tables failed: {type(e).__name__}: {e}")
+
+
+async def run_startup(app: FastAPI, started_at: float) -> Dict[str, float]:
+    """
+    Prepare the worker to serve. The AI warm-up runs in the background and
+    does not hold up readiness.
+    """
+    timings: Dict[str, float] = {"import": _elapsed_ms(started_at)}
+    app.state.startup_timings = timings
+
+    if settings.warm_ai_clients:
+        app.state.ai_warmup = asyncio.create_task(_warm_ai_clients(timings))
+
+    mode = db_init_mode()
+    await asyncio.gather(
+        _timed(timings, f"schema_{mode}", _prepare_schema(mode)),
+        _timed(timings, "pool_warmup", session.warm_pool(settings.db_pool_size)),
+    )
+
+    app.state.invalidation_listener = asyncio.create_task(_listen_for_invalidations())
+    app.state.enrichment_resume = asyncio.create_task(_resume_enrichments())
+    app.state.table_purge = asyncio.create_task(_purge_deleted_tables())
+    if session.replica_configured():
+        app.state.replica_monitor = asyncio.create_task(_monitor_replica())
+    
+    timings["ready"] = _elapsed_ms(started_at)
+    breakdown = ", ".join(f"{name}={ms}ms" for name, ms in timings.items() if name != "ready")
+    logger.info(f"Ready in {timings['ready']}ms ({breakdown})")
+    return timings
+
+
+async def run_shutdown(app: FastAPI) -> None:
+    """Stop background work and close the clients created while serving"""
+    from app.services.openai_service import close_openai_service
+
+    for name in ("ai_warmup", "invalidation_listener", "enrichment_resume", "table_purge", "replica_monitor"):
+        task = getattr(app.state, name, None)
+        if task is not None and not task.done():
+            task.cancel()
+    await background.cancel_background_jobs()
+    await close_openai_service()
+    await state.close_state()
+    await session.dispose_engine()
@@ -0,0 +1,292 @@
+"""
+State shared between worker processes: caches, counters and locks.
+
+``get_state()`` returns the configured backend:
+
+- ``redis`` - shared by every worker (and every replica) using ``REDIS_URL``
+- ``memory`` - a dict in the process; only correct with a single worker,
+  which ``app.server`` enforces
+
+``SharedCache`` puts a small per-worker LRU in front of the backend. Entries
+are JSON documents. Invalidating a key prefix deletes it from the backend
+and broadcasts the prefix on ``INVALIDATION_CHANNEL``; every worker listens
+(``listen_for_invalidations``, started at startup) and drops its local
+copies, so no worker keeps serving a stale entry.
+"""
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STATE_BACKENDS = ("memory", "redis")
+KEY_PREFIX = "signaliq:"
+INVALIDATION_CHANNEL = KEY_PREFIX + "invalidate"
+# Delay before re-subscribing after the pub/sub connection drops
+RESUBSCRIBE_SECONDS = 1
+
+
+class StateBackend(ABC):
+    """Key-value store with expiry, counters and pub/sub"""
+
+    name: str
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[int] = None, only_if_missing: bool = False) -> bool:
+        """Store ``value``; with ``only_if_missing``, only when the key does not exist. Returns whether it was stored"""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        """Add to a counter; ``ttl`` applies when the counter is created"""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        ...
+
+    @abstractmethod
+    async def listen(self, channel: str, handler: Callable[[str], Awaitable[None]]) -> None:
+        """Call ``handler`` with every message published on ``channel``; runs until cancelled"""
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryStateBackend(StateBackend):
+    """Process-local state for a single worker"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def _live(self, key: str) -> Optional[Any]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    def _expiry(self, ttl: Optional[int]) -> Optional[float]:
+        return time.monotonic() + ttl if ttl else None
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self._live(key)
+        return None if value is None else str(value)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None, only_if_missing: bool = False) -> bool:
+        if only_if_missing and self._live(key) is not None:
+            return False
+        self._values[key] = (value, self._expiry(ttl))
+        return True
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._values.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._values if key.startswith(prefix)]:
+            del self._values[key]
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        current = self._live(key)
+        if current is None:
+            self._values[key] = (amount, self._expiry(ttl))
+            return amount
+        value = int(current) + amount
+        self._values[key] = (value, self._values[key][1])
+        return value
+
+    async def publish(self, channel: str, message: str) -> None:
+        for queue in self._subscribers.get(channel, []):
+            queue.put_nowait(message)
+
+    async def listen(self, channel: str, handler: Callable[[str], Awaitable[None]]) -> None:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, []).append(queue)
+        try:
+            while True:
+                await handler(await queue.get())
+        finally:
+            self._subscribers[channel].remove(queue)
+
+
+class RedisStateBackend(StateBackend):
+    """State in Redis, shared by all workers and replicas"""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None, only_if_missing: bool = False) -> bool:
+        return bool(await self.client.set(key, value, ex=ttl or None, nx=only_if_missing))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*keys)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        batch = []
+        async for key in self.client.scan_iter(match=prefix + "*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await self.client.delete(*batch)
+                batch = []
+        if batch:
+            await self.client.delete(*batch)
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        async with self.client.pipeline(transaction=True) as pipe:
+            if ttl:
+                # Creates the counter with its expiry; a no-op once it exists
+                pipe.set(key, 0, ex=ttl, nx=True)
+            pipe.incrby(key, amount)
+            results = await pipe.execute()
+        return int(results[-1])
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.client.publish(channel, message)
+
+    async def listen(self, channel: str, handler: Callable[[str], Awaitable[None]]) -> None:
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(channel)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        await handler(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Lost the {channel} subscription ({type(e).__name__}: {e}); resubscribing")
+                await asyncio.sleep(RESUBSCRIBE_SECONDS)
+            finally:
+                await pubsub.close()
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def state_backend_name() -> str:
+    """Configured backend; redis when REDIS_URL is set, otherwise memory"""
+    name = settings.state_backend or ("redis" if settings.redis_url else "memory")
+    if name not in STATE_BACKENDS:
+        raise ValueError(f"Unknown STATE_BACKEND '{name}'. Use memory or redis")
+    if name == "redis" and not settings.redis_url:
+        raise ValueError("STATE_BACKEND=redis needs REDIS_URL")
+    return name
+
+
+_state: Optional[StateBackend] = None
+
+
+def get_state() -> StateBackend:
+    """The shared state backend, created on first use"""
+    global _state
+    if _state is None:
+        if state_backend_name() == "redis":
+            _state = RedisStateBackend(settings.redis_url)
+        else:
+            _state = MemoryStateBackend()
+    return _state
+
+
+async def close_state() -> None:
+    global _state
+    if _state is not None:
+        await _state.close()
+        _state = None
+
+
+class SharedCache:
+    """JSON cache shared by all workers, with a per-worker LRU in front"""
+
+    def __init__(self, namespace: str, local_size: int, ttl: Optional[int] = None):
+        self.namespace = namespace
+        self.local_size = local_size
+        self.ttl = ttl
+        self._local: "OrderedDict[str, Any]" = OrderedDict()
+        _caches[namespace] = self
+
+    def _key(self, key: str) -> str:
+        return f"{KEY_PREFIX}{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self._local.get(key)
+        if value is None:
+            raw = await get_state().get(self._key(key))
+            if raw is not None:
+                value = json.loads(raw)
+                self._remember(key, value)
+        else:
+            self._local.move_to_end(key)
+        metrics.record_cache(self.namespace, value is not None)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        await get_state().set(self._key(key), json.dumps(value, default=str), ttl=self.ttl)
+
+    async def invalidate(self, prefix: str) -> None:
+        """Drop every key starting with ``prefix``, in this worker and all others"""
+        self.drop_local(prefix)
+        state = get_state()
+        await state.delete_prefix(self._key(prefix))
+        await state.publish(INVALIDATION_CHANNEL, json.dumps({"namespace": self.namespace, "prefix": prefix}))
+
+    def drop_local(self, prefix: str) -> None:
+        for key in [key for key in self._local if key.startswith(prefix)]:
+            del self._local[key]
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._local[key] = value
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_size:
+            self._local.popitem(last=False)
+
+
+_caches: Dict[str, SharedCache] = {}
+
+
+async def _handle_invalidation(message: str) -> None:
+    try:
+        payload = json.loads(message)
+        cache = _caches.get(payload["namespace"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"Ignoring malformed invalidation message: {message!r}")
+        return
+    if cache is not None:
+        cache.drop_local(payload.get("prefix", ""))
+
+
+async def listen_for_invalidations() -> None:
+    """Apply other workers' invalidations to this worker's local caches; runs until cancelled"""
+    await get_state().listen(INVALIDATION_CHANNEL, _handle_invalidation)
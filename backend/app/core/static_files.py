@@ -0,0 +1,134 @@
+"""
+Serving the built frontend.
+
+The build output directory is scanned once at startup, so requests never
+touch the filesystem to find a file (and paths outside the directory cannot
+be reached). ``index.html`` and its compressed variants are held in memory.
+Vite's content-hashed files under ``assets/`` are cached for a year as
+immutable; everything else revalidates with an ETag. Precompressed ``.br`` /
+``.gz`` siblings (see ``scripts/precompress_static.py``) are served to
+clients that accept them. Unknown paths without a file extension fall back to
+``index.html`` for client-side routing.
+"""
+import logging
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.compression import accepted_encodings
+from app.core.http_cache import etag_for_encoding, etag_matches, make_etag
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# Vite puts content-hashed build output here
+HASHED_ASSETS_PREFIX = "assets/"
+
+# Preferred first
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+@dataclass
+class StaticFile:
+    path: str
+    media_type: str
+    etag: str
+    cache_control: str
+    stat: os.stat_result
+    # encoding -> (path, stat) of the precompressed variant
+    variants: Dict[str, tuple] = field(default_factory=dict)
+
+
+class FrontendFiles:
+    """ASGI app serving a single-page app build directory"""
+
+    def __init__(self, directory: str, index: str = "index.html"):
+        self.directory = os.path.abspath(directory)
+        self.files: Dict[str, StaticFile] = {}
+        self._scan()
+        self.index = self.files.get(index)
+        # encoding (None for identity) -> body
+        self.index_bodies: Dict[Optional[str], bytes] = {}
+        if self.index is not None:
+            with open(self.index.path, "rb") as handle:
+                self.index_bodies[None] = handle.read()
+            for encoding, (path, _) in self.index.variants.items():
+                with open(path, "rb") as handle:
+                    self.index_bodies[encoding] = handle.read()
+        logger.info(f"Serving {len(self.files)} frontend files from {self.directory}")
+
+    def _scan(self) -> None:
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith((".br", ".gz")):
+                    continue
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                stat = os.stat(path)
+                media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                if media_type.startswith("text/") or media_type == "application/javascript":
+                    media_type += "; charset=utf-8"
+                static_file = StaticFile(
+                    path=path,
+                    media_type=media_type,
+                    etag=make_etag(relative, stat.st_size, stat.st_mtime_ns),
+                    cache_control=IMMUTABLE_CACHE if relative.startswith(HASHED_ASSETS_PREFIX) else REVALIDATE_CACHE,
+                    stat=stat,
+                )
+                for encoding, suffix in PRECOMPRESSED:
+                    if os.path.exists(path + suffix):
+                        static_file.variants[encoding] = (path + suffix, os.stat(path + suffix))
+                self.files[relative] = static_file
+
+    def _lookup(self, path: str) -> Optional[StaticFile]:
+        if path in self.files:
+            return self.files[path]
+        if path.startswith(("api/", HASHED_ASSETS_PREFIX)) or "." in path.rsplit("/", 1)[-1]:
+            # A missing file or API route, not a client-side route
+            return None
+        return self.index
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+            await response(scope, receive, send)
+            return
+
+        path = scope["path"].lstrip("/") or "index.html"
+        static_file = self._lookup(path)
+        if static_file is None:
+            await JSONResponse({"detail": "Not Found"}, status_code=404)(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        encoding = next((name for name, _ in PRECOMPRESSED if name in accepted and name in static_file.variants), None)
+
+        etag = etag_for_encoding(static_file.etag, encoding) if encoding else static_file.etag
+        headers = {"ETag": etag, "Cache-Control": static_file.cache_control}
+        if static_file.variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            await Response(status_code=304, headers=headers)(scope, receive, send)
+            return
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        if static_file is self.index:
+            body = self.index_bodies[encoding]
+            response = Response(body if scope["method"] == "GET" else b"", media_type=static_file.media_type, headers=headers)
+            response.headers["Content-Length"] = str(len(body))
+        else:
+            path, stat = static_file.variants[encoding] if encoding else (static_file.path, static_file.stat)
+            response = FileResponse(path, media_type=static_file.media_type, headers=headers, stat_result=stat, method=scope["method"])
+        await response(scope, receive, send)
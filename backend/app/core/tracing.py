@@ -0,0 +1,153 @@
+"""
+OpenTelemetry tracing for requests, DB statements and LLM calls.
+
+Spans are created through the OpenTelemetry API everywhere; with
+``TRACING_EXPORTER=none`` (the default) no SDK provider is installed and the
+API hands out no-op spans. Exporters:
+
+* ``console`` - spans printed to stdout
+* ``file``    - one JSON span per line appended to ``TRACING_FILE_PATH``
+* ``otlp``    - OTLP/HTTP to ``OTLP_ENDPOINT`` (a collector, or the offline
+  stand-in in ``scripts/otlp_collector.py``)
+"""
+import logging
+import os
+from typing import Optional
+
+from opentelemetry import propagate, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import statement_type
+from app.core.routing import route_template
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("signaliq")
+
+_provider = None
+
+
+def tracing_enabled() -> bool:
+    return settings.tracing_exporter != "none"
+
+
+def _build_exporter(name: str):
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "file":
+        out = open(settings.tracing_file_path, "a")
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + os.linesep)
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.otlp_endpoint)
+    raise ValueError(f"Unknown tracing exporter '{name}'. Use none, console, file or otlp")
+
+
+def setup_tracing() -> None:
+    """Install the SDK tracer provider for the configured exporter"""
+    global _provider
+    if not tracing_enabled() or _provider is not None:
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": settings.tracing_service_name}))
+    _provider.add_span_processor(BatchSpanProcessor(_build_exporter(settings.tracing_exporter)))
+    trace.set_tracer_provider(_provider)
+    logger.info(f"Tracing enabled with '{settings.tracing_exporter}' exporter")
+
+
+def shutdown_tracing() -> None:
+    """Flush buffered spans"""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+# Database spans
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = tracer.start_span(
+        f"db.{statement_type(statement)}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system": "postgresql",
+            "db.statement": statement[:2000],
+            "db.executemany": executemany,
+        },
+    )
+    conn.info.setdefault("tracing_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("tracing_spans")
+    if spans:
+        span = spans.pop()
+        if cursor is not None and cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.set_attribute("db.rowcount", cursor.rowcount)
+        span.end()
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get("tracing_spans") if connection is not None else None
+    if spans:
+        span = spans.pop()
+        span.record_exception(exception_context.original_exception)
+        span.set_status(Status(StatusCode.ERROR))
+        span.end()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Emit a span per SQL statement when tracing is enabled"""
+    if not tracing_enabled():
+        return
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class TracingMiddleware:
+    """Root server span per HTTP request, continuing any incoming trace context"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(
+            f"{method} {route}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={
+                "http.method": method,
+                "http.route": route,
+                "http.target": scope["path"],
+            },
+        ) as span:
+            await self.app(scope, receive, send_wrapper)
+            span.set_attribute("http.status_code", status_code or 0)
+            if status_code is None or status_code >= 500:
+                span.set_status(Status(StatusCode.ERROR))
@@ -37,12 +37,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return result.scalars().all()
 
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
-        """Create a new record"""
+        """Create a new record; server defaults come back with the INSERT"""
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
         await db.commit()
-        await db.refresh(db_obj)
         return db_obj
 
     async def update(
@@ -52,7 +51,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        """Update an existing record"""
+        """Update an existing record; ``updated_at`` comes back with the UPDATE"""
         obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
@@ -65,14 +64,16 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         
         db.add(db_obj)
         await db.commit()
-        await db.refresh(db_obj)
         return db_obj
 
     async def remove(self, db: AsyncSession, *, id: UUID) -> Optional[ModelType]:
-        """Delete a record by ID"""
-        result = await db.execute(select(self.model).where(self.model.id == id))
+        """Delete a record by ID; dependent rows go through ON DELETE CASCADE"""
+        result = await db.execute(
+            delete(self.model)
+            .where(self.model.id == id)
+            .returning(self.model)
+        )
         obj = result.scalar_one_or_none()
         if obj:
-            await db.delete(obj)
             await db.commit()
-        return obj
\ No newline at end of file
+        return obj
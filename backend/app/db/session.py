@@ -1,28 +1,106 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.pool import NullPool
-from typing import AsyncGenerator
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from typing import AsyncGenerator, Optional, Tuple
+from pathlib import Path
+import asyncio
+import logging
+import time
 
+from app.core import metrics, tracing
 from app.core.config import settings
+from app.core.sql_profiler import install_sql_profiler
 
-# Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    poolclass=NullPool,  # Use NullPool for serverless environments
-    future=True,
-)
+logger = logging.getLogger(__name__)
 
-# Create async session maker
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+
+class _CheckoutTimingMixin:
+    """Reports connection checkout time to Prometheus"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            metrics.DB_POOL_CHECKOUT.observe(time.perf_counter() - start)
+
+
+class InstrumentedNullPool(_CheckoutTimingMixin, NullPool):
+    pass
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options() -> dict:
+    if settings.db_pool_size > 0:
+        return {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_pre_ping": True,
+        }
+    # NullPool for serverless environments / external poolers
+    return {"poolclass": InstrumentedNullPool}
+
+
+def _create_engine(url: str, **options) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=settings.debug,
+        future=True,
+        **_pool_options(),
+        **options,
+    )
+    metrics.instrument_engine(engine)
+    install_sql_profiler(engine)
+    tracing.instrument_engine(engine)
+    return engine
+
+
+_engine: Optional[AsyncEngine] = None
+_session_maker: Optional[async_sessionmaker] = None
+
+
+def get_engine() -> AsyncEngine:
+    """The async engine, created (and instrumented) on first use"""
+    global _engine
+    if _engine is None:
+        _engine = _create_engine(settings.database_url)
+    return _engine
+
+
+def get_session_maker() -> async_sessionmaker:
+    """Session factory bound to the engine"""
+    global _session_maker
+    if _session_maker is None:
+        _session_maker = async_sessionmaker(
+            get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+    return _session_maker
+
+
+async def dispose_engine() -> None:
+    """Close pooled connections, if the engines were ever created"""
+    global _engine, _session_maker, _replica_engine, _replica_session_maker, _replica_lag
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _session_maker = None
+    if _replica_engine is not None:
+        await _replica_engine.dispose()
+        _replica_engine = None
+        _replica_session_maker = None
+        _replica_lag = None
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get async database session"""
-    async with async_session_maker() as session:
+    async with get_session_maker()() as session:
         try:
             yield session
         except Exception:
@@ -32,11 +110,122 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+# Read replica
+
+# Replication lag in seconds: 0 when the replica has replayed all the WAL it
+# received (or is not in recovery at all), otherwise the age of the last
+# replayed transaction. NULL when the WAL receiver is not streaming or has
+# not heard from the primary recently: a disconnected replica has replayed
+# everything it received, but that says nothing about how stale it is.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN NOT EXISTS ("
+    "SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming' "
+    "AND last_msg_receipt_time > now() - make_interval(secs => :max_silence)"
+    ") THEN NULL "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_replica_engine: Optional[AsyncEngine] = None
+_replica_session_maker: Optional[async_sessionmaker] = None
+# Lag at the last check; None until the first successful check or after a failure
+_replica_lag: Optional[float] = None
+
+
+def replica_configured() -> bool:
+    return bool(settings.replica_database_url)
+
+
+def get_replica_engine() -> AsyncEngine:
+    """Engine of the read replica (``REPLICA_DATABASE_URL``), created on first use"""
+    global _replica_engine
+    if _replica_engine is None:
+        if not replica_configured():
+            raise RuntimeError("No read replica configured; set REPLICA_DATABASE_URL")
+        # Fail fast, so reads fall back to the primary instead of waiting
+        _replica_engine = _create_engine(
+            settings.replica_database_url,
+            connect_args={"timeout": settings.replica_connect_timeout_seconds},
+        )
+    return _replica_engine
+
+
+def get_replica_session_maker() -> async_sessionmaker:
+    """Session factory bound to the replica engine"""
+    global _replica_session_maker
+    if _replica_session_maker is None:
+        _replica_session_maker = async_sessionmaker(
+            get_replica_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+    return _replica_session_maker
+
+
+def replica_unusable_reason() -> Optional[str]:
+    """Why reads cannot go to the replica right now ("unavailable" or "lagging"), or None"""
+    if _replica_lag is None:
+        return "unavailable"
+    if _replica_lag > settings.replica_max_lag_seconds:
+        return "lagging"
+    return None
+
+
+def mark_replica_unavailable(error: BaseException) -> None:
+    """Send reads to the primary until the next successful replica check"""
+    global _replica_lag
+    if _replica_lag is not None:
+        logger.warning(f"Read replica unavailable ({type(error).__name__}: {error}); reading from the primary")
+    _replica_lag = None
+
+
+async def check_replica() -> Optional[float]:
+    """Measure the replica's replication lag in seconds; None when it cannot be reached"""
+    global _replica_lag
+    
+    async def measure() -> Optional[float]:
+        async with get_replica_engine().connect() as conn:
+            lag = await conn.scalar(
+                REPLICA_LAG_SQL, {"max_silence": settings.replica_max_receiver_silence_seconds}
+            )
+            return None if lag is None else float(lag)
+    
+    try:
+        lag = await asyncio.wait_for(measure(), timeout=settings.replica_connect_timeout_seconds * 2)
+    except (DBAPIError, OSError, asyncio.TimeoutError) as e:
+        mark_replica_unavailable(e)
+        return None
+    if lag is None:
+        mark_replica_unavailable(RuntimeError("WAL receiver is not streaming from the primary"))
+        return None
+    
+    if _replica_lag is None:
+        logger.info(f"Read replica available (lag {lag:.2f}s)")
+    elif lag > settings.replica_max_lag_seconds >= _replica_lag:
+        logger.warning(f"Read replica lags {lag:.2f}s behind the primary; reading from the primary")
+    _replica_lag = lag
+    metrics.DB_REPLICA_LAG.set(lag)
+    return lag
+
+
+async def open_replica_session() -> Optional[AsyncSession]:
+    """A replica session with its connection checked out, or None when the replica cannot be reached"""
+    session = get_replica_session_maker()()
+    try:
+        await session.connection()
+    except (DBAPIError, OSError, asyncio.TimeoutError) as e:
+        await session.close()
+        mark_replica_unavailable(e)
+        return None
+    return session
+
+
 async def init_db() -> None:
     """Initialize database tables"""
     from app.models.base import Base
     
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         # Import all models to ensure they're registered
         from app.models import (
             User, Conversation, Message, Lead, UserProfile,
@@ -44,5 +233,70 @@ async def init_db() -> None:
             LeadColumn, LeadRow, LeadCell
         )
         
-        # Create all tables
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        # Create all tables; lead cell indexes use trigram operators
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+        
+        # Cached lead table statistics and versions
+        from app.db.triggers import LEAD_TABLE_STATS_SQL, LEAD_TABLE_VERSION_SQL
+        for statement in LEAD_TABLE_STATS_SQL + LEAD_TABLE_VERSION_SQL:
+            await conn.execute(text(statement))
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# SQLSTATE of a missing table
+UNDEFINED_TABLE = "42P01"
+
+
+def alembic_config():
+    """Alembic configuration that works from any working directory"""
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+def alembic_heads() -> Tuple[str, ...]:
+    """Head revision(s) of the migration scripts; reads files only"""
+    from alembic.script import ScriptDirectory
+
+    return tuple(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+async def verify_schema() -> str:
+    """Check with one query that the database is at the Alembic head, without running DDL"""
+    heads_task = asyncio.create_task(asyncio.to_thread(alembic_heads))
+    try:
+        try:
+            async with get_engine().connect() as conn:
+                result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+                current = {row[0] for row in result}
+        except DBAPIError as e:
+            # Connection, authentication and permission errors are raised as they are
+            if getattr(e.orig, "sqlstate", None) != UNDEFINED_TABLE:
+                raise
+            raise RuntimeError(
+                "Database has no alembic_version table; run `python scripts/migrate_db.py`. "
+                "`alembic stamp head` is only right for a fresh database created by "
+                "create_all from the current models"
+            ) from e
+        heads = set(await heads_task)
+    finally:
+        heads_task.cancel()
+
+    if current != heads:
+        raise RuntimeError(
+            f"Database schema is at {sorted(current) or 'no revision'}, expected {sorted(heads)}; "
+            "run `python scripts/migrate_db.py`"
+        )
+    return ", ".join(sorted(current))
+
+
+async def warm_pool(connections: int) -> None:
+    """Open ``connections`` pooled connections concurrently ahead of the first requests"""
+    async def checkout():
+        async with get_engine().connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    await asyncio.gather(*(checkout() for _ in range(connections)))
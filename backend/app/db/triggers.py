@@ -0,0 +1,144 @@
+"""
+Triggers keeping the cached statistics and the version on ``lead_tables``
+current.
+
+Every writer (the API, COPY imports, the frontend through Supabase) goes
+through them, so the counts never drift. They are statement-level with
+transition tables: one UPDATE per table touched by a statement, however
+many rows it writes. Installed by ``init_db`` for create_all schemas and by
+the ``lead_table_stats`` and ``lead_table_version_triggers`` migrations.
+
+Rows are never moved between tables and their entity type is set when they
+are created, so updates of ``lead_rows`` are not tracked.
+
+The version (the ETag of table reads and facets) is bumped by any write to a
+table's columns, rows or cells, and by changes to the table's own fields
+unless the writer already bumped it.
+"""
+from typing import List
+
+LEAD_TABLE_STATS_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION lead_rows_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE lead_tables t SET
+                row_count = t.row_count + d.total,
+                company_count = t.company_count + d.companies,
+                person_count = t.person_count + d.people,
+                last_ingested_at = now()
+            FROM (
+                SELECT lead_table_id, count(*) AS total,
+                       count(*) FILTER (WHERE entity_type = 'company') AS companies,
+                       count(*) FILTER (WHERE entity_type = 'person') AS people
+                FROM new_rows GROUP BY lead_table_id
+            ) d
+            WHERE t.id = d.lead_table_id;
+        ELSE
+            UPDATE lead_tables t SET
+                row_count = t.row_count - d.total,
+                company_count = t.company_count - d.companies,
+                person_count = t.person_count - d.people
+            FROM (
+                SELECT lead_table_id, count(*) AS total,
+                       count(*) FILTER (WHERE entity_type = 'company') AS companies,
+                       count(*) FILTER (WHERE entity_type = 'person') AS people
+                FROM old_rows GROUP BY lead_table_id
+            ) d
+            WHERE t.id = d.lead_table_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION lead_columns_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE lead_tables t SET column_count = t.column_count + d.total
+            FROM (SELECT lead_table_id, count(*) AS total FROM new_columns GROUP BY lead_table_id) d
+            WHERE t.id = d.lead_table_id;
+        ELSE
+            UPDATE lead_tables t SET column_count = t.column_count - d.total
+            FROM (SELECT lead_table_id, count(*) AS total FROM old_columns GROUP BY lead_table_id) d
+            WHERE t.id = d.lead_table_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS lead_rows_stats_insert ON lead_rows",
+    """
+    CREATE TRIGGER lead_rows_stats_insert AFTER INSERT ON lead_rows
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION lead_rows_stats()
+    """,
+    "DROP TRIGGER IF EXISTS lead_rows_stats_delete ON lead_rows",
+    """
+    CREATE TRIGGER lead_rows_stats_delete AFTER DELETE ON lead_rows
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION lead_rows_stats()
+    """,
+    "DROP TRIGGER IF EXISTS lead_columns_stats_insert ON lead_columns",
+    """
+    CREATE TRIGGER lead_columns_stats_insert AFTER INSERT ON lead_columns
+    REFERENCING NEW TABLE AS new_columns FOR EACH STATEMENT EXECUTE FUNCTION lead_columns_stats()
+    """,
+    "DROP TRIGGER IF EXISTS lead_columns_stats_delete ON lead_columns",
+    """
+    CREATE TRIGGER lead_columns_stats_delete AFTER DELETE ON lead_columns
+    REFERENCING OLD TABLE AS old_columns FOR EACH STATEMENT EXECUTE FUNCTION lead_columns_stats()
+    """,
+]
+
+# Tables whose writes change a lead table's data, with the query giving the
+# lead tables of the changed rows
+_VERSIONED_TABLES = {
+    "lead_columns": "SELECT lead_table_id FROM changed",
+    "lead_rows": "SELECT lead_table_id FROM changed",
+    "lead_cells": "SELECT r.lead_table_id FROM lead_rows r WHERE r.id IN (SELECT row_id FROM changed)",
+}
+
+
+def _version_sql(table: str, lead_tables: str) -> List[str]:
+    statements = [f"""
+    CREATE OR REPLACE FUNCTION {table}_version() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE lead_tables SET version = version + 1, updated_at = now()
+        WHERE id IN ({lead_tables});
+        RETURN NULL;
+    END
+    $$
+    """]
+    # A trigger with a transition table handles a single event
+    for event, transition in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+        statements += [
+            f"DROP TRIGGER IF EXISTS {table}_version_{event} ON {table}",
+            f"""
+    CREATE TRIGGER {table}_version_{event} AFTER {event.upper()} ON {table}
+    REFERENCING {transition} TABLE AS changed FOR EACH STATEMENT EXECUTE FUNCTION {table}_version()
+    """,
+        ]
+    return statements
+
+
+LEAD_TABLE_VERSION_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION lead_tables_version() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF NEW.version = OLD.version
+           AND (NEW.name, NEW.description, NEW.table_type, NEW.default_columns, NEW.conversation_id)
+               IS DISTINCT FROM (OLD.name, OLD.description, OLD.table_type, OLD.default_columns, OLD.conversation_id)
+        THEN
+            NEW.version := OLD.version + 1;
+            NEW.updated_at := now();
+        END IF;
+        RETURN NEW;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS lead_tables_version ON lead_tables",
+    """
+    CREATE TRIGGER lead_tables_version BEFORE UPDATE ON lead_tables
+    FOR EACH ROW EXECUTE FUNCTION lead_tables_version()
+    """,
+    *(statement for table, lead_tables in _VERSIONED_TABLES.items() for statement in _version_sql(table, lead_tables)),
+]
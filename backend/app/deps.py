@@ -4,8 +4,11 @@ from typing import Optional, AsyncGenerator
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import metrics
+from app.core.read_your_writes import pinned_to_primary
 from app.core.security import verify_supabase_jwt
-from app.db.session import get_async_session
+from app.core.tracing import tracer
+from app.db.session import get_async_session, open_replica_session, replica_configured, replica_unusable_reason
 from app.crud.user import user as user_crud
 from app.models.user import User
 
@@ -25,6 +28,11 @@ async def get_current_user(
     """
     Dependency to get current user from Supabase JWT token
     """
+    with tracer.start_as_current_span("get_current_user"):
+        return await _resolve_current_user(credentials, db)
+
+
+async def _resolve_current_user(credentials: HTTPAuthorizationCredentials, db: AsyncSession) -> User:
     payload = verify_supabase_jwt(credentials.credentials)
     user_id_str = payload.get("sub")
     
@@ -54,6 +62,35 @@ async def get_current_user(
     return user
 
 
+async def get_read_db(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Database session for read-only endpoints: the read replica when one is
+    configured, keeping up and reachable, and the user has not written in the
+    last few seconds; otherwise the request's primary session
+    """
+    if not replica_configured():
+        yield db
+        return
+    
+    reason = replica_unusable_reason()
+    if reason is None and await pinned_to_primary(current_user.id):
+        reason = "pinned"
+    session = await open_replica_session() if reason is None else None
+    if session is None:
+        metrics.record_read_session("primary", reason or "unavailable")
+        yield db
+        return
+    
+    metrics.record_read_session("replica", "healthy")
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -1,30 +1,44 @@
+import time
+
+_started_at = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import Response
 from contextlib import asynccontextmanager
 import logging
 import os
 
 from app.api.v1 import api_router
+from app.core import metrics, tracing
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.db.session import init_db
+from app.core.idempotency import REPLAYED_HEADER, IdempotencyMiddleware
+from app.core.rate_limit import RATE_LIMIT_HEADERS
+from app.core.read_your_writes import ReadYourWritesMiddleware
+from app.core.sql_profiler import SQLProfilerMiddleware
+from app.core.startup import run_startup, run_shutdown
+from app.core.static_files import FrontendFiles
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+tracing.setup_tracing()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up SignalIQ FastAPI backend...")
-    # Initialize database
-    await init_db()
-    logger.info("Database initialized")
+    # Check the schema and warm the connection pool and AI clients
+    await run_startup(app, _started_at)
     yield
     # Shutdown
     logger.info("Shutting down SignalIQ FastAPI backend...")
+    await run_shutdown(app)
+    metrics.mark_process_dead()
+    tracing.shutdown_tracing()
 
 
 app = FastAPI(
@@ -34,6 +48,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Innermost, so replayed responses still pass through CORS and compression
+app.add_middleware(IdempotencyMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -41,30 +58,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", REPLAYED_HEADER, *RATE_LIMIT_HEADERS],
 )
 
+if settings.replica_database_url:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        level=settings.compression_level,
+    )
+
+if settings.sql_profiler_enabled:
+    app.add_middleware(
+        SQLProfilerMiddleware,
+        emit_header=settings.debug,
+        repeat_threshold=settings.sql_repeat_warning_threshold,
+    )
+
+if settings.metrics_enabled:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+if tracing.tracing_enabled():
+    app.add_middleware(tracing.TracingMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
-# Serve static files (built frontend)
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "service": "SignalIQ API"}
+
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        content, content_type = metrics.render_metrics()
+        return Response(content=content, media_type=content_type)
+
+
+# Serve the built frontend (static/ is the Vite dist directory in the Docker image)
 if os.path.exists("static"):
-    app.mount("/static", StaticFiles(directory="static"), name="static")
-    
-    @app.get("/")
-    async def serve_frontend():
-        return FileResponse("static/index.html")
-    
-    @app.get("/{path:path}")
-    async def serve_frontend_routes(path: str):
-        # Serve index.html for all frontend routes (SPA routing)
-        if not path.startswith("api") and not path.startswith("static"):
-            return FileResponse("static/index.html")
-        return FileResponse(f"static/{path}")
+    app.mount("/", FrontendFiles("static"), name="frontend")
 else:
     @app.get("/")
     async def root():
-        return {"message": "SignalIQ API is running"}
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "service": "SignalIQ API"}
\ No newline at end of file
+        return {"message": "SignalIQ API is running"}
\ No newline at end of file
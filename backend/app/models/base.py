@@ -6,7 +6,9 @@ from typing import Any
 # SQLAlchemy 2.x style
 class Base(DeclarativeBase):
     """Base class for all database models"""
-    pass
+    # Server-generated values (created_at, updated_at, counters) come back from
+    # INSERT/UPDATE ... RETURNING at flush, so writes never need a refresh()
+    __mapper_args__ = {"eager_defaults": True}
 
 # For compatibility with older SQLAlchemy patterns
 metadata = Base.metadata
\ No newline at end of file
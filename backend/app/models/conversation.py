@@ -15,12 +15,12 @@ class Conversation(Base):
     title = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    lead_table_id = Column(UUID(as_uuid=True), ForeignKey("lead_tables.id"), nullable=True, index=True)
+    lead_table_id = Column(UUID(as_uuid=True), ForeignKey("lead_tables.id", ondelete="SET NULL"), nullable=True, index=True)
 
     # Relationships
     user = relationship("User", back_populates="conversations")
-    messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
-    leads = relationship("Lead", back_populates="conversation", cascade="all, delete-orphan")
+    messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan", passive_deletes=True)
+    leads = relationship("Lead", back_populates="conversation", cascade="all, delete-orphan", passive_deletes=True)
     lead_table = relationship("LeadTable", foreign_keys=[lead_table_id])
 
     def __repr__(self):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
@@ -9,6 +9,20 @@ from .base import Base
 class LeadCell(Base):
     """Lead Cell model - represents individual cell data in the lead table"""
     __tablename__ = "lead_cells"
+    # Expression indexes used by app/services/lead_query.py (see the
+    # lead_cell_query_indexes migration); the trigram index needs pg_trgm
+    __table_args__ = (
+        # One cell per row and column; the upsert target for cell edits
+        UniqueConstraint("row_id", "column_id", name="uq_lead_cells_row_column"),
+        Index("ix_lead_cells_column_search_key", "column_id", text("left(lower(value #>> '{}'), 200)")),
+        Index(
+            "ix_lead_cells_column_number",
+            "column_id",
+            text("(CASE WHEN jsonb_typeof(value) = 'number' THEN CAST(value #>> '{}' AS NUMERIC) END)"),
+            postgresql_where=text("jsonb_typeof(value) = 'number'"),
+        ),
+        Index("ix_lead_cells_value_trgm", text("lower(value #>> '{}') gin_trgm_ops"), postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     row_id = Column(UUID(as_uuid=True), ForeignKey("lead_rows.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
 
@@ -11,15 +11,19 @@ class LeadColumn(Base):
     __tablename__ = "lead_columns"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    data_table_id = Column(UUID(as_uuid=True), ForeignKey("lead_tables.id", ondelete="CASCADE"), nullable=False, index=True)
+    lead_table_id = Column(UUID(as_uuid=True), ForeignKey("lead_tables.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String, nullable=False)
+    # One of app.services.column_types.COLUMN_TYPES, inferred at ingestion
     column_type = Column(String, default="text", nullable=True)
     display_order = Column(Integer, default=0, nullable=True)
+    # Set for columns filled by EnrichmentService: instructions, status,
+    # progress and the lease of the worker running it
+    enrichment = Column(JSONB, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     data_table = relationship("LeadTable", back_populates="columns")
-    cells = relationship("LeadCell", back_populates="column", cascade="all, delete-orphan")
+    cells = relationship("LeadCell", back_populates="column", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
-        return f"<DataColumn(id={self.id}, name={self.name}, data_table_id={self.data_table_id})>"
\ No newline at end of file
+        return f"<DataColumn(id={self.id}, name={self.name}, lead_table_id={self.lead_table_id})>"
\ No newline at end of file
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, func, Enum
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, func, Enum
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 import uuid
 import enum
 
@@ -16,16 +16,27 @@ class EntityType(str, enum.Enum):
 class LeadRow(Base):
     """Data Row model - represents a single row in a data table"""
     __tablename__ = "lead_rows"
+    __table_args__ = (
+        Index("ix_lead_rows_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    data_table_id = Column(UUID(as_uuid=True), ForeignKey("lead_tables.id", ondelete="CASCADE"), nullable=False, index=True)
-    entity_type = Column(Enum(EntityType), default=EntityType.COMPANY, nullable=True)
+    lead_table_id = Column(UUID(as_uuid=True), ForeignKey("lead_tables.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Stored as the lowercase value in a text column, matching the Supabase schema
+    entity_type = Column(
+        Enum(EntityType, native_enum=False, length=16, values_callable=lambda enum: [member.value for member in enum]),
+        default=EntityType.COMPANY,
+        nullable=True
+    )
+    # Full-text index over the row's cell values, maintained by
+    # LeadService.refresh_search_vectors; deferred so row loads skip it
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     data_table = relationship("LeadTable", back_populates="rows")
-    cells = relationship("LeadCell", back_populates="row", cascade="all, delete-orphan")
+    cells = relationship("LeadCell", back_populates="row", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
-        return f"<DataRow(id={self.id}, entity_type={self.entity_type}, data_table_id={self.data_table_id})>"
\ No newline at end of file
+        return f"<DataRow(id={self.id}, entity_type={self.entity_type}, lead_table_id={self.lead_table_id})>"
\ No newline at end of file
@@ -32,4 +32,5 @@ class LeadSignal(Base):
     user = relationship("User", back_populates="signals")
     icp = relationship("IdealCustomerProfile", back_populates="signals")
 
-    def __repr__(self):
\ No newline at end of file
+    def __repr__(self):
+        return f"<LeadSignal(id={self.id}, name={self.name}, status={self.status})>"
\ No newline at end of file
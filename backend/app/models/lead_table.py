@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
@@ -9,6 +9,10 @@ from .base import Base
 class LeadTable(Base):
     """Data Table model - represents a collection of data with dynamic schema"""
     __tablename__ = "lead_tables"
+    __table_args__ = (
+        # The table list, most recently updated first
+        Index("ix_lead_tables_user_updated", "user_id", "updated_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -17,14 +21,25 @@ class LeadTable(Base):
     description = Column(String, nullable=True)
     table_type = Column(String, default="companies", nullable=True)
     default_columns = Column(JSONB, default=[], nullable=True)
+    # Bumped on every write to the table, its columns, rows or cells; used as the ETag validator
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Cached statistics, maintained by the triggers in app/db/triggers.py
+    row_count = Column(Integer, nullable=False, default=0, server_default="0")
+    column_count = Column(Integer, nullable=False, default=0, server_default="0")
+    company_count = Column(Integer, nullable=False, default=0, server_default="0")
+    person_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_ingested_at = Column(DateTime(timezone=True), nullable=True)
+    # Set when a large table is handed to the background chunked delete;
+    # such tables are hidden from every query until the purge finishes
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     user = relationship("User", back_populates="data_tables")
     conversation = relationship("Conversation", foreign_keys=[conversation_id])
-    columns = relationship("LeadColumn", back_populates="data_table", cascade="all, delete-orphan")
-    rows = relationship("LeadRow", back_populates="data_table", cascade="all, delete-orphan")
+    columns = relationship("LeadColumn", back_populates="data_table", cascade="all, delete-orphan", passive_deletes=True)
+    rows = relationship("LeadRow", back_populates="data_table", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<DataTable(id={self.id}, name={self.name}, user_id={self.user_id})>"
\ No newline at end of file
@@ -12,6 +12,8 @@ class User(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False, index=True)
+    # Billing plan; sizes the AI rate limits and token quotas (settings.rate_limits)
+    plan = Column(String, nullable=False, default="free", server_default="free")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -19,11 +21,11 @@ class User(Base):
     # We only store the user reference and profile data
     
     # Relationships
-    conversations = relationship("Conversation", back_populates="user", cascade="all, delete-orphan")
-    user_profile = relationship("UserProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
-    ideal_customer_profiles = relationship("IdealCustomerProfile", back_populates="user", cascade="all, delete-orphan")
-    signals = relationship("LeadSignal", back_populates="user", cascade="all, delete-orphan")
-    data_tables = relationship("LeadTable", back_populates="user", cascade="all, delete-orphan")
+    conversations = relationship("Conversation", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    user_profile = relationship("UserProfile", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    ideal_customer_profiles = relationship("IdealCustomerProfile", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    signals = relationship("LeadSignal", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    data_tables = relationship("LeadTable", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email})>"
\ No newline at end of file
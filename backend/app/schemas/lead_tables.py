@@ -1,27 +1,28 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from uuid import UUID
 
 
-# Data Table schemas
-class DataTableBase(BaseModel):
+# Lead Table schemas
+class LeadTableBase(BaseModel):
     name: str
     description: Optional[str] = None
     table_type: Optional[str] = "companies"
     default_columns: Optional[List[Dict[str, Any]]] = []
 
 
-class DataTableCreate(DataTableBase):
+class LeadTableCreate(LeadTableBase):
     pass
 
 
-class DataTableUpdate(BaseModel):
+class LeadTableUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     table_type: Optional[str] = None
 
 
-class DataTableResponse(DataTableBase):
+class LeadTableResponse(LeadTableBase):
     id: str
     user_id: str
     created_at: datetime
@@ -31,8 +32,16 @@ class DataTableResponse(DataTableBase):
         from_attributes = True
 
 
-# Data Row Data
-class DataRowData(BaseModel):
+class LeadTableSummary(LeadTableResponse):
+    """A table in the table list, with the statistics cached on lead_tables"""
+    row_count: int = 0
+    column_count: int = 0
+    entity_counts: Dict[str, int] = {}
+    last_ingested_at: Optional[datetime] = None
+
+
+# Lead Row Data
+class LeadRowData(BaseModel):
     id: str
     entity_type: str
     data: Dict[str, Any]
@@ -43,10 +52,101 @@ class DataRowData(BaseModel):
         from_attributes = True
 
 
-# Data Table with Data
-class DataTableWithData(DataTableResponse):
+# Lead Table with Data
+class LeadTableWithData(LeadTableResponse):
     columns: List[str]
-    rows: List[DataRowData]
+    rows: List[LeadRowData]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Lead search
+class LeadSearchHit(BaseModel):
+    row_id: str
+    entity_type: str
+    table_id: str
+    table_name: str
+    rank: float
+    data: Dict[str, Any]
+    matched_columns: List[str]
+
+
+# Facets
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
+
+class FacetBucket(BaseModel):
+    # Open-ended bands have no low or high
+    low: Optional[float] = None
+    high: Optional[float] = None
+    count: int
+
+
+class ColumnFacet(BaseModel):
+    type: str  # "values" or "histogram"
+    column_type: Optional[str] = None
+    values: Optional[List[FacetValue]] = None
+    distinct: Optional[int] = None
+    buckets: Optional[List[FacetBucket]] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    total: int
+    missing: int
+
+
+class LeadTableFacets(BaseModel):
+    table_id: str
+    version: int
+    rows: int
+    facets: Dict[str, ColumnFacet]
+
+
+# Column enrichment
+class ColumnEnrichmentRequest(BaseModel):
+    name: str
+    instructions: Optional[str] = None
+
+
+class ColumnEnrichmentStatus(BaseModel):
+    column_id: str
+    name: str
+    status: Optional[str]
+    instructions: Optional[str]
+    filled: int
+    total: int
+    failed_batches: int
+
+
+# Cell edits
+class CellChange(BaseModel):
+    row_id: UUID
+    column: str
+    value: Any = None
+
+
+class CellUpdateRequest(BaseModel):
+    changes: List[CellChange] = Field(..., min_length=1, max_length=50000)
+
+
+class CellUpdateResponse(BaseModel):
+    updated: int
+
+
+# Copying tables
+class LeadTableDuplicate(BaseModel):
+    name: Optional[str] = None
+    dedupe_on: Optional[str] = None
+
+
+class LeadTableMerge(BaseModel):
+    table_ids: List[UUID] = Field(..., min_length=2)
+    name: str
+    description: Optional[str] = None
+    dedupe_on: Optional[str] = None
+
+
+class LeadTableCopyResponse(LeadTableResponse):
+    rows_copied: int
+    cells_copied: int
@@ -0,0 +1,95 @@
+"""
+Production entry point: ``python -m app.server``.
+
+Runs uvicorn with ``WEB_CONCURRENCY`` worker processes, or one per CPU core
+available to the container (up to ``MAX_WORKERS``) when unset. Several
+workers need shared state, so without Redis the server runs a single worker
+(with a warning when more were asked for); Prometheus samples are collected
+across workers through ``PROMETHEUS_MULTIPROC_DIR``, which is created here
+when not set.
+
+This module does not import the app: workers import ``app.main`` themselves.
+"""
+import logging
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.state import state_backend_name
+
+logger = logging.getLogger(__name__)
+
+
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+CGROUP_V1_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+def cgroup_cpu_limit() -> Optional[int]:
+    """CPUs allowed by the container's cgroup CPU quota (``--cpus``), rounded up; None when unlimited"""
+    try:
+        if CGROUP_V2_CPU_MAX.exists():
+            quota, period = CGROUP_V2_CPU_MAX.read_text().split()[:2]
+        else:
+            quota, period = CGROUP_V1_QUOTA.read_text().strip(), CGROUP_V1_PERIOD.read_text().strip()
+    except (OSError, ValueError):
+        return None
+    if quota == "max" or int(quota) <= 0:
+        return None
+    return max(1, math.ceil(int(quota) / int(period)))
+
+
+def cpu_cores() -> int:
+    """CPU cores this process may use (respects container CPU sets and CPU quotas)"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    return min(cores, limit) if limit else cores
+
+
+def worker_count() -> int:
+    """Explicit WEB_CONCURRENCY, else one per core with Redis, else one"""
+    if settings.web_concurrency > 0:
+        workers = settings.web_concurrency
+    elif state_backend_name() == "memory":
+        return 1
+    else:
+        workers = max(1, min(cpu_cores(), settings.max_workers))
+
+    if workers > 1 and state_backend_name() == "memory":
+        logger.warning(
+            f"WEB_CONCURRENCY={workers} needs shared state; set REDIS_URL. Starting a single worker instead"
+        )
+        return 1
+    return workers
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    workers = worker_count()
+
+    if workers > 1:
+        if settings.metrics_enabled and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            # Inherited by the worker processes before they import prometheus_client
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="signaliq-metrics-")
+
+    logger.info(f"Starting {workers} worker(s) on {settings.host}:{settings.port} with {state_backend_name()} state")
+    uvicorn.run(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+    )
+
+
+if __name__ == "__main__":
+    main()
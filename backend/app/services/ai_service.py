@@ -7,7 +7,7 @@ import logging
 from typing import Dict, List, Any, Optional
 from abc import ABC, abstractmethod
 
-from app.services.openai_service import openai_service, WebsiteAnalysis, SignalGenerationResponse
+from app.services.openai_service import get_openai_service, WebsiteAnalysis, SignalGenerationResponse
 
 logger = logging.getLogger(__name__)
 
@@ -41,8 +41,9 @@ class AIServiceInterface(ABC):
 class OpenAIService(AIServiceInterface):
     """OpenAI implementation of AI service"""
     
-    def __init__(self):
-        self.openai_service = openai_service
+    @property
+    def openai_service(self):
+        return get_openai_service()
     
     async def analyze_website(self, website_url: str, website_content: str = None) -> WebsiteAnalysis:
         """Analyze a company website using OpenAI"""
@@ -80,8 +81,17 @@ class OpenAIService(AIServiceInterface):
         }
 
 
-# Global AI service instance - can be easily swapped for different implementations
-ai_service: AIServiceInterface = OpenAIService()
+# Shared AI service instance - can be easily swapped for different implementations.
+# Created on first use; endpoints receive it through Depends(get_ai_service)
+_ai_service: Optional[AIServiceInterface] = None
+
+
+def get_ai_service() -> AIServiceInterface:
+    """Dependency returning the shared AI service"""
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = OpenAIService()
+    return _ai_service
 
 
 # Future LangGraph implementation would look like:
@@ -94,5 +104,5 @@ ai_service: AIServiceInterface = OpenAIService()
 #         # LangGraph implementation
 #         pass
 #
-# To switch to LangGraph, just change:
-# ai_service = LangGraphService()
\ No newline at end of file
+# To switch to LangGraph, just change get_ai_service() to create:
+# LangGraphService()
\ No newline at end of file
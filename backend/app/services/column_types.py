@@ -0,0 +1,109 @@
+"""
+Lead column types.
+
+Column types are inferred from the values seen at ingestion and cell values
+are stored natively typed in ``LeadCell.value`` (JSONB numbers, booleans,
+objects and arrays), so reads return them as-is and the database can sort and
+filter numerically. Dates and URLs are JSON strings; their column type tells
+the frontend and the query layer how to treat them.
+"""
+import math
+import re
+from typing import Any, Iterable, Optional
+
+NUMBER = "number"
+INTEGER = "integer"
+BOOLEAN = "boolean"
+DATE = "date"
+URL = "url"
+JSON = "json"
+TEXT = "text"
+
+COLUMN_TYPES = (NUMBER, INTEGER, BOOLEAN, DATE, URL, JSON, TEXT)
+NUMERIC_TYPES = (NUMBER, INTEGER)
+
+# No leading zeros (zip codes, ids) and at most 15 digits (phone numbers, and
+# JavaScript's safe integer range)
+_INTEGER_RE = re.compile(r"^-?(0|[1-9]\d{0,14})$")
+# Exponents are bounded; values that still overflow a float (JSONB cannot
+# store infinity) are kept as text
+_NUMBER_RE = re.compile(r"^-?(0|[1-9]\d{0,14})(\.\d+)?([eE][+-]?\d{1,3})?$")
+# Also valid Postgres regular expressions, for typing stored cells in SQL
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?)?$"
+URL_PATTERN = r"^(https?://|www\.)\S+$"
+_DATE_RE = re.compile(DATE_PATTERN)
+_URL_RE = re.compile(URL_PATTERN, re.IGNORECASE)
+_BOOLEANS = {"true": True, "false": False}
+
+
+def _is_number(text: str) -> bool:
+    return bool(_NUMBER_RE.match(text)) and math.isfinite(float(text))
+
+
+def value_type(value: Any) -> Optional[str]:
+    """Type of a single value, or None for empty values"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return BOOLEAN
+    if isinstance(value, int):
+        return INTEGER
+    if isinstance(value, float):
+        return NUMBER if math.isfinite(value) else TEXT
+    if isinstance(value, (dict, list)):
+        return JSON
+    text = str(value).strip()
+    if not text:
+        return None
+    if _INTEGER_RE.match(text):
+        return INTEGER
+    if _is_number(text):
+        return NUMBER
+    if text.lower() in _BOOLEANS:
+        return BOOLEAN
+    if _DATE_RE.match(text):
+        return DATE
+    if _URL_RE.match(text):
+        return URL
+    return TEXT
+
+
+def widen(current: Optional[str], other: Optional[str]) -> Optional[str]:
+    """Narrowest type that holds values of both types"""
+    if current is None:
+        return other
+    if other is None or other == current:
+        return current
+    if {current, other} == {INTEGER, NUMBER}:
+        return NUMBER
+    return TEXT
+
+
+def infer_column_type(values: Iterable[Any]) -> Optional[str]:
+    """Type of a column from its values; None when every value is empty"""
+    inferred = None
+    for value in values:
+        inferred = widen(inferred, value_type(value))
+        if inferred == TEXT:
+            break
+    return inferred
+
+
+def coerce_value(value: Any, column_type: Optional[str]) -> Any:
+    """Cell value as stored for a column of ``column_type``"""
+    if isinstance(value, float) and not math.isfinite(value):
+        # NDJSON numbers such as 1e999 parse to infinity
+        return str(value)
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if not text:
+        return None
+    if column_type in NUMERIC_TYPES:
+        if _INTEGER_RE.match(text):
+            return int(text)
+        if _is_number(text):
+            return float(text)
+    elif column_type == BOOLEAN and text.lower() in _BOOLEANS:
+        return _BOOLEANS[text.lower()]
+    return value
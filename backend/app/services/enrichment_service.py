@@ -0,0 +1,307 @@
+"""
+Column enrichment: fill one new column for a table's existing rows, instead
+of regenerating the leads.
+
+Rows without a cell in the column are sent to the LLM in batches
+(``enrichment_batch_size`` rows per call, ``enrichment_concurrency`` calls at
+a time) and each batch's cells are inserted in bulk in their own transaction.
+Progress lives in ``LeadColumn.enrichment``, so a job interrupted by a crash
+or restart is resumed by running it again: only rows still missing a cell
+are sent.
+
+The LLM tokens of every batch are charged to the table owner's daily quota,
+and batches stop once it is spent; posting the column again resumes the job.
+
+Values are coerced to the type their batch infers, as in an import. When the
+job ends the column type is computed from the stored cells in SQL, and if it
+comes out text, cells stored as numbers or booleans are rewritten as strings.
+
+A job is owned by one worker at a time through a lease in the same JSON
+document. The owner renews it with every batch; a batch commits only while
+its worker still holds the lease, so a resumed job never duplicates cells.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import DateTime, Integer, String, cast, exists, func, literal_column, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.rate_limit import metered_tokens, token_quota_left
+from app.db.session import get_session_maker
+from app.models.lead_cell import LeadCell
+from app.models.lead_column import LeadColumn
+from app.models.lead_row import LeadRow
+from app.models.lead_table import LeadTable
+from app.models.user import User
+from app.services.column_types import DATE_PATTERN, TEXT, URL_PATTERN, coerce_value, infer_column_type
+from app.services.lead_service import LeadService
+from app.services.openai_service import get_openai_service
+
+logger = logging.getLogger(__name__)
+
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Type of a column from its stored cells, as column_types.infer_column_type
+# would infer it; NULL when every cell is empty
+_COLUMN_TYPE_SQL = """
+    SELECT CASE
+        WHEN count(*) = 0 THEN NULL
+        WHEN bool_and(jsonb_typeof(value) = 'number') THEN
+            CASE WHEN bool_and(value #>> '{}' ~ '^-?[0-9]+$') THEN 'integer' ELSE 'number' END
+        WHEN bool_and(jsonb_typeof(value) = 'boolean') THEN 'boolean'
+        WHEN bool_and(jsonb_typeof(value) IN ('object', 'array')) THEN 'json'
+        WHEN bool_and(jsonb_typeof(value) = 'string' AND value #>> '{}' ~ :date_pattern) THEN 'date'
+        WHEN bool_and(jsonb_typeof(value) = 'string' AND value #>> '{}' ~* :url_pattern) THEN 'url'
+        ELSE 'text'
+    END
+    FROM lead_cells
+    WHERE column_id = :column_id AND value IS NOT NULL AND jsonb_typeof(value) <> 'null'
+"""
+
+
+class EnrichmentConflict(ValueError):
+    """The column name is taken by a column that is not enriched"""
+
+
+def _merge(**values: Any):
+    """``enrichment || jsonb_build_object(...)`` with typed values"""
+    arguments = []
+    for key, value in values.items():
+        arguments += [literal_column(f"'{key}'"), value]
+    return LeadColumn.enrichment.op("||")(func.jsonb_build_object(*arguments))
+
+
+def _lease_expiry():
+    return func.now() + timedelta(seconds=settings.enrichment_lease_seconds)
+
+
+class EnrichmentService:
+    """Fills new lead columns from the LLM, batch by batch"""
+
+    def __init__(self):
+        self.lead_service = LeadService()
+
+    async def start(self, db: AsyncSession, table: LeadTable, name: str, instructions: Optional[str]) -> LeadColumn:
+        """
+        Create the column (or reopen an enriched one, which fills any rows
+        added since) and mark its enrichment as running
+        """
+        result = await db.execute(
+            select(LeadColumn)
+            .where(LeadColumn.lead_table_id == table.id, LeadColumn.name == name)
+        )
+        column = result.scalar_one_or_none()
+
+        if column is None:
+            display_order = await db.scalar(
+                select(func.coalesce(func.max(LeadColumn.display_order) + 1, 0))
+                .where(LeadColumn.lead_table_id == table.id)
+            )
+            column = LeadColumn(
+                lead_table_id=table.id,
+                name=name,
+                column_type=TEXT,
+                display_order=display_order,
+                enrichment={"instructions": instructions or name, "status": RUNNING, "filled": 0, "total": 0},
+            )
+            db.add(column)
+        elif column.enrichment is None:
+            raise EnrichmentConflict(f"Column '{name}' already exists")
+        else:
+            column.enrichment = {
+                **column.enrichment,
+                "instructions": instructions or column.enrichment.get("instructions") or name,
+                "status": RUNNING,
+            }
+
+        await db.commit()
+        return column
+
+    async def run(self, column_id: UUID) -> None:
+        """Fill every row still missing a value in the column; a no-op if another worker holds the job"""
+        session_maker = get_session_maker()
+        owner = str(uuid.uuid4())
+
+        async with session_maker() as db:
+            claimed = await self._claim(db, column_id, owner)
+            if claimed is None:
+                logger.info(f"Enrichment of column {column_id} is not running or is held by another worker")
+                return
+            table_id, column_name, instructions = claimed
+            # Charged for the job's tokens
+            user = await db.scalar(
+                select(User).join(LeadTable, LeadTable.user_id == User.id).where(LeadTable.id == table_id)
+            )
+
+            missing_result = await db.execute(
+                select(LeadRow.id)
+                .where(
+                    LeadRow.lead_table_id == table_id,
+                    ~exists().where(LeadCell.row_id == LeadRow.id, LeadCell.column_id == column_id),
+                )
+                .order_by(LeadRow.created_at, LeadRow.id)
+            )
+            missing = missing_result.scalars().all()
+            total = await db.scalar(select(func.count()).select_from(LeadRow).where(LeadRow.lead_table_id == table_id))
+            await db.execute(
+                update(LeadColumn)
+                .where(LeadColumn.id == column_id)
+                .values(enrichment=_merge(total=cast(total, Integer), filled=cast(total - len(missing), Integer)))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        batch_size = settings.enrichment_batch_size
+        batches = [missing[start:start + batch_size] for start in range(0, len(missing), batch_size)]
+        logger.info(f"Enriching column '{column_name}' ({column_id}): {len(missing)} rows in {len(batches)} batches")
+
+        semaphore = asyncio.Semaphore(settings.enrichment_concurrency)
+        context = (user, column_id, column_name, instructions, owner)
+        results = await asyncio.gather(*(self._run_batch(semaphore, context, batch) for batch in batches))
+
+        async with session_maker() as db:
+            await self._finish(db, column_id, owner, failed=results.count(False))
+
+    async def resume_unfinished(self) -> None:
+        """Resume running jobs whose worker went away (expired or missing lease)"""
+        async with get_session_maker()() as db:
+            result = await db.execute(
+                select(LeadColumn.id)
+                .where(LeadColumn.enrichment["status"].astext == RUNNING, self._lease_available())
+            )
+            column_ids = result.scalars().all()
+        for column_id in column_ids:
+            await self.run(column_id)
+
+    def _lease_available(self):
+        lease_expires = LeadColumn.enrichment["lease_expires"].astext
+        return or_(lease_expires.is_(None), cast(lease_expires, DateTime(timezone=True)) < func.now())
+
+    async def _claim(self, db: AsyncSession, column_id: UUID, owner: str) -> Optional[tuple]:
+        result = await db.execute(
+            update(LeadColumn)
+            .where(
+                LeadColumn.id == column_id,
+                LeadColumn.enrichment["status"].astext == RUNNING,
+                self._lease_available(),
+            )
+            .values(enrichment=_merge(owner=cast(owner, String), lease_expires=_lease_expiry()))
+            .returning(LeadColumn.lead_table_id, LeadColumn.name, LeadColumn.enrichment["instructions"].astext)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = result.first()
+        await db.commit()
+        return tuple(claimed) if claimed else None
+
+    async def _load_rows(self, db: AsyncSession, row_ids: List[UUID], column_id: UUID) -> Dict[UUID, Dict[str, Any]]:
+        """Existing data of the given rows, without the column being filled"""
+        result = await db.execute(
+            select(LeadCell.row_id, LeadColumn.name, LeadCell.value)
+            .join(LeadColumn, LeadColumn.id == LeadCell.column_id)
+            .where(LeadCell.row_id.in_(row_ids), LeadCell.column_id != column_id)
+            .order_by(LeadColumn.display_order)
+        )
+        rows = {row_id: {} for row_id in row_ids}
+        for row_id, name, value in result:
+            if value is not None and value != "":
+                rows[row_id][name] = value
+        return rows
+
+    async def _run_batch(self, semaphore: asyncio.Semaphore, context: tuple, row_ids: List[UUID]) -> bool:
+        user, column_id, column_name, instructions, owner = context
+        async with semaphore:
+            try:
+                if not await token_quota_left(user):
+                    logger.warning(f"Daily token quota of user {user.id} spent; skipping a batch of column {column_id}")
+                    return False
+                # No session stays open across the LLM call, so a batch never
+                # holds a connection idle in a transaction while it waits
+                async with get_session_maker()() as db:
+                    rows = await self._load_rows(db, row_ids, column_id)
+                async with metered_tokens(user.id):
+                    response = await get_openai_service().enrich_column(
+                        column_name, instructions, [rows[row_id] for row_id in row_ids]
+                    )
+                values = {item.row: item.value for item in response.values}
+                batch_type = infer_column_type(values.values())
+
+                async with get_session_maker()() as db:
+                    # Rows the model skipped are stored empty so a resume does not retry them
+                    # forever; cells written meanwhile (PATCH /cells, a takeover) are kept
+                    cells = pg_insert(LeadCell).on_conflict_do_nothing(constraint="uq_lead_cells_row_column")
+                    await db.execute(cells, [
+                        {
+                            "id": uuid.uuid4(),
+                            "row_id": row_id,
+                            "column_id": column_id,
+                            "value": coerce_value(values.get(number), batch_type),
+                        }
+                        for number, row_id in enumerate(row_ids, 1)
+                    ])
+                    renewed = await db.execute(
+                        update(LeadColumn)
+                        .where(LeadColumn.id == column_id, LeadColumn.enrichment["owner"].astext == owner)
+                        .values(enrichment=_merge(
+                            filled=LeadColumn.enrichment["filled"].astext.cast(Integer) + len(row_ids),
+                            lease_expires=_lease_expiry(),
+                        ))
+                        .execution_options(synchronize_session=False)
+                    )
+                    if renewed.rowcount == 0:
+                        # Another worker took the job over; its run covers these rows
+                        await db.rollback()
+                        logger.warning(f"Lost the lease on column {column_id}; dropping a batch of {len(row_ids)} rows")
+                        return False
+                    await self.lead_service.refresh_search_vectors(db, row_ids)
+                    await db.commit()
+                    return True
+            except Exception as e:
+                logger.error(f"Enrichment batch of {len(row_ids)} rows for column {column_id} failed: {str(e)}")
+                return False
+
+    async def _finish(self, db: AsyncSession, column_id: UUID, owner: str, failed: int) -> None:
+        column_type = await db.scalar(
+            text(_COLUMN_TYPE_SQL),
+            {"column_id": column_id, "date_pattern": DATE_PATTERN, "url_pattern": URL_PATTERN},
+        ) or TEXT
+        status = COMPLETED if failed == 0 else FAILED
+
+        finished = await db.execute(
+            update(LeadColumn)
+            .where(LeadColumn.id == column_id, LeadColumn.enrichment["owner"].astext == owner)
+            .values(
+                column_type=column_type,
+                enrichment=_merge(
+                    status=cast(status, String),
+                    failed_batches=cast(failed, Integer),
+                    lease_expires=literal_column("NULL"),
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if finished.rowcount and column_type == TEXT:
+            # Batches that inferred numbers or booleans stored them typed
+            await self.lead_service.stringify_cells(db, [column_id])
+        await db.commit()
+        logger.info(f"Enrichment of column {column_id} {status} ({failed} failed batches)")
+
+    def status(self, column: LeadColumn) -> Dict[str, Any]:
+        """Public progress of a column's enrichment"""
+        enrichment = column.enrichment or {}
+        return {
+            "column_id": str(column.id),
+            "name": column.name,
+            "status": enrichment.get("status"),
+            "instructions": enrichment.get("instructions"),
+            "filled": enrichment.get("filled", 0),
+            "total": enrichment.get("total", 0),
+            "failed_batches": enrichment.get("failed_batches", 0),
+        }
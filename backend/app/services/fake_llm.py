@@ -0,0 +1,143 @@
+"""
+Fake LLM provider
+
+Drop-in stand-in for ``AsyncOpenAI`` that answers chat completions with
+deterministic, schema-valid JSON for every registered template. Enabled with
+``LLM_PROVIDER=fake``; used for offline development and benchmarks so they
+exercise the full request path without network calls or API costs.
+"""
+import asyncio
+import json
+import random
+import re
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+INDUSTRIES = ["Fintech", "Healthtech", "Web3", "SaaS", "E-commerce", "Climate", "Cybersecurity", "EdTech"]
+LOCATIONS = ["Berlin", "London", "New York", "San Francisco", "Paris", "Amsterdam", "Singapore", "Toronto"]
+STAGES = ["Pre-seed", "Seed", "Series A", "Series B", "Series C"]
+LEAD_COLUMNS = ["Name", "Industry", "Location", "Funding Stage", "Funding Amount", "Employees", "Website"]
+
+
+def _fake_leads(query: str, **kwargs) -> Dict[str, Any]:
+    match = re.search(r"\b(\d{1,3})\b", query)
+    count = min(int(match.group(1)), 50) if match else 10
+    rng = random.Random(query)
+
+    leads = []
+    for i in range(count):
+        name = f"{rng.choice(['Nova', 'Apex', 'Blue', 'Quantum', 'Bright', 'Vertex'])}{rng.choice(['Labs', 'AI', 'Pay', 'Health', 'Data'])} {i + 1}"
+        leads.append({
+            "entity_type": "company",
+            "data": {
+                "Name": name,
+                "Industry": rng.choice(INDUSTRIES),
+                "Location": rng.choice(LOCATIONS),
+                "Funding Stage": rng.choice(STAGES),
+                "Funding Amount": rng.randrange(250_000, 50_000_000, 250_000),
+                "Employees": rng.randrange(5, 500),
+                "Website": f"https://{name.lower().replace(' ', '')}.example.com",
+            }
+        })
+
+    return {
+        "message": f"Found {count} companies matching your criteria.",
+        "leads": leads,
+        "suggested_columns": LEAD_COLUMNS,
+    }
+
+
+def _fake_website_analysis(**kwargs) -> Dict[str, Any]:
+    return {
+        "company_description": "B2B software company helping sales teams find prospects.",
+        "industry": "SaaS",
+        "target_market": "Mid-market B2B sales organisations",
+        "key_products": ["Lead discovery", "Signal tracking"],
+        "value_proposition": "Find in-market accounts before competitors do.",
+        "company_size_indicators": "50-200 employees",
+        "technology_stack": ["Python", "React", "PostgreSQL"],
+        "recent_news": [],
+    }
+
+
+def _fake_signals(**kwargs) -> Dict[str, Any]:
+    return {
+        "signals": [
+            {
+                "name": f"Signal {i + 1}",
+                "description": "Companies showing buying intent.",
+                "criteria": {"industry": INDUSTRIES[i % len(INDUSTRIES)]},
+                "priority": ["High", "Medium", "Low"][i % 3],
+                "estimated_volume": "10-50 leads/month",
+            }
+            for i in range(5)
+        ],
+        "reasoning": "Signals cover hiring, funding and technology adoption.",
+        "additional_recommendations": ["Review signals monthly"],
+    }
+
+
+def _fake_enrichment(prompt: str, **kwargs) -> Dict[str, Any]:
+    column = re.search(r"New column:\s*(.*)", prompt).group(1).strip()
+    rows = re.findall(r"^\s*(\d+)\. (.*)$", prompt, re.MULTILINE)
+    values = []
+    for number, data in rows:
+        name = json.loads(data).get("Name", f"lead {number}")
+        values.append({"row": int(number), "value": f"{column} of {name}"})
+    return {"values": values}
+
+
+# System prompt marker -> response builder. Templates are told apart by a
+# phrase unique to their system prompt.
+RESPONDERS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "You are SignalIQ": _fake_leads,
+    "business intelligence analyst": _fake_website_analysis,
+    "lead generation expert": _fake_signals,
+    "lead enrichment assistant": _fake_enrichment,
+}
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class _FakeCompletions:
+    def __init__(self, latency_ms: int):
+        self.latency_ms = latency_ms
+
+    async def create(self, model: str, messages: List[Dict[str, str]], **kwargs) -> Any:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        system_prompt = messages[0]["content"]
+        user_prompt = messages[-1]["content"]
+        for marker, responder in RESPONDERS.items():
+            if marker in system_prompt:
+                query = re.search(r"Query:\s*(.*)", user_prompt)
+                payload = responder(query=query.group(1) if query else user_prompt, prompt=user_prompt)
+                break
+        else:
+            raise ValueError("Fake LLM has no responder for this template")
+
+        content = json.dumps(payload)
+        prompt_tokens = sum(_estimate_tokens(m["content"]) for m in messages)
+        completion_tokens = _estimate_tokens(content)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+
+class FakeAsyncOpenAI:
+    """Minimal ``AsyncOpenAI`` look-alike covering ``chat.completions.create``"""
+
+    def __init__(self, latency_ms: int = 0):
+        self.chat = SimpleNamespace(completions=_FakeCompletions(latency_ms))
+
+    async def close(self) -> None:
+        pass
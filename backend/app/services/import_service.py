@@ -0,0 +1,347 @@
+"""
+Bulk import of CSV and NDJSON files into a new lead table.
+
+The upload is parsed incrementally: records are read ``import_batch_size`` at
+a time (in a worker thread, the multipart upload is spooled to disk) and each
+batch is loaded with ``COPY`` into ``lead_rows`` and ``lead_cells`` and
+committed on its own, so memory stays bounded by the batch and progress is
+visible while the file loads.
+
+CSV columns come from the header row; NDJSON columns are added as new keys
+appear. Column types are widened batch by batch and cells are stored typed
+for the type known so far. When a later batch widens a column to text, the
+typed cells stored before are rewritten as strings at the end.
+
+Lines that cannot be parsed are skipped and reported with their line number.
+An import that fails or is cancelled (the client disconnects) does not leave
+a partial table behind: the table is marked deleted and purged.
+"""
+import asyncio
+import csv
+import io
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.background import spawn
+from app.core.config import settings
+from app.db.session import get_session_maker
+from app.models.lead_column import LeadColumn
+from app.models.lead_row import EntityType
+from app.models.lead_table import LeadTable
+from app.services.column_types import BOOLEAN, NUMERIC_TYPES, TEXT, coerce_value, infer_column_type, widen
+from app.services.lead_service import LeadService
+
+logger = logging.getLogger(__name__)
+
+CSV = "csv"
+NDJSON = "ndjson"
+IMPORT_FORMATS = (CSV, NDJSON)
+
+_FORMAT_SUFFIXES = {".csv": CSV, ".ndjson": NDJSON, ".jsonl": NDJSON}
+_FORMAT_CONTENT_TYPES = {"text/csv": CSV, "application/x-ndjson": NDJSON, "application/jsonl": NDJSON}
+
+class LeadImportError(ValueError):
+    """The upload cannot be imported at all (unknown format, no header)"""
+
+
+# (line number, record or None, error message or None)
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """Import format from the explicit choice, the file extension or the content type"""
+    if requested:
+        if requested.lower() not in IMPORT_FORMATS:
+            raise LeadImportError(f"Unsupported format {requested!r}; expected one of {', '.join(IMPORT_FORMATS)}")
+        return requested.lower()
+    name = (filename or "").lower()
+    for suffix, import_format in _FORMAT_SUFFIXES.items():
+        if name.endswith(suffix):
+            return import_format
+    import_format = _FORMAT_CONTENT_TYPES.get((content_type or "").split(";")[0].strip().lower())
+    if import_format is None:
+        raise LeadImportError("Cannot tell the file format; upload a .csv or .ndjson file or pass format")
+    return import_format
+
+
+def _header_names(header: List[str]) -> List[str]:
+    """Column names from a CSV header; blank names get a position, duplicates a suffix"""
+    names = []
+    seen: Set[str] = set()
+    for position, raw in enumerate(header, 1):
+        base = raw.strip() or f"Column {position}"
+        name, suffix = base, 2
+        while name in seen:
+            name, suffix = f"{base} ({suffix})", suffix + 1
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def _csv_records(stream: io.TextIOBase) -> Tuple[List[str], Iterator[Record]]:
+    reader = csv.reader(stream)
+    try:
+        header = next(reader, None)
+    except csv.Error as e:
+        raise LeadImportError(f"Invalid CSV header: {str(e)}")
+    if not header or not any(name.strip() for name in header):
+        raise LeadImportError("The CSV file has no header row")
+    names = _header_names(header)
+
+    def records() -> Iterator[Record]:
+        while True:
+            try:
+                values = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield reader.line_num, None, str(e)
+                continue
+            if not any(value.strip() for value in values):
+                continue
+            if len(values) > len(names):
+                yield reader.line_num, None, f"{len(values)} fields, the header has {len(names)}"
+                continue
+            yield reader.line_num, dict(zip(names, values)), None
+
+    return names, records()
+
+
+def _ndjson_records(stream: io.TextIOBase) -> Iterator[Record]:
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, {str(key).strip(): value for key, value in record.items() if str(key).strip()}, None
+
+
+def open_records(file: BinaryIO, import_format: str) -> Tuple[List[str], Iterator[Record]]:
+    """
+    Header columns (empty for NDJSON) and a lazy iterator over the file's
+    records. Blocking; reads the CSV header.
+    """
+    file.seek(0)
+    # Undecodable bytes (Latin-1 exports) are replaced rather than failing the import
+    stream = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+    if import_format == CSV:
+        return _csv_records(stream)
+    return [], _ndjson_records(stream)
+
+
+def _next_batch(records: Iterator[Record], size: int) -> List[Record]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+@dataclass
+class ImportProgress:
+    rows: int = 0
+    cells: int = 0
+    errors: int = 0
+    error_details: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> Optional[Dict[str, Any]]:
+        """Count an error; returns it while under ``import_max_reported_errors``"""
+        self.errors += 1
+        if len(self.error_details) >= settings.import_max_reported_errors:
+            return None
+        error = {"line": line, "message": message}
+        self.error_details.append(error)
+        return error
+
+
+def _event(event: str, **values: Any) -> bytes:
+    return (json.dumps({"event": event, **values}, default=str) + "\n").encode()
+
+
+class ImportService:
+    """Loads parsed records into a lead table with COPY"""
+
+    def __init__(self):
+        self.lead_service = LeadService()
+
+    async def run(
+        self,
+        table_id: UUID,
+        header: List[str],
+        records: Iterator[Record],
+        entity_type: EntityType = EntityType.COMPANY,
+    ) -> AsyncIterator[bytes]:
+        """
+        Import every record, yielding NDJSON progress events: ``progress``
+        after each batch, ``error`` per rejected line (up to
+        ``import_max_reported_errors``) and a final ``done`` or ``failed``.
+        A failed or cancelled import discards the table.
+        """
+        progress = ImportProgress()
+        columns: Dict[str, LeadColumn] = {}
+        # Types each column's cells were coerced with, to find cells to rewrite
+        stored_types: Dict[str, Set[str]] = {}
+        # Rows sort by created_at; offsets keep the file order within a COPY
+        started = datetime.now(timezone.utc)
+
+        try:
+            async with get_session_maker()() as db:
+                await self._add_columns(db, table_id, columns, header)
+                await db.commit()
+
+                while True:
+                    batch = await asyncio.to_thread(_next_batch, records, settings.import_batch_size)
+                    if not batch:
+                        break
+
+                    parsed = []
+                    for line, record, error in batch:
+                        if error is None:
+                            parsed.append(record)
+                            continue
+                        reported = progress.add_error(line, error)
+                        if reported is not None:
+                            yield _event("error", **reported)
+
+                    if parsed:
+                        await self._load_batch(db, table_id, parsed, columns, stored_types, started, progress, entity_type)
+                    yield _event("progress", rows=progress.rows, cells=progress.cells, errors=progress.errors)
+
+                await self._stringify_widened(db, columns, stored_types)
+                await db.commit()
+        except BaseException as e:
+            # Cleanup runs detached: a cancelled generator cannot await any more
+            spawn(self.discard(table_id), name=f"discard-import-{table_id}")
+            if not isinstance(e, Exception):
+                logger.warning(f"Import into lead table {table_id} cancelled after {progress.rows} rows; discarding it")
+                raise
+            logger.error(f"Import into lead table {table_id} failed after {progress.rows} rows: {str(e)}")
+            yield _event("failed", table_id=str(table_id), rows=progress.rows, message="Import failed; the table was discarded")
+            return
+
+        logger.info(f"Imported {progress.rows} rows into lead table {table_id} ({progress.errors} rejected lines)")
+        yield _event(
+            "done",
+            table_id=str(table_id),
+            rows=progress.rows,
+            cells=progress.cells,
+            columns=len(columns),
+            errors=progress.errors,
+        )
+
+    async def discard(self, table_id: UUID) -> None:
+        """Hide a partly imported table right away, then purge it in chunks"""
+        async with get_session_maker()() as db:
+            await db.execute(
+                update(LeadTable)
+                .where(LeadTable.id == table_id)
+                .values(deleted_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        await self.lead_service.purge_table(table_id)
+
+    async def _add_columns(self, db: AsyncSession, table_id: UUID, columns: Dict[str, LeadColumn], names: List[str]) -> None:
+        for name in names:
+            if name in columns:
+                continue
+            column = LeadColumn(
+                id=uuid.uuid4(),
+                lead_table_id=table_id,
+                name=name,
+                column_type=None,
+                display_order=len(columns),
+            )
+            db.add(column)
+            columns[name] = column
+        await db.flush()
+
+    async def _load_batch(
+        self,
+        db: AsyncSession,
+        table_id: UUID,
+        records: List[Dict[str, Any]],
+        columns: Dict[str, LeadColumn],
+        stored_types: Dict[str, Set[str]],
+        started: datetime,
+        progress: ImportProgress,
+        entity_type: EntityType,
+    ) -> None:
+        """COPY one batch of rows and cells in its own transaction"""
+        # NDJSON keys seen for the first time become columns
+        new_names = [name for record in records for name in record if name not in columns]
+        await self._add_columns(db, table_id, columns, list(dict.fromkeys(new_names)))
+
+        values_by_column: Dict[str, List[Any]] = {}
+        for record in records:
+            for name, value in record.items():
+                values_by_column.setdefault(name, []).append(value)
+        for name, values in values_by_column.items():
+            column = columns[name]
+            column_type = widen(column.column_type, infer_column_type(values))
+            # Flushed with the batch
+            column.column_type = column_type
+            if column_type is not None:
+                stored_types.setdefault(name, set()).add(column_type)
+
+        row_records = []
+        cell_records = []
+        for record in records:
+            row_id = uuid.uuid4()
+            row_records.append((
+                row_id,
+                table_id,
+                entity_type.value,
+                started + timedelta(microseconds=progress.rows + len(row_records)),
+            ))
+            for name, value in record.items():
+                column = columns[name]
+                value = coerce_value(value, column.column_type)
+                if value is None:
+                    continue
+                cell_records.append((uuid.uuid4(), row_id, column.id, json.dumps(value, ensure_ascii=False)))
+
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver = raw_connection.driver_connection
+        await driver.copy_records_to_table(
+            "lead_rows", records=row_records, columns=["id", "lead_table_id", "entity_type", "created_at"]
+        )
+        await driver.copy_records_to_table(
+            "lead_cells", records=cell_records, columns=["id", "row_id", "column_id", "value"]
+        )
+
+        await self.lead_service.refresh_search_vectors(db, [row[0] for row in row_records])
+        await db.commit()
+        progress.rows += len(row_records)
+        progress.cells += len(cell_records)
+
+    async def _stringify_widened(
+        self, db: AsyncSession, columns: Dict[str, LeadColumn], stored_types: Dict[str, Set[str]]
+    ) -> None:
+        """Rewrite cells stored as numbers or booleans in columns that ended up text"""
+        column_ids = [
+            columns[name].id
+            for name, types in stored_types.items()
+            if columns[name].column_type == TEXT and types & {BOOLEAN, *NUMERIC_TYPES}
+        ]
+        await self.lead_service.stringify_cells(db, column_ids)
+        # Columns with only empty values
+        for column in columns.values():
+            if column.column_type is None:
+                column.column_type = TEXT
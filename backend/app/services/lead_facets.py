@@ -0,0 +1,273 @@
+"""
+Facets (aggregate breakdowns) of a lead table's columns, computed in SQL.
+
+- Text-like columns get their ``top`` most frequent values with counts, plus
+  the number of distinct and missing values.
+- Number columns get a histogram: ``buckets`` equal-width buckets between the
+  column's minimum and maximum, or explicit bands (``Employees:10|50|200``,
+  i.e. <10, 10-50, 50-200, 200+).
+
+All value facets come from one grouped query and all equal-width histograms
+from another; banded columns add one query each. Filters restrict the
+facets to the matching rows.
+
+Results are cached in the shared state per table version and parameters,
+so facet panels re-render without touching the cells until the table
+changes, whichever worker serves them.
+"""
+import hashlib
+import json
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Numeric, bindparam, case, func, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.state import SharedCache
+from app.models.lead_cell import LeadCell
+from app.models.lead_row import LeadRow
+from app.services.lead_query import (
+    IN_SEPARATOR, CellFilter, ColumnRef, LeadQueryError, apply_filters, numeric_value, text_value
+)
+
+VALUES = "values"
+HISTOGRAM = "histogram"
+
+
+def parse_facet_columns(values: Sequence[str], columns: Dict[str, ColumnRef]) -> List[ColumnRef]:
+    """Columns named by repeated or comma-separated values; every column when none are given"""
+    names = []
+    for value in values:
+        # A column whose name contains a comma can still be named on its own
+        names.extend([value] if value in columns else [name.strip() for name in value.split(",") if name.strip()])
+    for name in names:
+        if name not in columns:
+            raise LeadQueryError(f"Unknown column: {name}")
+    if not names:
+        return list(columns.values())
+    return [columns[name] for name in dict.fromkeys(names)]
+
+
+def parse_bands(expressions: Sequence[str], columns: Dict[str, ColumnRef]) -> Dict[str, List[Decimal]]:
+    """Parse ``<column>:<b1>|<b2>|...`` band boundaries of number columns"""
+    bands = {}
+    for expression in expressions:
+        name, separator, raw = expression.rpartition(":")
+        if not separator or name not in columns:
+            raise LeadQueryError(f"Invalid bands {expression!r}; expected <column>:<b1>|<b2>|... on a known column")
+        if not columns[name].numeric:
+            raise LeadQueryError(f"Column {name} is not a number column")
+        try:
+            boundaries = sorted({Decimal(value.strip()) for value in raw.split(IN_SEPARATOR) if value.strip()})
+        except ArithmeticError:
+            raise LeadQueryError(f"Invalid bands {expression!r}; boundaries must be numbers")
+        if not boundaries or not all(boundary.is_finite() for boundary in boundaries):
+            raise LeadQueryError(f"Invalid bands {expression!r}; boundaries must be numbers")
+        bands[name] = boundaries
+    return bands
+
+
+def _number(value: Optional[Decimal]) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+_facet_cache: Optional[SharedCache] = None
+
+
+def get_facet_cache() -> SharedCache:
+    """Facet results shared by all workers; keys start with ``<table_id>:<version>:``"""
+    global _facet_cache
+    if _facet_cache is None:
+        _facet_cache = SharedCache("facets", settings.facet_cache_size, settings.facet_cache_ttl_seconds)
+    return _facet_cache
+
+
+def facet_cache_key(table_id: UUID, version: int, *parameters: Any) -> str:
+    digest = hashlib.sha1(json.dumps(parameters, default=str).encode()).hexdigest()
+    return f"{table_id}:{version}:{digest}"
+
+
+class FacetService:
+    """Computes value counts and histograms of lead table columns"""
+
+    async def facets(
+        self,
+        db: AsyncSession,
+        table_id: UUID,
+        row_count: int,
+        columns: List[ColumnRef],
+        filters: List[CellFilter],
+        bands: Dict[str, List[Decimal]],
+        top: int,
+        buckets: int,
+    ) -> Dict[str, Any]:
+        """Facets of ``columns``; ``row_count`` is the table's (cached) row count"""
+        row_ids = None
+        if filters:
+            row_ids = apply_filters(select(LeadRow.id).where(LeadRow.lead_table_id == table_id), filters)
+            row_count = await db.scalar(select(func.count()).select_from(row_ids.subquery()))
+
+        value_columns = [column for column in columns if not column.numeric and column.name not in bands]
+        histogram_columns = [column for column in columns if column.numeric and column.name not in bands]
+        banded_columns = [column for column in columns if column.name in bands]
+
+        facets = {}
+        facets.update(await self._value_facets(db, value_columns, row_ids, row_count, top))
+        facets.update(await self._histograms(db, histogram_columns, row_ids, row_count, buckets))
+        for column in banded_columns:
+            facets[column.name] = await self._banded_histogram(db, column, row_ids, row_count, bands[column.name])
+
+        return {
+            "rows": row_count,
+            "facets": {column.name: facets[column.name] for column in columns},
+        }
+
+    def _cells(self, column_ids: List[UUID], row_ids):
+        condition = [LeadCell.column_id.in_(column_ids)]
+        if row_ids is not None:
+            condition.append(LeadCell.row_id.in_(row_ids.scalar_subquery()))
+        return condition
+
+    async def _value_facets(self, db: AsyncSession, columns: List[ColumnRef], row_ids, row_count: int, top: int):
+        if not columns:
+            return {}
+        value = text_value(LeadCell)
+        counts = (
+            select(LeadCell.column_id, value.label("value"), func.count().label("hits"))
+            .where(*self._cells([column.id for column in columns], row_ids), func.btrim(value) != "")
+            .group_by(LeadCell.column_id, value)
+            .subquery()
+        )
+        by_column = {"partition_by": counts.c.column_id}
+        ranked = select(
+            counts,
+            func.row_number().over(order_by=(counts.c.hits.desc(), counts.c.value), **by_column).label("rank"),
+            func.sum(counts.c.hits).over(**by_column).label("total"),
+            func.count().over(**by_column).label("distinct"),
+        ).subquery()
+        result = await db.execute(
+            select(ranked.c.column_id, ranked.c.value, ranked.c.hits, ranked.c.total, ranked.c.distinct)
+            .where(ranked.c.rank <= top)
+            .order_by(ranked.c.column_id, ranked.c.rank)
+        )
+
+        facets = {
+            column.name: {
+                "type": VALUES, "column_type": column.column_type,
+                "values": [], "total": 0, "distinct": 0, "missing": row_count,
+            }
+            for column in columns
+        }
+        names = {column.id: column.name for column in columns}
+        for column_id, value, count, total, distinct in result:
+            facet = facets[names[column_id]]
+            facet["values"].append({"value": value, "count": count})
+            facet.update(total=int(total), distinct=distinct, missing=max(row_count - int(total), 0))
+        return facets
+
+    def _numbers(self, column_ids: List[UUID], row_ids):
+        """CTE of the JSON number values of the given columns"""
+        return (
+            select(LeadCell.column_id, numeric_value(LeadCell).label("number"))
+            .where(
+                *self._cells(column_ids, row_ids),
+                func.jsonb_typeof(LeadCell.value) == literal_column("'number'"),
+            )
+            .cte("numbers")
+        )
+
+    async def _histograms(self, db: AsyncSession, columns: List[ColumnRef], row_ids, row_count: int, buckets: int):
+        if not columns:
+            return {}
+        numbers = self._numbers([column.id for column in columns], row_ids)
+        bounds = (
+            select(
+                numbers.c.column_id,
+                func.min(numbers.c.number).label("low"),
+                func.max(numbers.c.number).label("high"),
+                func.count().label("total"),
+            )
+            .group_by(numbers.c.column_id)
+            .cte("bounds")
+        )
+        # width_bucket puts the maximum in bucket n + 1; fold it into the last one
+        bucket = case(
+            (bounds.c.high == bounds.c.low, 1),
+            else_=func.least(func.width_bucket(numbers.c.number, bounds.c.low, bounds.c.high, buckets), buckets),
+        ).label("bucket")
+        result = await db.execute(
+            select(numbers.c.column_id, bucket, func.count(), bounds.c.low, bounds.c.high, bounds.c.total)
+            .join(bounds, bounds.c.column_id == numbers.c.column_id)
+            .group_by(numbers.c.column_id, bucket, bounds.c.low, bounds.c.high, bounds.c.total)
+        )
+
+        counts: Dict[UUID, Dict[int, int]] = {}
+        ranges: Dict[UUID, Tuple[Decimal, Decimal, int]] = {}
+        for column_id, number, count, low, high, total in result:
+            counts.setdefault(column_id, {})[number] = count
+            ranges[column_id] = (low, high, total)
+
+        facets = {}
+        for column in columns:
+            if column.id not in ranges:
+                facets[column.name] = self._histogram(column, [], None, None, 0, row_count)
+                continue
+            low, high, total = ranges[column.id]
+            bucket_count = 1 if high == low else buckets
+            width = (high - low) / bucket_count
+            facets[column.name] = self._histogram(
+                column,
+                [
+                    {
+                        "low": _number(low + width * index),
+                        "high": _number(high if index == bucket_count - 1 else low + width * (index + 1)),
+                        "count": counts[column.id].get(index + 1, 0),
+                    }
+                    for index in range(bucket_count)
+                ],
+                low, high, total, row_count,
+            )
+        return facets
+
+    async def _banded_histogram(
+        self, db: AsyncSession, column: ColumnRef, row_ids, row_count: int, boundaries: List[Decimal]
+    ) -> Dict[str, Any]:
+        numbers = self._numbers([column.id], row_ids)
+        # Band 0 is below the first boundary, band n at or above the last
+        band = func.width_bucket(
+            numbers.c.number, bindparam("boundaries", boundaries, type_=ARRAY(Numeric))
+        ).label("band")
+        result = await db.execute(
+            select(band, func.count(), func.min(numbers.c.number), func.max(numbers.c.number))
+            .group_by(band)
+        )
+
+        counts = {}
+        low = high = None
+        for number, count, band_low, band_high in result:
+            counts[number] = count
+            low = band_low if low is None else min(low, band_low)
+            high = band_high if high is None else max(high, band_high)
+        edges = [None, *boundaries, None]
+        return self._histogram(
+            column,
+            [
+                {"low": _number(edges[index]), "high": _number(edges[index + 1]), "count": counts.get(index, 0)}
+                for index in range(len(boundaries) + 1)
+            ],
+            low, high, sum(counts.values()), row_count,
+        )
+
+    def _histogram(self, column: ColumnRef, buckets: List[Dict[str, Any]], low, high, total: int, row_count: int):
+        return {
+            "type": HISTOGRAM,
+            "column_type": column.column_type,
+            "buckets": buckets,
+            "min": _number(low),
+            "max": _number(high),
+            "total": total,
+            "missing": max(row_count - total, 0),
+        }
@@ -2,7 +2,7 @@ import json
 import logging
 from typing import Dict, List, Any
 
-from app.services.openai_service import openai_service
+from app.services.openai_service import get_openai_service
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,7 @@ class LeadGeneratorService:
         
         try:
             # Use the new OpenAI service
-            result = await openai_service.generate_leads(
+            result = await get_openai_service().generate_leads(
                 query=query,
                 existing_columns=existing_columns,
                 context=context
@@ -0,0 +1,205 @@
+"""
+Server-side filtering and sorting of lead table rows.
+
+Filters are ``<column>:<op>:<value>`` expressions on column names:
+
+- ``eq`` - equal, case-insensitive (numerically for number columns)
+- ``contains`` - case-insensitive substring
+- ``gt`` / ``gte`` / ``lt`` / ``lte`` - range, numeric for number columns and
+  lexicographic otherwise (ISO dates compare correctly)
+- ``in`` - equal to any of ``|``-separated values
+
+Sort keys are column names, prefixed with ``-`` for descending order. Rows
+without a value sort last.
+
+Each filter becomes an ``EXISTS`` over the row's cell in that column, and the
+predicates are written against the expressions indexed by the
+``lead_cell_query_indexes`` migration. Those expressions (and the constants
+inside them) must stay literally identical to the index definitions, or
+Postgres will not use the indexes.
+"""
+import operator
+import re
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Numeric, Text, and_, case, cast, exists, func, literal_column, nulls_last
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+
+from app.models.lead_cell import LeadCell
+from app.models.lead_row import LeadRow
+from app.services.column_types import NUMERIC_TYPES, TEXT
+
+FILTER_OPS = ("eq", "contains", "gt", "gte", "lt", "lte", "in")
+_RANGE_OPERATORS = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+IN_SEPARATOR = "|"
+
+# Prefix of the lower-cased text that is indexed for equality, so long
+# values stay under the btree entry size limit
+SEARCH_KEY_LENGTH = 200
+
+_FILTER_RE = re.compile(r"^(?P<column>.+?):(?P<op>" + "|".join(FILTER_OPS) + r"):(?P<value>.*)$", re.DOTALL)
+
+
+class LeadQueryError(ValueError):
+    """An invalid filter or sort expression"""
+
+
+@dataclass
+class ColumnRef:
+    id: UUID
+    name: str
+    column_type: str
+
+    @property
+    def numeric(self) -> bool:
+        return self.column_type in NUMERIC_TYPES
+
+
+@dataclass
+class CellFilter:
+    column: ColumnRef
+    op: str
+    values: List[Any]
+
+
+@dataclass
+class SortKey:
+    column: ColumnRef
+    descending: bool = False
+
+
+def text_value(cell):
+    """A cell's value as text (``value #>> '{}'``)"""
+    return cell.value.op("#>>", return_type=Text)(literal_column("'{}'"))
+
+
+def lower_text(cell):
+    return func.lower(text_value(cell), type_=Text)
+
+
+def search_key(cell):
+    return func.left(lower_text(cell), literal_column(str(SEARCH_KEY_LENGTH)), type_=Text)
+
+
+def numeric_value(cell):
+    """A cell's value as numeric, NULL unless it is a JSON number"""
+    return case(
+        (func.jsonb_typeof(cell.value) == literal_column("'number'"), cast(text_value(cell), Numeric)),
+    )
+
+
+def _resolve(columns: Dict[str, ColumnRef], name: str) -> ColumnRef:
+    column = columns.get(name)
+    if column is None:
+        raise LeadQueryError(f"Unknown column: {name}")
+    return column
+
+
+def _parse_number(value: str) -> Decimal:
+    try:
+        number = Decimal(value.strip())
+    except InvalidOperation:
+        raise LeadQueryError(f"Not a number: {value}")
+    if not number.is_finite():
+        raise LeadQueryError(f"Not a number: {value}")
+    return number
+
+
+def parse_filters(expressions: Sequence[str], columns: Dict[str, ColumnRef]) -> List[CellFilter]:
+    """Parse ``<column>:<op>:<value>`` expressions against the table's columns"""
+    filters = []
+    for expression in expressions:
+        match = _FILTER_RE.match(expression)
+        if not match:
+            raise LeadQueryError(
+                f"Invalid filter {expression!r}; expected <column>:<op>:<value> with op one of {', '.join(FILTER_OPS)}"
+            )
+        column = _resolve(columns, match["column"])
+        op = match["op"]
+        values = match["value"].split(IN_SEPARATOR) if op == "in" else [match["value"]]
+        if column.numeric and op != "contains":
+            values = [_parse_number(value) for value in values]
+        filters.append(CellFilter(column=column, op=op, values=values))
+    return filters
+
+
+def parse_sort(keys: Sequence[str], columns: Dict[str, ColumnRef]) -> List[SortKey]:
+    """Parse ``<column>`` / ``-<column>`` sort keys against the table's columns"""
+    sort_keys = []
+    for key in keys:
+        # A column literally named "-x" wins over descending "x"
+        if key.startswith("-") and key not in columns:
+            sort_keys.append(SortKey(column=_resolve(columns, key[1:]), descending=True))
+        else:
+            sort_keys.append(SortKey(column=_resolve(columns, key)))
+    return sort_keys
+
+
+def _predicate(cell, cell_filter: CellFilter):
+    op, values = cell_filter.op, cell_filter.values
+
+    if op == "contains":
+        # Served by the pg_trgm GIN index on lower(value #>> '{}')
+        return lower_text(cell).contains(values[0].lower(), autoescape=True)
+
+    if cell_filter.column.numeric:
+        # The partial index only covers JSON numbers; repeat its predicate
+        expression = numeric_value(cell)
+        is_number = func.jsonb_typeof(cell.value) == literal_column("'number'")
+        if op == "eq":
+            return and_(is_number, expression == values[0])
+        if op == "in":
+            return and_(is_number, expression.in_(values))
+        return and_(is_number, expression.operate(_RANGE_OPERATORS[op], values[0]))
+
+    keys = [value.lower() for value in values]
+    if op == "eq":
+        # The indexed prefix narrows the scan, the full comparison is exact
+        return and_(search_key(cell) == keys[0][:SEARCH_KEY_LENGTH], lower_text(cell) == keys[0])
+    if op == "in":
+        return and_(
+            search_key(cell).in_([key[:SEARCH_KEY_LENGTH] for key in keys]),
+            lower_text(cell).in_(keys),
+        )
+    return lower_text(cell).operate(_RANGE_OPERATORS[op], keys[0])
+
+
+def apply_filters(stmt: Select, filters: Sequence[CellFilter]) -> Select:
+    """Restrict a ``LeadRow`` select to rows matching every filter"""
+    for cell_filter in filters:
+        cell = aliased(LeadCell)
+        stmt = stmt.where(
+            exists()
+            .where(
+                cell.row_id == LeadRow.id,
+                cell.column_id == cell_filter.column.id,
+                _predicate(cell, cell_filter),
+            )
+        )
+    return stmt
+
+
+def apply_sort(stmt: Select, sort_keys: Sequence[SortKey]) -> Select:
+    """Order a ``LeadRow`` select by cell values, then by creation order"""
+    for sort_key in sort_keys:
+        cell = aliased(LeadCell)
+        stmt = stmt.outerjoin(
+            cell,
+            and_(cell.row_id == LeadRow.id, cell.column_id == sort_key.column.id),
+        )
+        expression = numeric_value(cell) if sort_key.column.numeric else lower_text(cell)
+        stmt = stmt.order_by(nulls_last(expression.desc() if sort_key.descending else expression.asc()))
+    # Stable order for pagination
+    return stmt.order_by(LeadRow.created_at, LeadRow.id)
+
+
+def column_refs(columns: Sequence[Tuple[UUID, str, str]]) -> Dict[str, ColumnRef]:
+    """Name -> ``ColumnRef`` from (id, name, column_type) rows"""
+    return {
+        name: ColumnRef(id=column_id, name=name, column_type=column_type or TEXT)
+        for column_id, name, column_type in columns
+    }
@@ -1,18 +1,109 @@
-import json
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+import re
+import uuid
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import any_, bindparam, delete, exists, literal_column, select, text, update, func
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
 from uuid import UUID
 
+from app.core.config import settings
+from app.core.tracing import tracer
+from app.db.session import get_session_maker
 from app.models.lead_table import LeadTable
 from app.models.lead_column import LeadColumn
-from app.models.lead_row import LeadRow
+from app.models.lead_row import EntityType, LeadRow
 from app.models.lead_cell import LeadCell
+from app.services.column_types import TEXT, coerce_value, infer_column_type, widen
+from app.services.lead_query import text_value
 
 logger = logging.getLogger(__name__)
 
+# Text search configuration for lead search vectors and queries
+SEARCH_CONFIG = "english"
+
+# Cells per INSERT ... ON CONFLICT statement (4 parameters each, well under
+# the 32767 parameter limit)
+UPSERT_BATCH_SIZE = 1000
+
+
+class CellUpdateError(ValueError):
+    """A cell change refers to a row or column the table does not have"""
+
+
+# Target columns: one per distinct name across the sources, in the order of
+# the first source that has it; types that disagree widen as in column_types.widen
+_COPY_COLUMNS_SQL = """
+    INSERT INTO lead_columns (id, lead_table_id, name, column_type, display_order, created_at)
+    SELECT gen_random_uuid(), :target_id, c.name,
+           CASE
+               WHEN count(DISTINCT coalesce(c.column_type, 'text')) = 1 THEN min(coalesce(c.column_type, 'text'))
+               WHEN bool_and(c.column_type IN ('integer', 'number')) THEN 'number'
+               ELSE 'text'
+           END,
+           row_number() OVER (
+               ORDER BY min(array_position(:source_ids, c.lead_table_id) * 1000000 + coalesce(c.display_order, 0))
+           ) - 1,
+           now()
+    FROM lead_columns c
+    WHERE c.lead_table_id = ANY(:source_ids)
+    GROUP BY c.name
+"""
+
+# Rows get new ids in a materialized CTE that maps old to new, so rows and
+# their cells are copied by one statement. Cells move to the target column of
+# the same name. {dedupe} optionally keeps the first row per key value.
+_COPY_ROWS_SQL = """
+    WITH source_rows AS MATERIALIZED (
+        SELECT {distinct} r.id AS old_id, gen_random_uuid() AS new_id,
+               r.entity_type, r.search_vector, r.created_at
+        FROM lead_rows r
+        {dedupe_join}
+        WHERE r.lead_table_id = ANY(:source_ids)
+        {order_by}
+    ),
+    inserted_rows AS (
+        INSERT INTO lead_rows (id, lead_table_id, entity_type, search_vector, created_at, updated_at)
+        SELECT new_id, :target_id, entity_type, search_vector, created_at, now()
+        FROM source_rows
+        RETURNING 1
+    ),
+    inserted_cells AS (
+        INSERT INTO lead_cells (id, row_id, column_id, value, created_at, updated_at)
+        SELECT gen_random_uuid(), s.new_id, target_column.id, cell.value, cell.created_at, now()
+        FROM source_rows s
+        JOIN lead_cells cell ON cell.row_id = s.old_id
+        JOIN lead_columns source_column ON source_column.id = cell.column_id
+        JOIN lead_columns target_column
+          ON target_column.lead_table_id = :target_id AND target_column.name = source_column.name
+        ON CONFLICT (row_id, column_id) DO NOTHING
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM inserted_rows), (SELECT count(*) FROM inserted_cells)
+"""
+
+# Rewrites the typed cells of columns widened to text after they were stored
+_STRINGIFY_CELLS_SQL = """
+    UPDATE lead_cells SET value = to_jsonb(value #>> '{}')
+    WHERE column_id = ANY(:column_ids) AND jsonb_typeof(value) IN ('number', 'boolean')
+"""
+
+# Blank values never count as duplicates of each other
+_DEDUPE_KEY = "coalesce(nullif(lower(btrim(dedupe_cell.value #>> '{}')), ''), r.id::text)"
+_DEDUPE_JOIN = """
+        LEFT JOIN lead_cells dedupe_cell
+          ON dedupe_cell.row_id = r.id
+         AND dedupe_cell.column_id IN (
+             SELECT id FROM lead_columns WHERE lead_table_id = ANY(:source_ids) AND name = :dedupe_on
+         )
+"""
+
+
+def _row_ids_param(row_ids: List[UUID]):
+    return bindparam("row_ids", row_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+
 
 class LeadService:
     """Service for managing lead tables and data"""
@@ -23,7 +114,8 @@ class LeadService:
             select(LeadTable)
             .where(
                 LeadTable.id == UUID(table_id),
-                LeadTable.user_id == user_id
+                LeadTable.user_id == user_id,
+                LeadTable.deleted_at.is_(None)
             )
         )
         return result.scalar_one_or_none()
@@ -38,10 +130,215 @@ class LeadService:
         
         db.add(lead_table)
         await db.commit()
-        await db.refresh(lead_table)
         
         return lead_table
 
+    async def copy_rows(
+        self,
+        db: AsyncSession,
+        source_ids: List[UUID],
+        target_id: UUID,
+        dedupe_on: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """
+        Copy the columns, rows and cells of ``source_ids`` into an empty table
+        with INSERT ... SELECT, mapping columns by name. With ``dedupe_on``,
+        only the first row (by source order, then age) per value of that
+        column is kept. Nothing is loaded into Python; the caller commits.
+        Returns (rows, cells) copied.
+        """
+        params = [
+            bindparam("source_ids", source_ids, type_=ARRAY(PG_UUID(as_uuid=True))),
+            bindparam("target_id", target_id, type_=PG_UUID(as_uuid=True)),
+        ]
+        await db.execute(text(_COPY_COLUMNS_SQL).bindparams(*params))
+        
+        if dedupe_on:
+            rows_sql = _COPY_ROWS_SQL.format(
+                distinct=f"DISTINCT ON ({_DEDUPE_KEY})",
+                dedupe_join=_DEDUPE_JOIN,
+                order_by=f"ORDER BY {_DEDUPE_KEY}, array_position(:source_ids, r.lead_table_id), r.created_at, r.id",
+            )
+            params.append(bindparam("dedupe_on", dedupe_on))
+        else:
+            rows_sql = _COPY_ROWS_SQL.format(distinct="", dedupe_join="", order_by="")
+        
+        result = await db.execute(text(rows_sql).bindparams(*params))
+        rows, cells = result.one()
+        return rows, cells
+
+    async def delete_lead_table(self, db: AsyncSession, table: LeadTable) -> bool:
+        """
+        Delete a table with one statement, letting the ON DELETE CASCADE foreign
+        keys remove its columns, rows and cells. Tables with more than
+        ``chunked_delete_threshold`` cells are only marked deleted; returns
+        True when ``purge_table`` still has to run.
+        """
+        rows = select(func.count()).select_from(LeadRow).where(LeadRow.lead_table_id == table.id).scalar_subquery()
+        columns = select(func.count()).select_from(LeadColumn).where(LeadColumn.lead_table_id == table.id).scalar_subquery()
+        row_count, column_count = (await db.execute(select(rows, columns))).one()
+        
+        if row_count * max(column_count, 1) > settings.chunked_delete_threshold:
+            await db.execute(
+                update(LeadTable)
+                .where(LeadTable.id == table.id)
+                .values(deleted_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return True
+        
+        await db.execute(
+            delete(LeadTable)
+            .where(LeadTable.id == table.id)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return False
+
+    async def purge_table(self, table_id: UUID) -> None:
+        """
+        Delete a table marked deleted in chunks of ``chunked_delete_rows`` rows,
+        one short transaction each, then the table itself
+        """
+        session_maker = get_session_maker()
+        deleted = 0
+        while True:
+            async with session_maker() as db:
+                # SKIP LOCKED lets several workers purge the same table
+                chunk = (
+                    select(LeadRow.id)
+                    .where(LeadRow.lead_table_id == table_id)
+                    .limit(settings.chunked_delete_rows)
+                    .with_for_update(skip_locked=True)
+                )
+                result = await db.execute(
+                    delete(LeadRow)
+                    .where(LeadRow.id.in_(chunk.scalar_subquery()))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            if result.rowcount == 0:
+                break
+            deleted += result.rowcount
+            # Let request handlers run between chunks
+            await asyncio.sleep(0)
+        
+        async with session_maker() as db:
+            # An empty chunk can also mean the remaining rows are locked by
+            # another purging worker; the last worker to finish deletes the table
+            result = await db.execute(
+                delete(LeadTable)
+                .where(
+                    LeadTable.id == table_id,
+                    LeadTable.deleted_at.isnot(None),
+                    ~exists().where(LeadRow.lead_table_id == table_id)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.info(f"Purged lead table {table_id} ({deleted} rows)")
+        else:
+            logger.info(f"Deleted {deleted} rows of lead table {table_id}; another worker finishes the purge")
+
+    async def purge_deleted_tables(self) -> None:
+        """Finish chunked deletes interrupted by a restart"""
+        async with get_session_maker()() as db:
+            result = await db.execute(select(LeadTable.id).where(LeadTable.deleted_at.isnot(None)))
+            table_ids = result.scalars().all()
+        for table_id in table_ids:
+            await self.purge_table(table_id)
+
+    async def stringify_cells(self, db: AsyncSession, column_ids: List[UUID]) -> None:
+        """Store the number and boolean cells of text columns as strings"""
+        if column_ids:
+            await db.execute(
+                text(_STRINGIFY_CELLS_SQL)
+                .bindparams(bindparam("column_ids", column_ids, type_=ARRAY(PG_UUID(as_uuid=True))))
+            )
+
+    async def refresh_search_vectors(self, db: AsyncSession, row_ids: List[UUID]) -> None:
+        """Rebuild the full-text search vectors of the given rows from their cells"""
+        if not row_ids:
+            return
+        config = literal_column(f"'{SEARCH_CONFIG}'")
+        row_text = (
+            select(func.to_tsvector(config, func.coalesce(func.string_agg(text_value(LeadCell), " "), "")))
+            .where(LeadCell.row_id == LeadRow.id)
+            .scalar_subquery()
+        )
+        await db.execute(
+            update(LeadRow)
+            .where(LeadRow.id == any_(_row_ids_param(row_ids)))
+            .values(search_vector=row_text)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def search_leads(self, db: AsyncSession, user_id: UUID, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Rank the user's lead rows against a web-search style query, in one
+        statement, with each hit's table, cell values and matching columns
+        """
+        # Any query word marks a cell as matching, for column context
+        words = re.findall(r"\w+", query)
+        if not words:
+            return []
+        config = literal_column(f"'{SEARCH_CONFIG}'")
+        ts_query = func.websearch_to_tsquery(config, query)
+        any_word = func.to_tsquery(config, " | ".join(words))
+        rank = func.ts_rank(LeadRow.search_vector, ts_query).label("rank")
+        
+        hits = (
+            select(
+                LeadRow.id.label("row_id"),
+                LeadRow.entity_type,
+                LeadTable.id.label("table_id"),
+                LeadTable.name.label("table_name"),
+                rank,
+            )
+            .join(LeadTable, LeadTable.id == LeadRow.lead_table_id)
+            .where(
+                LeadTable.user_id == user_id,
+                LeadTable.deleted_at.is_(None),
+                LeadRow.search_vector.op("@@")(ts_query),
+            )
+            .order_by(rank.desc())
+            .limit(limit)
+            .cte("hits")
+        )
+        result = await db.execute(
+            select(
+                hits.c.row_id, hits.c.entity_type, hits.c.table_id, hits.c.table_name, hits.c.rank,
+                LeadColumn.name, LeadCell.value,
+                func.to_tsvector(config, text_value(LeadCell)).op("@@")(any_word).label("matched"),
+            )
+            .select_from(hits)
+            .join(LeadCell, LeadCell.row_id == hits.c.row_id)
+            .join(LeadColumn, LeadColumn.id == LeadCell.column_id)
+            .order_by(hits.c.rank.desc(), hits.c.row_id, LeadColumn.display_order)
+        )
+        
+        results = []
+        by_row = {}
+        for row_id, entity_type, table_id, table_name, rank, column_name, value, matched in result:
+            hit = by_row.get(row_id)
+            if hit is None:
+                hit = by_row[row_id] = {
+                    "row_id": str(row_id),
+                    "entity_type": entity_type.value,
+                    "table_id": str(table_id),
+                    "table_name": table_name,
+                    "rank": rank,
+                    "data": {},
+                    "matched_columns": [],
+                }
+                results.append(hit)
+            hit["data"][column_name] = value
+            if matched:
+                hit["matched_columns"].append(column_name)
+        return results
+
     async def get_table_columns(self, db: AsyncSession, table_id: UUID) -> List[LeadColumn]:
         """Get all columns for a lead table"""
         result = await db.execute(
@@ -58,52 +355,132 @@ class LeadService:
                                   suggested_columns: List[str]) -> List[Dict]:
         """Store leads data in the flexible table structure"""
         
-        # Get existing columns
-        existing_columns = await self.get_table_columns(db, table_id)
-        column_map = {col.name: col.id for col in existing_columns}
-        
-        # Create new columns if needed
-        for col_name in suggested_columns:
-            if col_name not in column_map:
-                new_column = LeadColumn(
-                    lead_table_id=table_id,
-                    name=col_name,
-                    column_type='text',
-                    display_order=len(column_map)
-                )
-                db.add(new_column)
-                await db.flush()  # Get the ID
-                column_map[col_name] = new_column.id
+        with tracer.start_as_current_span("store_leads_in_table") as span:
+            span.set_attribute("lead_table.id", str(table_id))
+            span.set_attribute("leads.count", len(leads))
+            span.set_attribute("leads.suggested_columns", len(suggested_columns))
+            
+            # Get existing columns
+            existing_columns = await self.get_table_columns(db, table_id)
+            columns_by_name = {col.name: col for col in existing_columns}
+            
+            # Infer each column's type from the incoming values
+            values_by_column = {}
+            for lead in leads:
+                for field_name, field_value in lead.get('data', {}).items():
+                    values_by_column.setdefault(field_name, []).append(field_value)
+            
+            # Create new columns if needed; ids are generated client-side so
+            # nothing has to be flushed before the rows and cells are built
+            with tracer.start_as_current_span("create_columns"):
+                for col_name in suggested_columns:
+                    inferred_type = infer_column_type(values_by_column.get(col_name, []))
+                    column = columns_by_name.get(col_name)
+                    if column is None:
+                        column = LeadColumn(
+                            id=uuid.uuid4(),
+                            lead_table_id=table_id,
+                            name=col_name,
+                            column_type=inferred_type or TEXT,
+                            display_order=len(columns_by_name)
+                        )
+                        db.add(column)
+                        columns_by_name[col_name] = column
+                    else:
+                        column.column_type = widen(column.column_type, inferred_type) or TEXT
+            
+            stored_leads = []
+            
+            with tracer.start_as_current_span("insert_rows"):
+                rows = []
+                cells = []
+                for lead in leads:
+                    # Create lead row
+                    entity_type = lead.get('entity_type', 'company')
+                    lead_row = LeadRow(
+                        id=uuid.uuid4(),
+                        lead_table_id=table_id,
+                        entity_type=EntityType.PERSON if entity_type == 'person' else EntityType.COMPANY
+                    )
+                    rows.append(lead_row)
+                    
+                    # Create cells for each data field, natively typed
+                    for field_name, field_value in lead.get('data', {}).items():
+                        column = columns_by_name.get(field_name)
+                        if column is not None:
+                            cells.append(LeadCell(
+                                row_id=lead_row.id,
+                                column_id=column.id,
+                                value=coerce_value(field_value, column.column_type)
+                            ))
+                    
+                    stored_leads.append({
+                        'id': str(lead_row.id),
+                        'entity_type': entity_type,
+                        'data': lead.get('data', {})
+                    })
+                
+                # One batched INSERT per table instead of a flush per row
+                db.add_all(rows)
+                db.add_all(cells)
+                await db.flush()
+                await self.refresh_search_vectors(db, [row.id for row in rows])
+                await db.commit()
+            return stored_leads
+
+    async def upsert_cells(self, db: AsyncSession, table_id: UUID, changes: List[Dict[str, Any]]) -> int:
+        """
+        Apply ``{"row_id", "column", "value"}`` changes with one
+        INSERT ... ON CONFLICT (row_id, column_id) DO UPDATE per batch.
+        Returns the number of cells written; unchanged values are skipped.
+        """
+        columns = {column.name: column for column in await self.get_table_columns(db, table_id)}
+        unknown_columns = sorted({change["column"] for change in changes} - columns.keys())
+        if unknown_columns:
+            raise CellUpdateError(f"Unknown columns: {', '.join(unknown_columns)}")
+        
+        row_ids = list({change["row_id"] for change in changes})
+        found = await db.execute(
+            select(LeadRow.id)
+            .where(LeadRow.lead_table_id == table_id, LeadRow.id == any_(_row_ids_param(row_ids)))
+        )
+        unknown_rows = set(row_ids) - set(found.scalars().all())
+        if unknown_rows:
+            raise CellUpdateError(f"Unknown rows: {', '.join(sorted(str(row_id) for row_id in unknown_rows))}")
         
-        stored_leads = []
+        # Widen column types to fit the new values before coercing them
+        values_by_column = {}
+        for change in changes:
+            values_by_column.setdefault(change["column"], []).append(change["value"])
+        for name, values in values_by_column.items():
+            column = columns[name]
+            column.column_type = widen(column.column_type, infer_column_type(values)) or TEXT
         
-        for lead in leads:
-            # Create lead row
-            lead_row = LeadRow(
-                lead_table_id=table_id,
-                entity_type=lead.get('entity_type', 'company')
+        # A statement may not touch the same cell twice: the last change wins
+        cells = {}
+        for change in changes:
+            column = columns[change["column"]]
+            cells[(change["row_id"], column.id)] = coerce_value(change["value"], column.column_type)
+        
+        written = 0
+        items = list(cells.items())
+        for start in range(0, len(items), UPSERT_BATCH_SIZE):
+            stmt = pg_insert(LeadCell).values([
+                {"id": uuid.uuid4(), "row_id": row_id, "column_id": column_id, "value": value}
+                for (row_id, column_id), value in items[start:start + UPSERT_BATCH_SIZE]
+            ])
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_lead_cells_row_column",
+                set_={"value": stmt.excluded.value, "updated_at": func.now()},
+                where=LeadCell.value.is_distinct_from(stmt.excluded.value),
             )
-            db.add(lead_row)
-            await db.flush()  # Get the ID
-            
-            # Create cells for each data field
-            for field_name, field_value in lead.get('data', {}).items():
-                if field_name in column_map:
-                    cell = LeadCell(
-                        row_id=lead_row.id,
-                        column_id=column_map[field_name],
-                        value=field_value if isinstance(field_value, (str, int, float, bool, type(None))) else json.dumps(field_value)
-                    )
-                    db.add(cell)
-            
-            stored_leads.append({
-                'id': str(lead_row.id),
-                'entity_type': lead.get('entity_type', 'company'),
-                'data': lead.get('data', {})
-            })
+            result = await db.execute(stmt)
+            written += result.rowcount
         
+        if written:
+            await self.refresh_search_vectors(db, row_ids)
         await db.commit()
-        return stored_leads
+        return written
 
     async def get_table_leads(self, db: AsyncSession, table_id: str, user_id: UUID) -> Dict:
         """Get all leads for a table in the flexible format"""
@@ -113,6 +490,11 @@ class LeadService:
         if not table:
             return {"leads": [], "columns": []}
         
+        return await self.load_table_leads(db, table)
+
+    async def load_table_leads(self, db: AsyncSession, table: LeadTable) -> Dict:
+        """Load all leads of an already verified table in the flexible format"""
+        
         # Get columns
         columns = await self.get_table_columns(db, table.id)
         
@@ -126,18 +508,17 @@ class LeadService:
         
         # Get all cells for this table
         cells_result = await db.execute(
-            select(LeadCell)
+            select(LeadCell.row_id, LeadCell.column_id, LeadCell.value)
             .join(LeadRow)
             .where(LeadRow.lead_table_id == table.id)
         )
-        cells = cells_result.scalars().all()
         
         # Organize cells by row
         cells_by_row = {}
-        for cell in cells:
-            if cell.row_id not in cells_by_row:
-                cells_by_row[cell.row_id] = {}
-            cells_by_row[cell.row_id][cell.column_id] = cell.value
+        for row_id, column_id, value in cells_result:
+            if row_id not in cells_by_row:
+                cells_by_row[row_id] = {}
+            cells_by_row[row_id][column_id] = value
         
         leads = []
         for row in rows:
@@ -145,14 +526,9 @@ class LeadService:
             lead_data = {}
             
             for column in columns:
+                # Values are stored natively typed; keep falsy ones like 0 and False
                 value = row_cells.get(column.id)
-                try:
-                    # Try to parse JSON, fallback to string
-                    if isinstance(value, str) and value.startswith(('{', '[')):
-                        value = json.loads(value)
-                except:
-                    pass
-                lead_data[column.name] = value or ''
+                lead_data[column.name] = '' if value is None else value
             
             # Extract name from data
             name = lead_data.get('Name') or lead_data.get('name') or 'Unknown'
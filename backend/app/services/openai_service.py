@@ -3,13 +3,16 @@ OpenAI Service with modular templates for different AI operations
 """
 import json
 import logging
+import time
 from typing import Dict, List, Any, Optional, Type, TypeVar, Generic
 from abc import ABC, abstractmethod
 from pydantic import BaseModel, Field
-from openai import AsyncOpenAI
 from enum import Enum
 
+from app.core import metrics
 from app.core.config import settings
+from app.core.rate_limit import record_llm_tokens
+from app.core.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +95,17 @@ class LeadGenerationResponse(BaseModel):
     suggested_columns: List[str] = Field(description="Suggested table columns")
 
 
+class EnrichedValue(BaseModel):
+    """Value of the new column for one row"""
+    row: int = Field(description="Row number from the request")
+    value: Any = Field(default=None, description="Column value, or null when unknown")
+
+
+class ColumnEnrichmentResponse(BaseModel):
+    """Response model for column enrichment"""
+    values: List[EnrichedValue] = Field(description="One value per requested row")
+
+
 # Template Implementations
 class WebsiteAnalysisTemplate(OpenAITemplate[WebsiteAnalysis]):
     """Template for analyzing company websites"""
@@ -259,19 +273,72 @@ class LeadGenerationTemplate(OpenAITemplate[LeadGenerationResponse]):
         """
 
 
+class ColumnEnrichmentTemplate(OpenAITemplate[ColumnEnrichmentResponse]):
+    """Template for filling one new column for a batch of existing leads"""
+    
+    @property
+    def system_prompt(self) -> str:
+        return """You are a lead enrichment assistant. You are given one new column 
+        and a numbered list of existing leads (companies or people).
+        
+        For every lead, provide the value of the new column:
+        - Use the lead's existing data to identify it
+        - Numbers must be JSON numbers, yes/no answers JSON booleans
+        - Use null when the value cannot be determined; never invent contact details
+        
+        Return {"values": [{"row": <row number>, "value": <value>}]} with one entry per lead."""
+    
+    @property
+    def response_model(self) -> Type[ColumnEnrichmentResponse]:
+        return ColumnEnrichmentResponse
+    
+    @property
+    def temperature(self) -> float:
+        return 0.2
+    
+    @property
+    def max_tokens(self) -> int:
+        return 1000
+    
+    def build_user_prompt(self, column_name: str, instructions: str, rows: List[Dict[str, Any]], **kwargs) -> str:
+        numbered = "\n".join(f"{i}. {json.dumps(data, default=str)}" for i, data in enumerate(rows, 1))
+        return f"""
+        New column: {column_name}
+        Instructions: {instructions or column_name}
+        
+        Leads:
+        {numbered}
+        """
+
+
 class OpenAIService:
     """Main service for handling OpenAI operations with templates"""
     
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        if settings.llm_provider == "fake":
+            from app.services.fake_llm import FakeAsyncOpenAI
+            self.client = FakeAsyncOpenAI(latency_ms=settings.fake_llm_latency_ms)
+        else:
+            # Imported here: the openai package is slow to import
+            from openai import AsyncOpenAI
+            if not settings.openai_api_key:
+                raise RuntimeError("OPENAI_API_KEY is not set (or use LLM_PROVIDER=fake)")
+            self.client = AsyncOpenAI(api_key=settings.openai_api_key)
         
         # Register available templates
         self.templates = {
             'website_analysis': WebsiteAnalysisTemplate(),
             'signal_generation': SignalGenerationTemplate(),
             'lead_generation': LeadGenerationTemplate(),
+            'column_enrichment': ColumnEnrichmentTemplate(),
         }
     
+    async def warm_up(self) -> None:
+        """Open the provider connection (DNS, TLS) ahead of the first request"""
+        if settings.llm_provider == "fake":
+            return
+        await self.client.models.list()
+    
     async def execute_template(self, 
                               template_name: str, 
                               **kwargs) -> Any:
@@ -282,39 +349,55 @@ class OpenAIService:
         
         template = self.templates[template_name]
         
-        try:
-            # Build prompts
-            system_prompt = template.system_prompt
-            user_prompt = template.build_user_prompt(**kwargs)
-            
-            # Make OpenAI call
-            response = await self.client.chat.completions.create(
-                model=template.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=template.temperature,
-                max_tokens=template.max_tokens
-            )
-            
-            # Parse and validate response
-            result_text = response.choices[0].message.content
-            result_json = json.loads(result_text)
-            
-            # Validate with Pydantic model
-            validated_result = template.validate_response(result_json)
-            
-            return validated_result
+        with tracer.start_as_current_span("execute_template") as span:
+            span.set_attribute("llm.template", template_name)
+            span.set_attribute("llm.model", template.model)
+            try:
+                # Build prompts
+                system_prompt = template.system_prompt
+                user_prompt = template.build_user_prompt(**kwargs)
+                span.set_attribute("llm.prompt_chars", len(system_prompt) + len(user_prompt))
+                
+                # Make OpenAI call
+                start = time.perf_counter()
+                with tracer.start_as_current_span("llm.chat_completion"):
+                    response = await self.client.chat.completions.create(
+                        model=template.model,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        temperature=template.temperature,
+                        max_tokens=template.max_tokens
+                    )
+                metrics.LLM_REQUEST_DURATION.labels(template_name, template.model).observe(time.perf_counter() - start)
+                usage = getattr(response, "usage", None)
+                metrics.record_llm_usage(template_name, template.model, usage)
+                record_llm_tokens(usage)
+                if usage is not None:
+                    span.set_attribute("llm.prompt_tokens", usage.prompt_tokens or 0)
+                    span.set_attribute("llm.completion_tokens", usage.completion_tokens or 0)
+                
+                # Parse and validate response
+                with tracer.start_as_current_span("llm.validate_response"):
+                    result_text = response.choices[0].message.content
+                    result_json = json.loads(result_text)
+                    
+                    # Validate with Pydantic model
+                    validated_result = template.validate_response(result_json)
+                
+                return validated_result
+                
+            except json.JSONDecodeError as e:
+                metrics.LLM_ERRORS.labels(template_name, "JSONDecodeError").inc()
+                logger.error(f"Failed to parse OpenAI response as JSON: {e}")
+                logger.error(f"Raw response: {result_text}")
+                raise ValueError("Invalid JSON response from OpenAI")
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse OpenAI response as JSON: {e}")
-            logger.error(f"Raw response: {result_text}")
-            raise ValueError("Invalid JSON response from OpenAI")
-        
-        except Exception as e:
-            logger.error(f"Error executing template '{template_name}': {str(e)}")
-            raise
+            except Exception as e:
+                metrics.LLM_ERRORS.labels(template_name, type(e).__name__).inc()
+                logger.error(f"Error executing template '{template_name}': {str(e)}")
+                raise
     
     async def analyze_website(self, website_url: str, website_content: str = None) -> WebsiteAnalysis:
         """Analyze a company website"""
@@ -350,6 +433,18 @@ class OpenAIService:
             context=context
         )
     
+    async def enrich_column(self,
+                           column_name: str,
+                           instructions: str,
+                           rows: List[Dict[str, Any]]) -> ColumnEnrichmentResponse:
+        """Values of a new column for a batch of leads, keyed by 1-based row number"""
+        return await self.execute_template(
+            'column_enrichment',
+            column_name=column_name,
+            instructions=instructions,
+            rows=rows
+        )
+    
     def register_template(self, name: str, template: OpenAITemplate):
         """Register a new template"""
         self.templates[name] = template
@@ -357,7 +452,26 @@ class OpenAIService:
     def list_templates(self) -> List[str]:
         """List available templates"""
         return list(self.templates.keys())
+    
+    async def close(self) -> None:
+        """Close the HTTP connection pool"""
+        await self.client.close()
+
+
+_openai_service: Optional[OpenAIService] = None
+
+
+def get_openai_service() -> OpenAIService:
+    """Shared service instance, created on first use"""
+    global _openai_service
+    if _openai_service is None:
+        _openai_service = OpenAIService()
+    return _openai_service
 
 
-# Global service instance
-openai_service = OpenAIService()
\ No newline at end of file
+async def close_openai_service() -> None:
+    """Close the shared client, if it was ever created"""
+    global _openai_service
+    if _openai_service is not None:
+        await _openai_service.close()
+        _openai_service = None
\ No newline at end of file
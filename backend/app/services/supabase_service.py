@@ -1,8 +1,7 @@
 import json
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
-from supabase import create_client, Client
 
 from app.core.config import settings
 
@@ -11,7 +10,9 @@ logger = logging.getLogger(__name__)
 
 class SupabaseService:
     def __init__(self):
-        self.supabase: Client = create_client(
+        # Imported here: the supabase package is slow to import
+        from supabase import create_client
+        self.supabase = create_client(
             settings.supabase_url, 
             settings.supabase_service_role_key
         )
@@ -142,4 +143,15 @@ class SupabaseService:
         return {
             "leads": leads,
             "columns": [col['name'] for col in columns]
-        }
\ No newline at end of file
+        }
+
+
+_supabase_service: Optional[SupabaseService] = None
+
+
+def get_supabase_service() -> SupabaseService:
+    """Shared service instance, created on first use"""
+    global _supabase_service
+    if _supabase_service is None:
+        _supabase_service = SupabaseService()
+    return _supabase_service
@@ -0,0 +1,142 @@
+"""
+Shared helpers for the benchmark suites: environment setup, latency
+statistics, result files and baseline comparison. SQL round trips are counted
+with ``app.core.sql_profiler.profile_queries``.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+BASELINES_DIR = BENCHMARKS_DIR / "baselines"
+
+
+def configure_environment(database_url: str) -> None:
+    """
+    Point the app at the benchmark database and the fake LLM provider.
+    Must run before settings are first read (``app.main`` reads them on
+    import).
+    """
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["DEBUG"] = "false"
+    # Benchmark databases are created from the models, not migrated
+    os.environ["DB_INIT_MODE"] = "create_all"
+    # Load runs far exceed the per-user AI request limits
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    for name in ("OPENAI_API_KEY", "SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY", "SUPABASE_ANON_KEY"):
+        os.environ.setdefault(name, "benchmark")
+
+
+def make_token(user_id: str, email: str) -> str:
+    """Build a Supabase-style JWT for a benchmark user"""
+    def b64(data: bytes) -> str:
+        return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+    header = b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = b64(json.dumps({"sub": user_id, "email": email, "exp": int(time.time()) + 86400}).encode())
+    signature = hmac.new(b"benchmark", f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{b64(signature)}"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an unsorted sample"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies: List[float], elapsed: float, queries: List[int]) -> Dict[str, Any]:
+    """Latency percentiles (ms), throughput and queries per call for one operation"""
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "queries_per_call": round(sum(queries) / len(queries), 2) if queries else 0.0,
+    }
+
+
+def run_metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=BENCHMARKS_DIR, check=False
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def write_results(suite: str, payload: Dict[str, Any], output_dir: Path = RESULTS_DIR) -> Path:
+    """
+    Write a run to ``<suite>-<timestamp>.json`` and append it to
+    ``<suite>.jsonl`` so trends can be tracked across runs.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    document = {"suite": suite, **run_metadata(), **payload}
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = output_dir / f"{suite}-{stamp}.json"
+    path.write_text(json.dumps(document, indent=2))
+    with open(output_dir / f"{suite}.jsonl", "a") as history:
+        history.write(json.dumps(document) + "\n")
+    return path
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float = 0.2,
+) -> List[str]:
+    """
+    Compare per-operation results with a stored baseline. Latency may grow by
+    ``tolerance`` (fraction) before it counts as a regression; any increase in
+    queries per call is a regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if previous.get(metric) and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {metric} {previous[metric]:.1f} -> {current[metric]:.1f} "
+                    f"(+{(current[metric] / previous[metric] - 1) * 100:.0f}%)"
+                )
+        if current["queries_per_call"] > previous.get("queries_per_call", current["queries_per_call"]):
+            regressions.append(
+                f"{name}: queries_per_call {previous['queries_per_call']} -> {current['queries_per_call']}"
+            )
+    return regressions
+
+
+def print_table(results: Dict[str, Dict[str, Any]]) -> None:
+    header = f"{'operation':<44} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rps':>8} {'queries':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, row in results.items():
+        print(
+            f"{name:<44} {row['count']:>6} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+            f"{row['p99_ms']:>9.2f} {row['throughput_rps']:>8.1f} {row['queries_per_call']:>8.1f}"
+        )
@@ -0,0 +1,105 @@
+"""
+Import-time benchmark.
+
+Measures how long ``import app.main`` takes in a fresh interpreter, with no
+secrets in the environment, and lists the slowest modules from
+``python -X importtime``. Also reports whether heavy client packages
+(openai, supabase, opentelemetry SDK) were imported eagerly; they should only
+load when a client is first used.
+
+Usage (from ``backend/``):
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 20 --top 25
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import percentile, write_results
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Packages that should not be imported just by importing the app
+LAZY_PACKAGES = ["openai", "supabase", "opentelemetry.sdk"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [name for name in %r if name in sys.modules]}))
+"""
+
+
+def clean_environment() -> Dict[str, str]:
+    """The current environment without app secrets or settings overrides"""
+    secrets = {"OPENAI_API_KEY", "SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY", "SUPABASE_ANON_KEY", "DATABASE_URL"}
+    env = {key: value for key, value in os.environ.items() if key not in secrets}
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def probe_once() -> Dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE % LAZY_PACKAGES],
+        cwd=BACKEND_DIR, env=clean_environment(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_modules(top: int) -> List[Dict[str, Any]]:
+    """Modules with the largest cumulative import time, from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=clean_environment(), capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self_us |   cumulative_us |   package.module"
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append({"module": name.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    modules.sort(key=lambda module: module["cumulative_ms"], reverse=True)
+    return modules[:top]
+
+
+def main(args: argparse.Namespace) -> int:
+    runs = [probe_once() for _ in range(args.runs)]
+    seconds = [run["seconds"] for run in runs]
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+
+    summary = {
+        "runs": len(seconds),
+        "p50_ms": round(percentile(seconds, 50) * 1000, 1),
+        "p95_ms": round(percentile(seconds, 95) * 1000, 1),
+        "min_ms": round(min(seconds) * 1000, 1),
+        "eagerly_loaded": loaded,
+    }
+    print(f"import app.main: p50 {summary['p50_ms']}ms, p95 {summary['p95_ms']}ms, min {summary['min_ms']}ms over {args.runs} runs")
+    print(f"Heavy packages imported eagerly: {', '.join(loaded) or 'none'}")
+
+    modules = slowest_modules(args.top)
+    print(f"\n{'module':<60} {'cumulative ms':>14} {'self ms':>9}")
+    for module in modules:
+        print(f"{module['module']:<60} {module['cumulative_ms']:>14.1f} {module['self_ms']:>9.1f}")
+
+    path = write_results("import_time", {"config": vars(args), "results": summary, "slowest_modules": modules})
+    print(f"\nResults written to {path}")
+    return 1 if loaded else 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=20, help="slowest modules to list")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
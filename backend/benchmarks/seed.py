@@ -0,0 +1,145 @@
+"""
+Synthetic data for benchmarks. Seeds go straight through Core bulk inserts so
+that setting up a large table does not dominate the benchmark run time.
+"""
+import random
+import uuid
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.services.column_types import INTEGER, TEXT, URL
+
+INDUSTRIES = ["Fintech", "Healthtech", "Web3", "SaaS", "E-commerce", "Climate", "Cybersecurity", "EdTech"]
+LOCATIONS = ["Berlin", "London", "New York", "San Francisco", "Paris", "Amsterdam", "Singapore", "Toronto"]
+STAGES = ["Pre-seed", "Seed", "Series A", "Series B", "Series C"]
+BASE_COLUMNS = ["Name", "Industry", "Location", "Funding Stage", "Funding Amount", "Employees", "Website"]
+
+INSERT_BATCH = 5000
+
+
+def column_names(count: int) -> List[str]:
+    """``count`` column names: the usual lead columns, then generic extras"""
+    names = BASE_COLUMNS[:count]
+    names += [f"Attribute {i}" for i in range(len(names), count)]
+    return names
+
+
+def cell_value(rng: random.Random, column: str, row: int) -> Any:
+    if column == "Name":
+        return f"Company {row}"
+    if column == "Industry":
+        return rng.choice(INDUSTRIES)
+    if column == "Location":
+        return rng.choice(LOCATIONS)
+    if column == "Funding Stage":
+        return rng.choice(STAGES)
+    if column == "Funding Amount":
+        return rng.randrange(250_000, 50_000_000, 250_000)
+    if column == "Employees":
+        return rng.randrange(5, 5000)
+    if column == "Website":
+        return f"https://company{row}.example.com"
+    return f"{column} value {rng.randrange(1000)}"
+
+
+def column_type(column: str) -> str:
+    """The type ingestion infers for a seeded column"""
+    if column in ("Funding Amount", "Employees"):
+        return INTEGER
+    if column == "Website":
+        return URL
+    return TEXT
+
+
+def generate_leads(rows: int, columns: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Lead dicts in the shape returned by the lead generation template"""
+    rng = random.Random(seed)
+    names = column_names(columns)
+    return [
+        {"entity_type": "company", "data": {name: cell_value(rng, name, row) for name in names}}
+        for row in range(rows)
+    ]
+
+
+async def _insert_batched(conn: AsyncConnection, table, values: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(values), INSERT_BATCH):
+        await conn.execute(insert(table), values[start:start + INSERT_BATCH])
+
+
+async def seed_user(conn: AsyncConnection, email: str) -> uuid.UUID:
+    from app.models import User, UserProfile, IdealCustomerProfile
+
+    user_id = uuid.uuid4()
+    await conn.execute(insert(User.__table__).values(id=user_id, email=email))
+    await conn.execute(insert(UserProfile.__table__).values(
+        id=uuid.uuid4(), user_id=user_id, company_website="https://example.com", onboarding_completed=True
+    ))
+    await conn.execute(insert(IdealCustomerProfile.__table__).values(
+        id=uuid.uuid4(), user_id=user_id, name="Benchmark ICP",
+        company_sizes=["11-50"], funding_stages=["Seed"], locations=["Berlin"]
+    ))
+    return user_id
+
+
+async def seed_conversations(conn: AsyncConnection, user_id: uuid.UUID, count: int, messages: int) -> None:
+    from app.models import Conversation, Message
+    from app.models.message import MessageType
+
+    conversation_ids = [uuid.uuid4() for _ in range(count)]
+    await _insert_batched(conn, Conversation.__table__, [
+        {"id": conv_id, "user_id": user_id, "title": f"Search {i}"}
+        for i, conv_id in enumerate(conversation_ids)
+    ])
+    await _insert_batched(conn, Message.__table__, [
+        {"id": uuid.uuid4(), "conversation_id": conv_id, "type": MessageType.USER, "content": f"Message {i}"}
+        for conv_id in conversation_ids
+        for i in range(messages)
+    ])
+
+
+async def seed_lead_table(
+    conn: AsyncConnection,
+    user_id: uuid.UUID,
+    rows: int,
+    columns: int,
+    name: str = "Benchmark table",
+    seed: int = 42,
+) -> uuid.UUID:
+    """Create a lead table with ``rows`` x ``columns`` populated cells"""
+    from app.models import LeadTable, LeadColumn, LeadRow, LeadCell
+    from app.models.lead_row import EntityType
+
+    rng = random.Random(seed)
+    table_id = uuid.uuid4()
+    await conn.execute(insert(LeadTable.__table__).values(id=table_id, user_id=user_id, name=name))
+
+    column_ids = {column: uuid.uuid4() for column in column_names(columns)}
+    await _insert_batched(conn, LeadColumn.__table__, [
+        {"id": column_id, "lead_table_id": table_id, "name": column, "column_type": column_type(column), "display_order": order}
+        for order, (column, column_id) in enumerate(column_ids.items())
+    ])
+
+    for start in range(0, rows, INSERT_BATCH):
+        batch = range(start, min(start + INSERT_BATCH, rows))
+        row_ids = [uuid.uuid4() for _ in batch]
+        await conn.execute(insert(LeadRow.__table__), [
+            {"id": row_id, "lead_table_id": table_id, "entity_type": EntityType.COMPANY}
+            for row_id in row_ids
+        ])
+        await _insert_batched(conn, LeadCell.__table__, [
+            {"id": uuid.uuid4(), "row_id": row_id, "column_id": column_id, "value": cell_value(rng, column, row)}
+            for row, row_id in zip(batch, row_ids)
+            for column, column_id in column_ids.items()
+        ])
+
+    return table_id
+
+
+async def delete_user(conn: AsyncConnection, user_id: uuid.UUID) -> None:
+    """Remove a benchmark user; foreign keys cascade to everything they own"""
+    from sqlalchemy import delete
+    from app.models import User
+
+    await conn.execute(delete(User.__table__).where(User.__table__.c.id == user_id))
@@ -0,0 +1,207 @@
+"""
+Serialization micro-benchmark.
+
+Compares the CPU cost of the previous response path (Pydantic objects built
+field by field, re-validated against ``response_model``, encoded with the
+stdlib ``json`` module; this is what FastAPI does for a returned model) with
+the fast path (plain dicts serialized once with orjson) for the lead table,
+ICP list and message list payloads. No database is needed; rows are
+synthetic. Results are reported as CPU milliseconds per 10k rows.
+
+Usage (from ``backend/``):
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 50000 --columns 20
+"""
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.common import configure_environment, write_results
+
+
+def cpu_ms(operation: Callable[[], Any], repeat: int) -> float:
+    """Best-of-``repeat`` process CPU time of ``operation`` in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        operation()
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+
+def fastapi_path(model, content: Any) -> bytes:
+    """What FastAPI does with a returned model: dump, validate, serialize, json.dumps"""
+    from pydantic import BaseModel, TypeAdapter
+
+    if isinstance(content, list):
+        adapter = TypeAdapter(List[model])
+        content = [item.model_dump() if isinstance(item, BaseModel) else item for item in content]
+    else:
+        adapter = TypeAdapter(model)
+        content = content.model_dump()
+    value = adapter.validate_python(content)
+    return json.dumps(
+        adapter.dump_python(value, mode="json"),
+        ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def lead_table_case(rows: int, columns: int) -> Dict[str, Callable[[], Any]]:
+    from app.api.v1.endpoints.lead_tables import build_table_payload
+    from app.core.responses import FastJSONResponse
+    from app.models.lead_row import EntityType
+    from app.schemas.lead_tables import LeadRowData, LeadTableWithData
+    from benchmarks.seed import column_names, generate_leads
+
+    now = datetime.now(timezone.utc)
+    table = SimpleNamespace(
+        id=uuid.uuid4(), user_id=uuid.uuid4(), name="Bench", description=None,
+        table_type="companies", default_columns=[], created_at=now, updated_at=now,
+    )
+    column_rows = [(uuid.uuid4(), name) for name in column_names(columns)]
+    row_tuples = [(uuid.uuid4(), EntityType.COMPANY, now, now) for _ in range(rows)]
+    cells = [
+        (row[0], column_id, lead["data"][name])
+        for row, lead in zip(row_tuples, generate_leads(rows, columns))
+        for column_id, name in column_rows
+    ]
+
+    def previous():
+        cells_by_row = {}
+        for row_id, column_id, value in cells:
+            if row_id not in cells_by_row:
+                cells_by_row[row_id] = {}
+            cells_by_row[row_id][column_id] = value
+        row_data = [
+            LeadRowData(
+                id=str(row_id),
+                entity_type=entity_type.value,
+                data={name: cells_by_row.get(row_id, {}).get(column_id) for column_id, name in column_rows},
+                created_at=created_at,
+                updated_at=updated_at,
+            )
+            for row_id, entity_type, created_at, updated_at in row_tuples
+        ]
+        content = LeadTableWithData(
+            id=str(table.id), user_id=str(table.user_id), name=table.name, description=table.description,
+            created_at=table.created_at, updated_at=table.updated_at,
+            columns=[name for _, name in column_rows], rows=row_data,
+        )
+        return fastapi_path(LeadTableWithData, content)
+
+    def fast():
+        return FastJSONResponse(build_table_payload(table, column_rows, row_tuples, cells)).body
+
+    return {"previous": previous, "fast": fast}
+
+
+def icp_case(count: int) -> Dict[str, Callable[[], Any]]:
+    from app.core.responses import FastJSONResponse
+    from app.schemas.user_profile import ICPResponse
+
+    now = datetime.now(timezone.utc)
+    profiles = [
+        SimpleNamespace(
+            id=uuid.uuid4(), user_id=uuid.uuid4(), name=f"ICP {i}", solution_products="Payments API",
+            target_region="EU", target_customers="Fintech startups", company_sizes=["11-50", "51-200"],
+            funding_stages=["Seed", "Series A"], locations=["Berlin", "London"], titles="CTO, VP Engineering",
+            created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+    fields = ("name", "solution_products", "target_region", "target_customers",
+              "company_sizes", "funding_stages", "locations", "titles", "created_at", "updated_at")
+
+    def previous():
+        content = [
+            ICPResponse(id=str(p.id), user_id=str(p.user_id), **{f: getattr(p, f) for f in fields})
+            for p in profiles
+        ]
+        return fastapi_path(ICPResponse, content)
+
+    def fast():
+        return FastJSONResponse([
+            {"id": str(p.id), "user_id": str(p.user_id), **{f: getattr(p, f) for f in fields}}
+            for p in profiles
+        ]).body
+
+    return {"previous": previous, "fast": fast}
+
+
+def messages_case(count: int) -> Dict[str, Callable[[], Any]]:
+    from app.core.responses import FastJSONResponse
+    from app.models.message import MessageType
+    from app.schemas.conversation import MessageResponse
+
+    now = datetime.now(timezone.utc)
+    conversation_id = uuid.uuid4()
+    messages = [
+        (uuid.uuid4(), conversation_id, MessageType.ASSISTANT, f"Found {i} companies matching your criteria.", now)
+        for i in range(count)
+    ]
+
+    def previous():
+        content = [
+            MessageResponse(id=str(m[0]), conversation_id=str(m[1]), type=m[2].value, content=m[3], created_at=m[4])
+            for m in messages
+        ]
+        return fastapi_path(MessageResponse, content)
+
+    def fast():
+        return FastJSONResponse([
+            {"id": str(m[0]), "conversation_id": str(m[1]), "type": m[2].value, "content": m[3], "created_at": m[4]}
+            for m in messages
+        ]).body
+
+    return {"previous": previous, "fast": fast}
+
+
+def main(args: argparse.Namespace) -> int:
+    # Endpoint modules read settings on import; nothing connects to the database
+    configure_environment("postgresql+asyncpg://localhost/unused")
+
+    cases = {
+        f"lead_table ({args.columns} columns)": (lead_table_case(args.rows, args.columns), args.rows),
+        "icp_profiles": (icp_case(args.rows), args.rows),
+        "conversation_messages": (messages_case(args.rows), args.rows),
+    }
+
+    results = []
+    print(f"{'payload':<28} {'previous ms/10k':>16} {'fast ms/10k':>12} {'saved':>8} {'speedup':>8}")
+    for name, (paths, rows) in cases.items():
+        if json.loads(paths["previous"]()) != json.loads(paths["fast"]()):
+            print(f"  warning: {name} payloads differ between paths")
+        scale = 10_000 / rows
+        previous = cpu_ms(paths["previous"], args.repeat) * scale
+        fast = cpu_ms(paths["fast"], args.repeat) * scale
+        results.append({
+            "payload": name,
+            "rows": rows,
+            "previous_cpu_ms_per_10k": round(previous, 2),
+            "fast_cpu_ms_per_10k": round(fast, 2),
+            "saved_cpu_ms_per_10k": round(previous - fast, 2),
+            "speedup": round(previous / fast, 2) if fast else None,
+        })
+        print(f"{name:<28} {previous:>16.1f} {fast:>12.1f} {previous - fast:>8.1f} {previous / fast:>7.1f}x")
+
+    path = write_results("serialization", {"config": vars(args), "results": results})
+    print(f"\nResults written to {path}")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="rows (or list items) per payload")
+    parser.add_argument("--columns", type=int, default=7, help="lead table columns")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path; the fastest is reported")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
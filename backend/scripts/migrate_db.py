@@ -0,0 +1,72 @@
+"""
+Bring the database to the Alembic head revision, whatever state it is in:
+
+- a database tracked by Alembic is upgraded with ``alembic upgrade head``
+- an empty database is created from the models and stamped at the head (the
+  migrations only alter the original tables, they cannot create them)
+- tables without an ``alembic_version`` table were created by the original
+  ``create_all`` at startup, which matches the first revision; that revision
+  is stamped and the rest are applied
+
+Run it as a release step before the server, with ``DB_INIT_MODE=verify``.
+
+Usage (from ``backend/``):
+
+    python scripts/migrate_db.py
+"""
+import asyncio
+import os
+import sys
+
+from alembic import command
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import session  # noqa: E402
+
+# Schema created by create_all before migrations were tracked
+BASELINE_REVISION = "remove_conv_dep"
+
+EMPTY = "empty"
+UNTRACKED = "untracked"
+TRACKED = "tracked"
+
+
+async def database_state() -> str:
+    try:
+        async with session.get_engine().connect() as conn:
+            result = await conn.execute(
+                text("SELECT to_regclass('public.alembic_version'), to_regclass('public.lead_tables')")
+            )
+            alembic_version, lead_tables = result.one()
+    finally:
+        await session.dispose_engine()
+    if alembic_version is not None:
+        return TRACKED
+    return UNTRACKED if lead_tables is not None else EMPTY
+
+
+async def create_schema() -> None:
+    try:
+        await session.init_db()
+    finally:
+        await session.dispose_engine()
+
+
+def main() -> None:
+    config = session.alembic_config()
+    state = asyncio.run(database_state())
+    if state == EMPTY:
+        print("Empty database; creating the schema from the models")
+        asyncio.run(create_schema())
+        command.stamp(config, "head")
+        return
+    if state == UNTRACKED:
+        print(f"Schema is not tracked by Alembic; stamping the baseline revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    main()
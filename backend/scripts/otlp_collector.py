@@ -0,0 +1,132 @@
+"""
+Minimal offline stand-in for an OpenTelemetry collector.
+
+Accepts OTLP/HTTP trace exports (protobuf or JSON) on ``/v1/traces`` and
+prints one line per span, indented by depth, so traces can be inspected
+without running Jaeger or a real collector. Spans can also be appended to a
+JSON-lines file.
+
+Usage (from ``backend/``):
+
+    python scripts/otlp_collector.py --port 4318 --output traces.jsonl
+    TRACING_EXPORTER=otlp uvicorn app.main:app
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+def _decode_protobuf(body: bytes) -> Dict[str, Any]:
+    from google.protobuf.json_format import MessageToDict
+    from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+
+    request = ExportTraceServiceRequest()
+    request.ParseFromString(body)
+    return MessageToDict(request)
+
+
+def _attribute_value(value: Dict[str, Any]) -> Any:
+    for key in ("stringValue", "intValue", "doubleValue", "boolValue"):
+        if key in value:
+            return value[key]
+    return value
+
+
+def flatten_spans(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Turn an OTLP export request into a flat list of span summaries"""
+    spans = []
+    for resource_spans in payload.get("resourceSpans", []):
+        resource = {
+            attribute["key"]: _attribute_value(attribute["value"])
+            for attribute in resource_spans.get("resource", {}).get("attributes", [])
+        }
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                start = int(span.get("startTimeUnixNano", 0))
+                end = int(span.get("endTimeUnixNano", 0))
+                spans.append({
+                    "service": resource.get("service.name"),
+                    "trace_id": span.get("traceId"),
+                    "span_id": span.get("spanId"),
+                    "parent_span_id": span.get("parentSpanId"),
+                    "name": span.get("name"),
+                    "start_ns": start,
+                    "duration_ms": round((end - start) / 1e6, 3),
+                    "status": span.get("status", {}).get("code", "STATUS_CODE_UNSET"),
+                    "attributes": {
+                        attribute["key"]: _attribute_value(attribute["value"])
+                        for attribute in span.get("attributes", [])
+                    },
+                })
+    return spans
+
+
+def print_spans(spans: List[Dict[str, Any]]) -> None:
+    """Print spans grouped by trace, children indented under their parents"""
+    ids = {span["span_id"] for span in spans}
+    by_parent: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in spans:
+        parent = span["parent_span_id"] if span["parent_span_id"] in ids else None
+        by_parent.setdefault(parent, []).append(span)
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in sorted(by_parent.get(parent, []), key=lambda item: item["start_ns"]):
+            error = " ERROR" if span["status"] == "STATUS_CODE_ERROR" else ""
+            print(f"{span['trace_id'][:8]} {'  ' * depth}{span['name']} {span['duration_ms']:.1f}ms{error}")
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+
+
+def make_handler(output: Optional[str]):
+    class CollectorHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    payload = json.loads(body)
+                else:
+                    payload = _decode_protobuf(body)
+            except Exception as e:
+                self.send_error(400, str(e))
+                return
+
+            spans = flatten_spans(payload)
+            print_spans(spans)
+            if output:
+                with open(output, "a") as handle:
+                    for span in spans:
+                        handle.write(json.dumps(span) + "\n")
+
+            self.send_response(200)
+            self.send_header("Content-Type", self.headers.get("Content-Type", "application/x-protobuf"))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return CollectorHandler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", help="append received spans to this JSON-lines file")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.output))
+    print(f"Listening for OTLP/HTTP traces on http://{args.host}:{args.port}/v1/traces")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Write .gz and .br siblings for compressible files in the frontend build, so
+they are served without compressing on every request. Brotli variants need
+the ``brotli`` package; gzip uses the standard library. Variants that are not
+smaller than the original are skipped.
+
+Usage (from ``backend/``):
+
+    python scripts/precompress_static.py static
+"""
+import argparse
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".webmanifest")
+MINIMUM_SIZE = 1024
+
+
+def precompress(directory: str) -> None:
+    written = saved = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as handle:
+                body = handle.read()
+            if len(body) < MINIMUM_SIZE:
+                continue
+
+            variants = {".gz": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants[".br"] = brotli.compress(body, quality=11)
+            for suffix, compressed in variants.items():
+                if len(compressed) >= len(body):
+                    continue
+                with open(path + suffix, "wb") as handle:
+                    handle.write(compressed)
+                # Keep the variant's mtime in step with the original
+                stat = os.stat(path)
+                os.utime(path + suffix, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                written += 1
+                saved += len(body) - len(compressed)
+
+    print(f"Wrote {written} precompressed files, {saved / 1024:.0f} KiB smaller in total")
+    if brotli is None:
+        print("brotli is not installed; only gzip variants were written")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("directory", nargs="?", default="static")
+    args = parser.parse_args()
+    precompress(args.directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -47,6 +47,7 @@ class ApiClient {
         .from('lead_tables')
         .select('*')
         .eq('id', tableId)
+        .is('deleted_at', null)
         .single();
 
       if (!table) {
@@ -116,6 +117,7 @@ class ApiClient {
           lead_rows(count)
         `)
         .eq('user_id', user.id)
+        .is('deleted_at', null)
         .order('updated_at', { ascending: false });
 
       return tables?.map(table => ({
@@ -220,6 +222,7 @@ class ApiClient {
         .from('lead_tables')
         .select('*')
         .eq('id', id)
+        .is('deleted_at', null)
         .single();
 
       return table;
@@ -235,6 +238,7 @@ class ApiClient {
         .from('lead_tables')
         .update(data)
         .eq('id', id)
+        .is('deleted_at', null)
         .select()
         .single();
 